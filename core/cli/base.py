@@ -10,7 +10,9 @@ class CLITool(abc.ABC):
             self,
             logger=None,
     ):
-        self.logger = logger or logging.getLogger(self.__class__.name__)
+        self.logger = logger or logging.getLogger(
+            f"{self.__class__.__module__}.{self.__class__.__name__}"
+        )
 
     @abc.abstractmethod
     def run(
@@ -6,7 +6,9 @@ Given an Injection object:
 import pyopenms as oms
 import numpy as np
 from scipy.signal import find_peaks, find_peaks_cwt
-from scipy.ndimage import gaussian_filter1d, minimum_filter1d, maximum_filter1d
+from scipy.ndimage import (
+    gaussian_filter1d, minimum_filter1d, maximum_filter1d, correlate1d,
+)
 from scipy import sparse
 from scipy.sparse.linalg import spsolve
 
@@ -15,13 +17,37 @@ from core.data_structs.feature_pointer import FeaturePointer
 from core.utils.array_types import SpectrumArray, to_spec_arr
 
 from dataclasses import dataclass
+import functools
 from typing import Literal, Optional, TYPE_CHECKING
 import argparse
 import logging
+import os
 
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+# Gaussian smoothing applied to each nonzero island before peak picking.
+# Precomputed once at import; the weights reproduce
+# ``gaussian_filter1d(sigma=_SMOOTHING_SIGMA)`` (default truncate=4.0 ->
+# radius 4, i.e. 9 taps).
+_SMOOTHING_SIGMA = 1.1
+_SMOOTHING_RADIUS = int(4.0 * _SMOOTHING_SIGMA + 0.5)
+
+
+def _gaussian_kernel1d(sigma: float, radius: int) -> np.ndarray:
+    x = np.arange(-radius, radius + 1)
+    phi = np.exp(-0.5 / sigma ** 2 * x ** 2)
+    return phi / phi.sum()
+
+
+_SMOOTHING_WEIGHTS = _gaussian_kernel1d(_SMOOTHING_SIGMA, _SMOOTHING_RADIUS)
+
+# Same, for the TopHat variant (gaussian_filter1d(sigma=1.0))
+_TOPHAT_SMOOTHING_WEIGHTS = _gaussian_kernel1d(1.0, int(4.0 * 1.0 + 0.5))
+
+# Peak windows wider than this are assumed to be baseline, not peaks
+_MAX_PEAK_WINDOW_IN_SCANS = 400
+
 
 def build_features(
     scan_array: ScanArray,
@@ -33,23 +59,106 @@ def build_features(
     """
     Given a ScanArray, returns a list of FeaturePointer objects
     that can be used as an index to retrieve MS signals.
+
+    Dispatches to the numba-JIT lane kernel when numba is importable
+    (set ``MZKIT_DISABLE_NUMBA=1`` to force the pure-Python path).
+    Both paths emit the same peak windows, in lane order.
     """
-    feature_pointers: list[FeaturePointer] = []
+    if _use_numba_kernel():
+        intsy_arr = scan_array.intsy_arr
+        lane_idxs, scan_starts, scan_ends = _build_features_numba(
+            indptr=intsy_arr.indptr.astype(np.int64),
+            indices=intsy_arr.indices.astype(np.int64),
+            data=intsy_arr.data.astype(np.float64),
+            min_peak_height=float(min_peak_height),
+            prominence=float(prominence),
+            min_peak_length=float(min_peak_length_in_scans),
+            smoothing_weights=_SMOOTHING_WEIGHTS,
+        )
+    else:
+        lane_idxs, scan_starts, scan_ends = _build_features_python(
+            scan_array=scan_array,
+            min_peak_length_in_scans=min_peak_length_in_scans,
+            min_peak_height=min_peak_height,
+            prominence=prominence,
+        )
 
-    # Iterate over the ScanArray's mass lanes and define FeaturePointers based
-    #   on chromatographic peaks
+    return _make_feature_pointers(
+        scan_array, lane_idxs, scan_starts, scan_ends,
+    )
 
-    rt_arr: np.ndarray = scan_array.rt_arr
-    for lane_idx in range(0, scan_array.mz_arr.shape[0]):
-        mz_arr: np.ndarray = scan_array.mz_arr[lane_idx].toarray()
-        intsy_arr: np.ndarray = scan_array.intsy_arr[lane_idx].toarray()
 
-        # Check tallest signal before comitting to peak finding
-        if not _array_passes_threshold(
-            intsy_arr,
-            min_peak_height,
-        ):
-            continue
+def _use_numba_kernel() -> bool:
+    """
+    True if the numba kernels should be used. Set ``MZKIT_DISABLE_NUMBA=1``
+    to force the pure-Python paths (useful for A/B benchmarking).
+    """
+    return (
+        _NUMBA_KERNEL_AVAILABLE
+        and not os.environ.get("MZKIT_DISABLE_NUMBA")
+    )
+
+
+def _make_feature_pointers(
+    scan_array: ScanArray,
+    lane_idxs: np.ndarray,
+    scan_starts: np.ndarray,
+    scan_ends: np.ndarray,
+) -> list[FeaturePointer]:
+    """
+    Builds FeaturePointers from parallel arrays of peak windows.
+    ``scan_ends`` are inclusive.
+    """
+    return [
+        scan_array.make_feature_pointer(
+            mass_lane_idx=int(lane_idx),
+            scan_idxs=np.arange(scan_start, scan_end + 1),
+        )
+        for lane_idx, scan_start, scan_end in zip(
+            lane_idxs, scan_starts, scan_ends,
+        )
+    ]
+
+
+def _build_features_python(
+    scan_array: ScanArray,
+    min_peak_length_in_scans: int,
+    min_peak_height: float,
+    prominence: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pure-Python lane loop (SciPy smoothing + ``find_peaks``).
+    Reference implementation for ``_build_features_numba``; returns the
+    same ``(lane_idxs, scan_starts, scan_ends)`` int32 arrays.
+    """
+    # Peak windows are written into preallocated buffers rather than
+    #   appended to lists. A lane can't have more peaks than nonzeros,
+    #   so nnz is a safe upper bound
+    nnz = scan_array.intsy_arr.nnz
+    lane_idxs = np.empty(nnz, dtype=np.int32)
+    scan_starts = np.empty(nnz, dtype=np.int32)
+    scan_ends = np.empty(nnz, dtype=np.int32)
+    n_windows = 0
+
+    # Iterate over the ScanArray's mass lanes and find chromatographic peaks.
+    # Check tallest signal of every lane in one sparse reduction before
+    #   comitting to peak finding; most lanes never get past this
+    lane_max: np.ndarray = scan_array.intsy_arr.max(axis=1).toarray()
+    active_lane_idxs: np.ndarray = np.flatnonzero(lane_max > min_peak_height)
+
+    # Slice the CSR buffers directly rather than going through
+    #   `intsy_arr[lane_idx]`, which builds a new sparse object per lane
+    indptr = scan_array.intsy_arr.indptr
+    indices = scan_array.intsy_arr.indices
+    data = scan_array.intsy_arr.data
+
+    for lane_idx in active_lane_idxs:
+        lane_idx = int(lane_idx)
+
+        # Work on the row's nonzeros directly; never densify the lane
+        row_start, row_end = indptr[lane_idx], indptr[lane_idx + 1]
+        row_idxs: np.ndarray = indices[row_start:row_end]
+        row_data: np.ndarray = data[row_start:row_end]
 
         # _, baseline_corr_intsy_arr, _ = adaptive_tophat(
         #    intsy_arr
@@ -62,75 +171,80 @@ def build_features(
         # )
 
         # Identify islands of 'non-zero' elements
-        intsy_arr_chunks, chunk_idxs = _split_nonzero_islands(
-            intsy_arr,
-            return_island_idxs=True,
+        intsy_arr_chunks, chunk_idxs = _split_sparse_islands(
+            row_idxs,
+            row_data,
         )
 
         # Iterate over these islands and find peaks
-        peak_windows: list[tuple[int, int]] = []
         for chunk, chunk_idxs in zip(
             intsy_arr_chunks,
             chunk_idxs,
         ):
             chunk: np.ndarray[float]        # Intensity values
-            chunk_idxs: np.ndarray[int]     # Idxs in pre-split intsy_arr
+            chunk_idxs: np.ndarray[int]     # Scan idxs within the lane
 
-            # Smooth the chunk (more effective peak finding)
-            smoothed_chunk: np.ndarray = gaussian_filter1d(
+            # A peak needs a sample on either side of it
+            if chunk.size < 3:
+                continue
+
+            # Smooth the chunk (more effective peak finding). Equivalent to
+            #   gaussian_filter1d(sigma=_SMOOTHING_SIGMA), minus rebuilding
+            #   the kernel on every call
+            smoothed_chunk: np.ndarray = correlate1d(
                 chunk,
-                sigma=1.1,
+                _SMOOTHING_WEIGHTS,
+                mode='reflect',
             )
 
 
+            # Width is checked on the base-to-base span below, rather
+            #   than having find_peaks interpolate widths at half
+            #   prominence for every candidate
             peaks, properties = find_peaks(
                 x=smoothed_chunk,
                 prominence=prominence,
-                width=min_peak_length_in_scans,
             )
 
             if not peaks.any():
                 continue
 
+            left_bases: np.ndarray = properties['left_bases']
+            right_bases: np.ndarray = properties['right_bases']
+            is_wide_enough = (
+                right_bases - left_bases >= min_peak_length_in_scans
+            )
+
             for peak_start, peak_end in zip(
-                properties['left_bases'],
-                properties['right_bases'],
+                left_bases[is_wide_enough],
+                right_bases[is_wide_enough],
             ):
                 peak_start: int
                 peak_end: int
 
-                peak_windows.append(
-                    (
-                        chunk_idxs[peak_start],  # convert to pre-split idx
-                        chunk_idxs[peak_end],
-                    )
-                )
+                if chunk[peak_start:peak_end].max() < min_peak_height:
+                    continue
 
-        if len(peak_windows) == 0:
-            continue
-
-        # Now create FeaturePointers
-        for peak_window in peak_windows:
-            if intsy_arr[peak_window[0]:peak_window[1]].max() < min_peak_height:
-                continue
-
-            if peak_window[1] - peak_window[0] > 400:
-                continue
+                # Convert to scan idxs
+                scan_start = chunk_idxs[peak_start]
+                scan_end = chunk_idxs[peak_end]
+                if scan_end - scan_start > _MAX_PEAK_WINDOW_IN_SCANS:
+                    continue
 
-            feature_pointer = FeaturePointer(
-                mz_lane_idx=lane_idx,
-                scan_start_idx=peak_window[0],
-                scan_end_idx=peak_window[1],
-            )
+                lane_idxs[n_windows] = lane_idx
+                scan_starts[n_windows] = scan_start
+                scan_ends[n_windows] = scan_end
+                n_windows += 1
 
-            feature_pointers.append(
-                feature_pointer
-            )
+    logger.debug(
+        f"Found {n_windows} peaks in {active_lane_idxs.size} lanes"
+    )
 
-        print(
-            f"Finished lane {lane_idx}"
-        )
-    return feature_pointers
+    return (
+        lane_idxs[:n_windows],
+        scan_starts[:n_windows],
+        scan_ends[:n_windows],
+    )
 
 
 def _split_nonzero_islands(
@@ -144,33 +258,522 @@ def _split_nonzero_islands(
     nonzero_idxs = np.nonzero(arr)[0]
 
     if len(nonzero_idxs) == 0:
-        return []  # Array is all 0's
-
-    breaks = np.where(
-        np.diff(nonzero_idxs) > 1
-    )[0] + 1
+        return [], []  # Array is all 0's
 
-    # Get split indices
-    island_idxs: list[np.ndarray] = np.split(
+    islands, island_idxs = _split_sparse_islands(
         nonzero_idxs,
-        breaks,
+        arr[nonzero_idxs],
     )
 
-    islands = [
-        arr[idxs] for idxs in island_idxs
-    ]
-
     if return_island_idxs:
         return islands, island_idxs
 
     return islands, None
 
 
-def _array_passes_threshold(
-    arr: np.ndarray,
-    threshold: float,
-) -> bool:
-    return arr.max() > threshold
+def _split_sparse_islands(
+    idxs: np.ndarray,
+    data: np.ndarray,
+) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """
+    Given the (sorted) column indices and values of a sparse row,
+    returns its 'islands' of consecutive columns as
+    (list of value arrays, list of index arrays)
+    """
+    breaks = np.where(
+        np.diff(idxs) > 1
+    )[0] + 1
+
+    return np.split(data, breaks), np.split(idxs, breaks)
+
+
+# ---------------------------------------------------------------------------
+# numba-JIT lane kernel
+# ---------------------------------------------------------------------------
+# Same algorithm as ``_build_features_python``, but operates directly on the
+# CSR buffers of ``scan_array.intsy_arr`` (no per-lane ``.toarray()``) and
+# runs lanes in parallel. Smoothing and peak picking are reimplemented to
+# match ``gaussian_filter1d`` (mode='reflect') and ``find_peaks`` (local
+# maxima -> prominence -> base-to-base width).
+
+try:
+    from numba import njit, prange
+    _NUMBA_KERNEL_AVAILABLE = True
+except ImportError:
+    _NUMBA_KERNEL_AVAILABLE = False
+
+
+if _NUMBA_KERNEL_AVAILABLE:
+
+    @njit(cache=True)
+    def _smooth_island(
+        x: np.ndarray,
+        weights: np.ndarray,
+        out: np.ndarray,
+    ):
+        """FIR smoothing with SciPy's 'reflect' boundary (d c b a | a b c d)."""
+        n = x.shape[0]
+        radius = (weights.shape[0] - 1) // 2
+        period = 2 * n
+        for i in range(n):
+            acc = x[i] * weights[radius]
+            for k in range(radius, 0, -1):
+                lo = (i - k) % period
+                if lo >= n:
+                    lo = period - 1 - lo
+                hi = (i + k) % period
+                if hi >= n:
+                    hi = period - 1 - hi
+                acc += (x[lo] + x[hi]) * weights[radius + k]
+            out[i] = acc
+
+    @njit(cache=True)
+    def _find_peak_bases(
+        x: np.ndarray,
+        min_prominence: float,
+        min_width: float,
+        out_left: np.ndarray,
+        out_right: np.ndarray,
+        out_peak: np.ndarray,
+    ) -> int:
+        """
+        Writes (left_base, right_base, peak) of every peak in ``x`` that
+        passes the prominence and width thresholds into ``out_left``/
+        ``out_right``/``out_peak``, and returns how many were written.
+        Mirrors ``scipy.signal.find_peaks`` (prominence only); width is
+        the base-to-base span, as in ``_build_features_python``.
+        """
+        n = x.shape[0]
+        n_out = 0
+        i = 1
+        i_max = n - 1
+        while i < i_max:
+            if x[i - 1] < x[i]:
+                i_ahead = i + 1
+                while i_ahead < i_max and x[i_ahead] == x[i]:
+                    i_ahead += 1
+
+                if x[i_ahead] < x[i]:
+                    peak = (i + i_ahead - 1) // 2
+                    i = i_ahead
+
+                    # Prominence
+                    left_min = x[peak]
+                    left_base = peak
+                    j = peak
+                    while j >= 0 and x[j] <= x[peak]:
+                        if x[j] < left_min:
+                            left_min = x[j]
+                            left_base = j
+                        j -= 1
+
+                    right_min = x[peak]
+                    right_base = peak
+                    j = peak
+                    while j <= n - 1 and x[j] <= x[peak]:
+                        if x[j] < right_min:
+                            right_min = x[j]
+                            right_base = j
+                        j += 1
+
+                    prom = x[peak] - max(left_min, right_min)
+                    if (
+                        prom >= min_prominence
+                        and right_base - left_base >= min_width
+                    ):
+                        out_left[n_out] = left_base
+                        out_right[n_out] = right_base
+                        out_peak[n_out] = peak
+                        n_out += 1
+            i += 1
+        return n_out
+
+    @njit(parallel=True, cache=True)
+    def _build_features_numba(
+        indptr: np.ndarray,    # int64[n_lanes + 1]
+        indices: np.ndarray,   # int64[nnz]
+        data: np.ndarray,      # float64[nnz]
+        min_peak_height: float,
+        prominence: float,
+        min_peak_length: float,
+        smoothing_weights: np.ndarray,
+    ):
+        """
+        Numba-JIT version of ``_build_features_python``. Returns
+        ``(lane_idxs, scan_starts, scan_ends)`` as int32 arrays.
+
+        Each lane writes its windows into its own CSR row segment
+        ``indptr[lane]:indptr[lane + 1]`` of the scratch buffers (a lane
+        can't have more peaks than nonzeros), so lanes run independently
+        under ``prange`` and are compacted serially afterwards.
+        """
+        n_lanes = indptr.shape[0] - 1
+        nnz = data.shape[0]
+        buf_starts = np.empty(nnz, dtype=np.int32)
+        buf_ends = np.empty(nnz, dtype=np.int32)
+        lane_counts = np.zeros(n_lanes, dtype=np.int64)
+
+        for lane in prange(n_lanes):
+            p0 = indptr[lane]
+            p1 = indptr[lane + 1]
+            if p1 == p0:
+                continue
+
+            lane_max = data[p0]
+            for p in range(p0 + 1, p1):
+                if data[p] > lane_max:
+                    lane_max = data[p]
+            if not lane_max > min_peak_height:
+                continue
+
+            smoothed = np.empty(p1 - p0, dtype=np.float64)
+            lefts = np.empty(p1 - p0, dtype=np.int64)
+            rights = np.empty(p1 - p0, dtype=np.int64)
+            peaks = np.empty(p1 - p0, dtype=np.int64)
+            n_found = 0
+
+            # Walk islands of consecutive (nonzero) columns
+            island_start = p0
+            while island_start < p1:
+                island_end = island_start + 1
+                while (
+                    island_end < p1
+                    and indices[island_end] == indices[island_end - 1] + 1
+                ):
+                    island_end += 1
+
+                # A peak needs a sample on either side of it
+                n_peaks = 0
+                if island_end - island_start >= 3:
+                    island = data[island_start:island_end]
+                    island_smoothed = smoothed[:island_end - island_start]
+                    _smooth_island(island, smoothing_weights, island_smoothed)
+                    n_peaks = _find_peak_bases(
+                        island_smoothed,
+                        prominence,
+                        min_peak_length,
+                        lefts,
+                        rights,
+                        peaks,
+                    )
+
+                for k in range(n_peaks):
+                    lb = island_start + lefts[k]
+                    rb = island_start + rights[k]
+                    window_max = data[lb]
+                    for p in range(lb + 1, rb):
+                        if data[p] > window_max:
+                            window_max = data[p]
+                    if window_max < min_peak_height:
+                        continue
+                    if indices[rb] - indices[lb] > _MAX_PEAK_WINDOW_IN_SCANS:
+                        continue
+                    buf_starts[p0 + n_found] = indices[lb]
+                    buf_ends[p0 + n_found] = indices[rb]
+                    n_found += 1
+
+                island_start = island_end
+
+            lane_counts[lane] = n_found
+
+        # Compact per-lane segments
+        total = 0
+        for lane in range(n_lanes):
+            total += lane_counts[lane]
+        lane_idxs = np.empty(total, dtype=np.int32)
+        scan_starts = np.empty(total, dtype=np.int32)
+        scan_ends = np.empty(total, dtype=np.int32)
+        k = 0
+        for lane in range(n_lanes):
+            p0 = indptr[lane]
+            for j in range(lane_counts[lane]):
+                lane_idxs[k] = lane
+                scan_starts[k] = buf_starts[p0 + j]
+                scan_ends[k] = buf_ends[p0 + j]
+                k += 1
+
+        return lane_idxs, scan_starts, scan_ends
+
+    @njit(cache=True)
+    def _match_scan_numba(
+        wip_mz: np.ndarray,     # float64[n_wip]
+        wip_gap: np.ndarray,    # int64[n_wip], updated in place
+        spec_mz: np.ndarray,    # float64[n_peaks], sorted
+        mz_tolerance: float,
+        scan_gap_tolerance: int,
+    ):
+        """
+        Numba-JIT version of ``_match_scan``. Same claim-once semantics:
+        features are visited in priority order and don't fall back to
+        their next-closest signal if the closest one is already taken.
+        """
+        n_wip = wip_mz.shape[0]
+        n_peaks = spec_mz.shape[0]
+        matched_idxs = np.full(n_wip, -1, dtype=np.int64)
+        avlb_signals = np.ones(n_peaks, dtype=np.bool_)
+        closed = np.zeros(n_wip, dtype=np.bool_)
+
+        for i in range(n_wip):
+            target = wip_mz[i]
+            lo = 0
+            hi = n_peaks
+            while lo < hi:
+                mid = (lo + hi) >> 1
+                if spec_mz[mid] < target:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            j = lo
+
+            best_k = -1
+            best_d = mz_tolerance
+            if j > 0:
+                d = target - spec_mz[j - 1]
+                if d < best_d:
+                    best_d = d
+                    best_k = j - 1
+                    # Duplicate m/z values: take the first (like np.argmin)
+                    while best_k > 0 and spec_mz[best_k - 1] == spec_mz[best_k]:
+                        best_k -= 1
+            if j < n_peaks:
+                # Strict `<` keeps j-1 on exact ties (matches np.argmin)
+                if spec_mz[j] - target < best_d:
+                    best_k = j
+
+            if best_k != -1 and avlb_signals[best_k]:
+                matched_idxs[i] = best_k
+                avlb_signals[best_k] = False
+                wip_gap[i] = 0
+            else:
+                wip_gap[i] += 1
+                if wip_gap[i] > scan_gap_tolerance:
+                    closed[i] = True
+
+        return (
+            matched_idxs,
+            np.nonzero(avlb_signals)[0],
+            np.nonzero(closed)[0],
+        )
+
+    @njit(cache=True)
+    def _sliding_extreme(
+        x: np.ndarray,
+        size: int,
+        find_min: bool,
+        out: np.ndarray,
+    ):
+        """
+        ``minimum_filter1d``/``maximum_filter1d`` (mode='reflect') as a
+        single O(n) pass with a monotonic deque, independent of ``size``.
+        """
+        n = x.shape[0]
+        size1 = size // 2
+        period = 2 * n
+        n_ext = n + size - 1
+        ext = np.empty(n_ext, dtype=np.float64)
+        for t in range(n_ext):
+            j = (t - size1) % period
+            if j >= n:
+                j = period - 1 - j
+            ext[t] = x[j]
+
+        deque = np.empty(n_ext, dtype=np.int64)
+        head = 0
+        tail = 0
+        for t in range(n_ext):
+            v = ext[t]
+            if find_min:
+                while tail > head and ext[deque[tail - 1]] >= v:
+                    tail -= 1
+            else:
+                while tail > head and ext[deque[tail - 1]] <= v:
+                    tail -= 1
+            deque[tail] = t
+            tail += 1
+            if deque[head] <= t - size:
+                head += 1
+            i = t - size + 1
+            if i >= 0:
+                out[i] = ext[deque[head]]
+
+    @njit(cache=True)
+    def _fused_lane_scan(
+        lane: np.ndarray,
+        tophat_window_size: int,
+        smoothing_weights: np.ndarray,
+        prominence: float,
+        min_peak_height: float,
+        min_peak_length: float,
+        min_num_scans_between_peaks: int,
+        out_starts: np.ndarray,
+        out_ends: np.ndarray,
+    ) -> int:
+        """
+        TopHat baseline correction, smoothing and peak picking for one dense
+        lane, all against lane-local scratch buffers. Writes the surviving
+        (start, end) windows, sorted and de-overlapped, into ``out_*`` and
+        returns how many were written.
+        """
+        n = lane.shape[0]
+
+        # TopHat: erosion then dilation, baseline-subtracted and clipped at 0
+        eroded = np.empty(n, dtype=np.float64)
+        opened = np.empty(n, dtype=np.float64)
+        _sliding_extreme(lane, tophat_window_size, True, eroded)
+        _sliding_extreme(eroded, tophat_window_size, False, opened)
+        corrected = eroded  # eroded is no longer needed; reuse it
+        for i in range(n):
+            v = lane[i] - opened[i]
+            corrected[i] = v if v > 0.0 else 0.0
+
+        smoothed = np.empty(n, dtype=np.float64)
+        lefts = np.empty(n, dtype=np.int64)
+        rights = np.empty(n, dtype=np.int64)
+        peaks = np.empty(n, dtype=np.int64)
+        win_starts = np.empty(n, dtype=np.int64)
+        win_ends = np.empty(n, dtype=np.int64)
+        n_windows = 0
+
+        i = 0
+        while i < n:
+            if corrected[i] == 0.0:
+                i += 1
+                continue
+            island_start = i
+            while i < n and corrected[i] != 0.0:
+                i += 1
+            island_len = i - island_start
+            if island_len < min_peak_length:
+                continue
+
+            island_smoothed = smoothed[:island_len]
+            _smooth_island(
+                corrected[island_start:i],
+                smoothing_weights,
+                island_smoothed,
+            )
+            n_peaks = _find_peak_bases(
+                island_smoothed,
+                prominence,
+                min_peak_length,
+                lefts,
+                rights,
+                peaks,
+            )
+            for k in range(n_peaks):
+                if island_smoothed[peaks[k]] < min_peak_height:
+                    continue
+                win_starts[n_windows] = island_start + lefts[k]
+                win_ends[n_windows] = island_start + rights[k]
+                n_windows += 1
+
+        # Sort by start (stable, like list.sort) and drop overlapping windows
+        order = np.argsort(win_starts[:n_windows], kind='mergesort')
+        n_out = 0
+        for k in range(n_windows):
+            start = win_starts[order[k]]
+            end = win_ends[order[k]]
+            if (
+                n_out > 0
+                and start <= out_ends[n_out - 1] + min_num_scans_between_peaks
+            ):
+                continue
+            out_starts[n_out] = start
+            out_ends[n_out] = end
+            n_out += 1
+        return n_out
+
+    @njit(parallel=True, cache=True)
+    def _build_features_tophat_numba(
+        indptr: np.ndarray,    # int64[n_lanes + 1]
+        indices: np.ndarray,   # int64[nnz]
+        data: np.ndarray,      # float64[nnz]
+        n_scans: int,
+        tophat_window_size: int,
+        min_peak_height: float,
+        prominence: float,
+        min_peak_length: float,
+        min_num_scans_between_peaks: int,
+        smoothing_weights: np.ndarray,
+    ):
+        """
+        Numba-JIT version of ``improve_build_features_with_tophat``'s lane
+        loop. Returns ``(lane_idxs, scan_starts, scan_ends)`` as int32
+        arrays. Same per-lane output segments as ``_build_features_numba``
+        (baseline correction can only remove nonzeros, never add them).
+        """
+        n_lanes = indptr.shape[0] - 1
+        nnz = data.shape[0]
+        buf_starts = np.empty(nnz, dtype=np.int32)
+        buf_ends = np.empty(nnz, dtype=np.int32)
+        lane_counts = np.zeros(n_lanes, dtype=np.int64)
+
+        for lane_idx in prange(n_lanes):
+            p0 = indptr[lane_idx]
+            p1 = indptr[lane_idx + 1]
+
+            lane_max = 0.0
+            for p in range(p0, p1):
+                if data[p] > lane_max:
+                    lane_max = data[p]
+            if lane_max < min_peak_height:
+                continue
+
+            lane = np.zeros(n_scans, dtype=np.float64)
+            for p in range(p0, p1):
+                lane[indices[p]] = data[p]
+
+            starts = np.empty(p1 - p0, dtype=np.int64)
+            ends = np.empty(p1 - p0, dtype=np.int64)
+            n_found = _fused_lane_scan(
+                lane,
+                tophat_window_size,
+                smoothing_weights,
+                prominence,
+                min_peak_height,
+                min_peak_length,
+                min_num_scans_between_peaks,
+                starts,
+                ends,
+            )
+            for k in range(n_found):
+                buf_starts[p0 + k] = starts[k]
+                buf_ends[p0 + k] = ends[k]
+            lane_counts[lane_idx] = n_found
+
+        total = 0
+        for lane_idx in range(n_lanes):
+            total += lane_counts[lane_idx]
+        lane_idxs = np.empty(total, dtype=np.int32)
+        scan_starts = np.empty(total, dtype=np.int32)
+        scan_ends = np.empty(total, dtype=np.int32)
+        k = 0
+        for lane_idx in range(n_lanes):
+            p0 = indptr[lane_idx]
+            for j in range(lane_counts[lane_idx]):
+                lane_idxs[k] = lane_idx
+                scan_starts[k] = buf_starts[p0 + j]
+                scan_ends[k] = buf_ends[p0 + j]
+                k += 1
+
+        return lane_idxs, scan_starts, scan_ends
+
+    @functools.lru_cache(maxsize=None)
+    def _make_tophat_kernel(window_size: int):
+        """
+        Returns a ``tophat_filter`` kernel specialised to ``window_size``.
+        The window is baked in as a compile-time constant, so each
+        configured size is compiled once and reused across lanes.
+        """
+        @njit
+        def _tophat(signal, out_baseline, out_tophat):
+            eroded = np.empty_like(out_baseline)
+            _sliding_extreme(signal, window_size, True, eroded)
+            _sliding_extreme(eroded, window_size, False, out_baseline)
+            for i in range(signal.shape[0]):
+                out_tophat[i] = signal[i] - out_baseline[i]
+
+        return _tophat
 
 
 # def baseline_correction(
@@ -395,6 +998,13 @@ def tophat_filter(signal, window_size):
         corrected_signal : ndarray
             The baseline-corrected signal (TopHat result)
     """
+    if _use_numba_kernel() and np.ndim(signal) == 1 and len(signal) > 0:
+        signal = np.ascontiguousarray(signal, dtype=np.float64)
+        baseline = np.empty_like(signal)
+        tophat = np.empty_like(signal)
+        _make_tophat_kernel(int(window_size))(signal, baseline, tophat)
+        return baseline, tophat
+
     # Morphological erosion (minimum filter)
     eroded = minimum_filter1d(signal, size=window_size)
 
@@ -582,17 +1192,45 @@ def improve_build_features_with_tophat(
         list of FeaturePointer
             Feature pointers for the detected peaks
     """
+    if _use_numba_kernel():
+        intsy_csr = scan_array.intsy_arr
+        lane_idxs, scan_starts, scan_ends = _build_features_tophat_numba(
+            indptr=intsy_csr.indptr.astype(np.int64),
+            indices=intsy_csr.indices.astype(np.int64),
+            data=intsy_csr.data.astype(np.float64),
+            n_scans=int(intsy_csr.shape[1]),
+            tophat_window_size=int(tophat_window_size),
+            min_peak_height=float(min_peak_height),
+            prominence=float(prominence),
+            min_peak_length=float(min_peak_length_in_scans),
+            min_num_scans_between_peaks=int(min_num_scans_between_peaks),
+            smoothing_weights=_TOPHAT_SMOOTHING_WEIGHTS,
+        )
+        return _make_feature_pointers(
+            scan_array, lane_idxs, scan_starts, scan_ends,
+        )
+
     feature_pointers = []
-    rt_arr = scan_array.rt_arr
+
+    indptr = scan_array.intsy_arr.indptr
+    indices = scan_array.intsy_arr.indices
+    data = scan_array.intsy_arr.data
+    n_scans = scan_array.intsy_arr.shape[1]
 
     for lane_idx in range(scan_array.mz_arr.shape[0]):
-        mz_arr = scan_array.mz_arr[lane_idx].toarray()
-        intsy_arr = scan_array.intsy_arr[lane_idx].toarray()
+        row_start, row_end = indptr[lane_idx], indptr[lane_idx + 1]
 
         # Check if the maximum intensity is above the threshold
-        if np.max(intsy_arr) < min_peak_height:
+        #   (before densifying the lane)
+        if (
+            row_end == row_start
+            or data[row_start:row_end].max() < min_peak_height
+        ):
             continue
 
+        intsy_arr = np.zeros(n_scans, dtype=data.dtype)
+        intsy_arr[indices[row_start:row_end]] = data[row_start:row_end]
+
         # Apply TopHat filter for baseline correction
         _, intsy_arr_corrected = tophat_filter(intsy_arr, tophat_window_size)
 
@@ -615,20 +1253,24 @@ def improve_build_features_with_tophat(
             # Smooth the chunk
             smoothed_chunk = gaussian_filter1d(chunk, sigma=1.0)
 
-            # Find peaks
+            # Find peaks (width is checked on the base-to-base span)
             peaks, properties = find_peaks(
                 x=smoothed_chunk,
                 prominence=prominence,
-                width=min_peak_length_in_scans,
             )
 
             if not peaks.any():
                 continue
 
-            # Filter peaks by height after baseline correction
+            base_widths = properties['right_bases'] - properties['left_bases']
+
+            # Filter peaks by width and by height after baseline correction
             valid_peaks = []
             for i, peak_idx in enumerate(peaks):
-                if smoothed_chunk[peak_idx] >= min_peak_height:
+                if (
+                    base_widths[i] >= min_peak_length_in_scans
+                    and smoothed_chunk[peak_idx] >= min_peak_height
+                ):
                     valid_peaks.append(i)
 
             if not valid_peaks:
@@ -657,10 +1299,9 @@ def improve_build_features_with_tophat(
 
         # Create FeaturePointers
         for peak_window in filtered_peak_windows:
-            feature_pointer = FeaturePointer(
-                mz_lane_idx=lane_idx,
-                scan_start_idx=peak_window[0],
-                scan_end_idx=peak_window[1],
+            feature_pointer = scan_array.make_feature_pointer(
+                mass_lane_idx=lane_idx,
+                scan_idxs=np.arange(peak_window[0], peak_window[1] + 1),
             )
             feature_pointers.append(feature_pointer)
 
@@ -677,6 +1318,13 @@ def build_features_masscube(
     final_features = []
     wip_features = []
 
+    # One pyOpenMS call per scan, rather than one per signal written
+    rts = np.fromiter(
+        (spectrum.getRT() for spectrum in spectra),
+        dtype=np.float64,
+        count=total_num_scans,
+    )
+
     # Build initial features from first scan
     first_spectrum: tuple[np.ndarray, np.ndarray] = spectra[0].get_peaks()
 
@@ -684,12 +1332,18 @@ def build_features_masscube(
         ftr = Feature(
             total_num_scans=total_num_scans,
         )
-        ftr.array['mz'][0] = spec_mz
-        ftr.array['intsy'][0] = spec_intsy
-        ftr.array['rt'][0] = spectra[0].getRT()
+        ftr.set_scan(0, spec_mz, spec_intsy, rts[0])
 
         wip_features.append(ftr)
 
+    # Latest m/z, latest non-zero intensity and gap counter of each WIP
+    #   feature, kept in sync with `wip_features`
+    wip_mz = np.asarray(first_spectrum[0], dtype=np.float64)
+    wip_intsy = np.asarray(first_spectrum[1], dtype=np.float64)
+    wip_gap = np.zeros(wip_mz.size, dtype=np.int64)
+
+    match_scan = _match_scan_numba if _use_numba_kernel() else _match_scan
+
     # Iterate over subsequent scans:
     for scan_num in range(1, total_num_scans):
         spec_mz, spec_intsy = _get_peaks_higher_than_intsy(
@@ -700,87 +1354,162 @@ def build_features_masscube(
         if spec_mz.size < 2:
             continue
 
-        avlb_signals = np.ones(len(spec_mz), dtype=bool)
-        avlb_ftrs = np.ones(len(wip_features), dtype=bool)
-        to_be_moved = []
+        # Matching binary-searches, so sort by m/z (usually a no-op)
+        order = np.argsort(spec_mz, kind='stable')
+        spec_mz = np.ascontiguousarray(spec_mz[order], dtype=np.float64)
+        spec_intsy = spec_intsy[order]
+
+        # Match every WIP feature against this scan in one go. Updates
+        #   wip_gap in place
+        matched_idxs, new_signal_idxs, closed_idxs = match_scan(
+            wip_mz,
+            wip_gap,
+            spec_mz,
+            float(mz_tolerance),
+            int(scan_gap_tolerance),
+        )
 
-        for i, ftr in enumerate(wip_features):
-            min_idx = _find_closest_idx(
-                arr=spec_mz,
-                target=ftr.latest_scan['mz'],
-                tolerance=mz_tolerance,
+        matched_ftr_idxs = np.flatnonzero(matched_idxs != -1)
+        for i in matched_ftr_idxs:
+            min_idx = matched_idxs[i]
+            wip_features[i].set_scan(
+                scan_num,
+                spec_mz[min_idx],
+                spec_intsy[min_idx],
+                rts[scan_num],
             )
 
-            if min_idx != -1 and avlb_signals[min_idx]:
-                ftr.array['mz'][scan_num] = spec_mz[min_idx]
-                ftr.array['intsy'][scan_num] = spec_intsy[min_idx]
-                ftr.array['rt'][scan_num] = spectra[scan_num].getRT()
-                ftr.gap_counter = 0
-                avlb_signals[min_idx] = False  # Mark signal as unavailable for binning
-                avlb_ftrs[i] = False  # Mark feature as unavailable for binning
-            else:
-                # Feature didn't match anything in this scan
-                ftr.gap_counter += 1
-                if ftr.gap_counter > scan_gap_tolerance:
-                    to_be_moved.append(i)
+        matched_signal_idxs = matched_idxs[matched_ftr_idxs]
+        wip_mz[matched_ftr_idxs] = spec_mz[matched_signal_idxs]
+        # Mirrors Feature.latest_intsy, which only tracks non-zero writes
+        matched_intsy = spec_intsy[matched_signal_idxs]
+        wip_intsy[matched_ftr_idxs] = np.where(
+            matched_intsy > 0,
+            matched_intsy,
+            wip_intsy[matched_ftr_idxs],
+        )
 
         # Move all features not extended recently to `final features`
-        for i in to_be_moved[::-1]:
-            final_features.append(
-                wip_features.pop(i)
-            )
+        #   (one compaction pass, rather than a list.pop() per feature)
+        if closed_idxs.size:
+            keep = np.ones(len(wip_features), dtype=bool)
+            keep[closed_idxs] = False
+            final_features.extend(wip_features[i] for i in closed_idxs)
+            wip_features = [
+                ftr for ftr, kept in zip(wip_features, keep) if kept
+            ]
+            wip_mz = wip_mz[keep]
+            wip_intsy = wip_intsy[keep]
+            wip_gap = wip_gap[keep]
 
         # Create new rois for remaining signals
-        for i, (spec_mz, spec_intsy) in enumerate(
-                zip(spec_mz, spec_intsy)
-        ):
-            if not avlb_signals[i]:
-                continue
-
+        for i in new_signal_idxs:
             ftr = Feature(
                 total_num_scans=total_num_scans,
             )
-            ftr.array['mz'][scan_num] = spec_mz
-            ftr.array['intsy'][scan_num] = spec_intsy
-            ftr.array['rt'][scan_num] = spectra[scan_num].getRT()
+            ftr.set_scan(
+                scan_num, spec_mz[i], spec_intsy[i], rts[scan_num],
+            )
 
             wip_features.append(ftr)
-
-        wip_features.sort(
-            key=lambda x: x.latest_scan['intsy'],
-            reverse=True
+        wip_mz = np.concatenate([wip_mz, spec_mz[new_signal_idxs]])
+        wip_intsy = np.concatenate([wip_intsy, spec_intsy[new_signal_idxs]])
+        wip_gap = np.concatenate(
+            [wip_gap, np.zeros(new_signal_idxs.size, dtype=np.int64)]
         )
 
+        # Most intense features get first pick of next scan's signals
+        order = np.argsort(-wip_intsy, kind='stable')
+        wip_features = [wip_features[i] for i in order]
+        wip_mz = wip_mz[order]
+        wip_intsy = wip_intsy[order]
+        wip_gap = wip_gap[order]
+
     # Move all remaining wip_features to final_features
     for ftr in wip_features:
         final_features.append(ftr)
 
     # Sort by mz
     final_features.sort(
-        key=lambda x: np.mean(x.nonzero_scans['mz'])
+        key=lambda x: np.mean(x.nonzero_mz)
     )
 
     return final_features
 
 
-def _find_closest_idx(
-        arr: np.ndarray,
-        target: float,
+def _match_scan(
+        wip_mz: np.ndarray,
+        wip_gap: np.ndarray,
+        spec_mz: np.ndarray,
+        mz_tolerance: float,
+        scan_gap_tolerance: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Matches WIP features against one scan and advances their gap counters
+    (`wip_gap` is updated in place).
+    :return: (matched signal idx per feature, or -1;
+              idxs of unclaimed signals;
+              idxs of features to retire)
+    """
+    matched_idxs = _match_features_to_signals(
+        ftr_mzs=wip_mz,
+        spec_mz=spec_mz,
+        tolerance=mz_tolerance,
+    )
+    is_matched = matched_idxs != -1
+    wip_gap[is_matched] = 0
+    wip_gap[~is_matched] += 1
+
+    avlb_signals = np.ones(spec_mz.size, dtype=bool)
+    avlb_signals[matched_idxs[is_matched]] = False
+
+    return (
+        matched_idxs,
+        np.flatnonzero(avlb_signals),
+        np.flatnonzero(wip_gap > scan_gap_tolerance),
+    )
+
+
+def _match_features_to_signals(
+        ftr_mzs: np.ndarray,
+        spec_mz: np.ndarray,
         tolerance: float,
-) -> int:
+) -> np.ndarray:
     """
-    Returns the index of the element in `arr` that's closest to `target`.
-    If no elements are found within `tolerance`, returns -1.
-    :param arr: Array to match against `target`
-    :param target: Target value to match against `array`
+    For each feature m/z in `ftr_mzs` (in priority order), returns the index
+    of the closest signal in `spec_mz` that's within `tolerance`, or -1.
+
+    Each signal can only be claimed once: if several features are closest
+    to the same signal, the first one gets it and the rest are unmatched
+    (they do NOT fall back to their next-closest signal).
+    :param ftr_mzs: Latest m/z of each feature, highest priority first
+    :param spec_mz: Signal m/z values. Must be sorted ascending
     :param tolerance: Window for acceptable match
-    :return: Index of `arr` corresponding to the best match, or -1
+    :return: Array of indices into `spec_mz` (or -1), aligned with `ftr_mzs`
     """
-    diff = np.abs(arr - target)
-    min_idx = np.argmin(diff)
-    if diff[min_idx] < tolerance:
-        return min_idx
-    return -1
+    n_peaks = spec_mz.size
+    right = np.searchsorted(spec_mz, ftr_mzs, side='left')
+    right_clipped = np.minimum(right, n_peaks - 1)
+    left_clipped = np.maximum(right - 1, 0)
+    # Duplicate m/z values: np.argmin would pick the first of them
+    left_clipped = np.searchsorted(spec_mz, spec_mz[left_clipped], side='left')
+
+    diff_left = np.where(right > 0, ftr_mzs - spec_mz[left_clipped], np.inf)
+    diff_right = np.where(
+        right < n_peaks, spec_mz[right_clipped] - ftr_mzs, np.inf,
+    )
+    # Strict `<` keeps the left neighbour on exact ties (same as np.argmin)
+    closest = np.where(diff_right < diff_left, right_clipped, left_clipped)
+    matched = np.where(
+        np.minimum(diff_left, diff_right) < tolerance, closest, -1,
+    )
+
+    # Claim-once: keep only the first feature that matched each signal
+    hits = np.flatnonzero(matched != -1)
+    _, first = np.unique(matched[hits], return_index=True)
+    claimed = np.full(ftr_mzs.size, -1, dtype=np.int64)
+    claimed[hits[first]] = matched[hits[first]]
+    return claimed
 
 
 def _get_peaks_higher_than_intsy(
@@ -801,32 +1530,47 @@ def _get_peaks_higher_than_intsy(
 @dataclass
 class Feature:
     total_num_scans: int
-    gap_counter: int = 0
 
     def __post_init__(self):
-        self.array = np.zeros(
-            self.total_num_scans,
-            dtype= [
-                ('mz', 'f8'),
-                ('intsy', 'f8'),
-                ('rt', 'f8'),
-            ]
-        )
+        # Parallel arrays (rather than one structured array) so that
+        #   per-field reads don't stride over the other fields
+        self.mz = np.zeros(self.total_num_scans, dtype=np.float64)
+        self.intsy = np.zeros(self.total_num_scans, dtype=np.float64)
+        self.rt = np.zeros(self.total_num_scans, dtype=np.float64)
+        # Features only ever grow forward in scan order, so the latest
+        #   non-zero scan and the non-zero mask can be tracked on write
+        self.latest_idx: int = -1
+        self.nonzero_mask = np.zeros(self.total_num_scans, dtype=bool)
+
+    def set_scan(
+        self,
+        scan_num: int,
+        mz: float,
+        intsy: float,
+        rt: float,
+    ):
+        """
+        Writes a signal into this feature at `scan_num`
+        """
+        self.mz[scan_num] = mz
+        self.intsy[scan_num] = intsy
+        self.rt[scan_num] = rt
+        if intsy > 0:
+            self.nonzero_mask[scan_num] = True
+            self.latest_idx = scan_num
 
     @property
-    def nonzero_scans(self) -> np.ndarray:
+    def nonzero_mz(self) -> np.ndarray:
         """
-        :return: returns all non-zero elements
+        :return: returns the m/z of all non-zero elements
         """
-        return self.array[
-            np.where(self.array['intsy'] > 0)[0]
-        ]
+        return self.mz[self.nonzero_mask]
 
     @property
-    def latest_scan(self) -> np.ndarray:
+    def latest_intsy(self) -> float:
         """
-        :return: Returns the latest non-zero element
+        :return: Returns the intensity of the latest non-zero element
         """
-        return self.array[
-            np.where(self.array['intsy'] > 0)[0].max()
-        ]
+        if self.latest_idx == -1:
+            raise ValueError("Feature has no non-zero scans")
+        return self.intsy[self.latest_idx]
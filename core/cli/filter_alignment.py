@@ -12,6 +12,8 @@ Available variables in the expression namespace:
 from dataclasses import dataclass, field
 from typing import Optional, TYPE_CHECKING
 
+import numpy as np
+
 if TYPE_CHECKING:
     from core.data_structs import Sample, SampleUUID
     from core.data_structs.alignment import (
@@ -110,9 +112,18 @@ def filter_alignment(
             name = sample_names.get(uuid, str(uuid))
             per_sample_before[name] = per_sample_before.get(name, 0) + 1
 
+    # Base intensities of all analytes at once, as a dense
+    #   (n_analytes, n_samples) matrix; columns follow alignment.sample_uuids
+    col_names = [
+        sample_names.get(uuid, str(uuid)) for uuid in alignment.sample_uuids
+    ]
+    intsy_matrix = (
+        alignment.base_intensities(sample_lookup) if sample_lookup else None
+    )
+
     # Filter
     kept: list['AlignedAnalyte'] = []
-    for analyte in alignment.analytes:
+    for row, analyte in enumerate(alignment.analytes):
         found_names = {
             sample_names[uuid]
             for uuid in analyte.ensemble_map
@@ -121,14 +132,10 @@ def filter_alignment(
 
         # Build intensities dict: sample_name -> base_intsy
         intensities: dict[str, float] = {}
-        if sample_lookup:
-            for uuid, ens_uuid in analyte.ensemble_map.items():
-                sample = sample_lookup.get(uuid)
-                if sample and sample.injection:
-                    ensemble = sample.injection.ensembles.get(ens_uuid)
-                    if ensemble:
-                        name = sample_names.get(uuid, str(uuid))
-                        intensities[name] = ensemble.base_intsy
+        if intsy_matrix is not None:
+            intsy_row = intsy_matrix[row]
+            for col in np.flatnonzero(~np.isnan(intsy_row)).tolist():
+                intensities[col_names[col]] = float(intsy_row[col])
 
         namespace = {
             "n": len(analyte.ensemble_map),
@@ -4,10 +4,27 @@ the scan number's corresponding ScanArray, returns a list of
 FeaturePointers which specify features in the ScanArray that
 have matching peak-shapes (within some correlation R)
 """
+import logging
+import os
+from typing import Optional
+
 import numpy as np
+from scipy import sparse
 
 from core.data_structs import FeaturePointer, ScanArray
 
+logger = logging.getLogger(__name__)
+
+# Fewest scans where both XICs must be nonzero for a correlation to count
+_MIN_NONZERO_OVERLAP = 4  # TODO: Expose to user
+
+# _batch_correlate screens correlations in float32, and recomputes in
+#   float64 any pair whose screened value is within this of the threshold
+#   (or above it). float32 error is orders of magnitude below this
+_SCREEN_MARGIN = 0.02
+# Pairs recomputed together in float64, to bound memory
+_CONFIRM_CHUNK_SIZE = 4096
+
 
 def find_cofeatures_within_scan_array(
     scan_array: 'ScanArray',
@@ -15,6 +32,7 @@ def find_cofeatures_within_scan_array(
     min_correlation: float,
     min_intsy: float,
     use_rel_intsy: bool,
+    search_xic: Optional[np.ndarray] = None,
 ) -> list['FeaturePointer']:
     """
     Given a *SOURCE* ScanArray, and a target FeaturePointer,
@@ -30,46 +48,56 @@ def find_cofeatures_within_scan_array(
         Pearson correlation threshold to be considered cofeature
     :param use_rel_intsy:
         Whether to use absolute or relative intensities when calculating
-        Pearson correlation
+        Pearson correlation. Pearson is invariant to per-XIC scaling, so
+        this doesn't change the result (kept for API compatibility)
+    :param search_xic:
+        search_target's intensities, if the caller already read them
+        (see find_cofeatures_across_scan_array)
     :return:
     """
-    # Find mass lanes within the search scan range that actually have signals
+    if search_xic is None:
+        search_xic = search_target.get_intensity_values(
+            scan_array
+        )
+
+    # Too few nonzeros in the search XIC to correlate with anything
+    if np.count_nonzero(search_xic) < _MIN_NONZERO_OVERLAP:
+        return [search_target]
+
+    # Find mass lanes within the search scan range that actually have
+    #   signals, and enough of them to ever be correlated
     nonzero_mass_lane_idxs = _find_nonzero_mass_lanes(
         scan_array=scan_array,
         scan_idxs=search_target.scan_idxs,
         min_intsy=min_intsy,
+        min_nonzero=_MIN_NONZERO_OVERLAP,
     )
 
     if nonzero_mass_lane_idxs.size == 0:
         return [search_target]
 
-    # Generate XICs for all cofeatures and the search cofeature
-    candidate_xics: np.ndarray[..., ...] = _get_xic_grid(
+    # Generate XICs for all cofeatures and the search cofeature. Raw
+    #   intensities: normalizing each XIC by its max first wouldn't change
+    #   the (scale-invariant) correlation, only cost a pass over the grid
+    candidate_xics: sparse.csr_array = _get_xic_grid(
         mass_lane_idxs=nonzero_mass_lane_idxs,
         scan_array=scan_array,
         scan_start=search_target.scan_start,
         scan_end=search_target.scan_end,
-        use_rel_intsy=use_rel_intsy,
+        use_rel_intsy=False,
     )
-    search_xic = search_target.get_intensity_values(
-        scan_array
-    )
-
-    if use_rel_intsy:
-        search_xic /= search_xic.max()
 
     # Calculate their Pearson correlation coeffs against search_target xic
-    correlations = _calculate_pearson_correlations(
-        candidate_xics,
-        search_xic,
-    )
+    pearson_index = _PearsonIndex(candidate_xics)
+    correlations = pearson_index.correlate(search_xic)
 
-    # For testing:
-    # print("Pearson correlations:")
-    # for xic_idx, mass_lane_idx in enumerate(nonzero_mass_lane_idxs):
-    #     mz = scan_array.mz_lane_label[mass_lane_idx]
-    #     corr = correlations[xic_idx]
-    #     print(f"mz: {mz} \t corr: {corr}")
+    # One vectorized record for debugging, rather than a line per candidate
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Pearson correlations:\nmz: %s\ncorr: %s",
+            scan_array.mz_lane_label[nonzero_mass_lane_idxs],
+            correlations,
+        )
 
     # Get the ones that surpass min corr. threshold
     matching_mass_lane_idxs = _filter_candidates_by_correlation(
@@ -78,30 +106,212 @@ def find_cofeatures_within_scan_array(
         nonzero_mass_lane_idxs,
     )
 
+    matching_mass_lane_idxs = matching_mass_lane_idxs[
+        matching_mass_lane_idxs != search_target.mz_lane_idx
+    ]
+
     matching_cofeatures: list['FeaturePointer'] = [search_target]
-    for mass_lane_idx in matching_mass_lane_idxs:
-        if mass_lane_idx == search_target.mz_lane_idx:
-            continue
-            
-        matching_cofeatures.append(
-            scan_array.make_feature_pointer(
-                mass_lane_idx=mass_lane_idx,
-                scan_idxs=search_target.scan_idxs,
-            ),
+    matching_cofeatures.extend(
+        scan_array.make_feature_pointer_batch(
+            mass_lane_idxs=matching_mass_lane_idxs,
+            scan_idxs=search_target.scan_idxs,
         )
+    )
 
     return matching_cofeatures
 
 
+def find_cofeatures_within_scan_array_batch(
+    scan_array: 'ScanArray',
+    search_targets: list['FeaturePointer'],
+    min_correlation: float,
+    min_intsy: float,
+    use_rel_intsy: bool,
+) -> list[list['FeaturePointer']]:
+    """
+    Same as find_cofeatures_within_scan_array, for many search targets at
+    once. Targets sharing a scan window share one candidate grid, and all
+    of their correlations are taken together by _batch_correlate.
+
+    :return: One list of cofeatures per search target, in input order
+    """
+    # Group targets by scan window. The candidate lanes only depend on
+    #   the window, so a group needs one grid
+    groups: dict[bytes, list[int]] = {}
+    for i, search_target in enumerate(search_targets):
+        key = np.asarray(search_target.scan_idxs, dtype=np.int64).tobytes()
+        groups.setdefault(key, []).append(i)
+
+    results: list[list['FeaturePointer']] = [[] for _ in search_targets]
+    for target_idxs in groups.values():
+        group = [search_targets[i] for i in target_idxs]
+        first = group[0]
+
+        nonzero_mass_lane_idxs = _find_nonzero_mass_lanes(
+            scan_array=scan_array,
+            scan_idxs=first.scan_idxs,
+            min_intsy=min_intsy,
+            min_nonzero=_MIN_NONZERO_OVERLAP,
+        )
+
+        if nonzero_mass_lane_idxs.size == 0:
+            for i, search_target in zip(target_idxs, group):
+                results[i] = [search_target]
+            continue
+
+        col_block: sparse.csr_array = scan_array.get_xic_block(
+            first.scan_start, first.scan_end,
+        )
+        candidate_xics = col_block[nonzero_mass_lane_idxs].toarray()
+        search_xics = col_block[
+            np.fromiter(
+                (t.mz_lane_idx for t in group), dtype=np.int64, count=len(group),
+            )
+        ].toarray()
+
+        pairs = _batch_correlate(search_xics, candidate_xics, min_correlation)
+
+        # argwhere is row-major: split it per search target, candidates
+        #   stay in lane order
+        splits = np.searchsorted(pairs[:, 0], np.arange(1, len(group)))
+        for i, search_target, cols in zip(
+            target_idxs, group, np.split(pairs[:, 1], splits),
+        ):
+            matching_mass_lane_idxs = nonzero_mass_lane_idxs[cols]
+            matching_mass_lane_idxs = matching_mass_lane_idxs[
+                matching_mass_lane_idxs != search_target.mz_lane_idx
+            ]
+
+            results[i] = [search_target]
+            results[i].extend(
+                scan_array.make_feature_pointer_batch(
+                    mass_lane_idxs=matching_mass_lane_idxs,
+                    scan_idxs=search_target.scan_idxs,
+                )
+            )
+
+    return results
+
+
+def _batch_correlate(
+    search_xics: np.ndarray,
+    candidate_xics: np.ndarray,
+    min_correlation: float,
+    min_nonzero_overlap: int = _MIN_NONZERO_OVERLAP,
+) -> np.ndarray:
+    """
+    Overlap-masked Pearson correlation of every search XIC against every
+    candidate XIC (both dense, same scan window), as in
+    _calculate_pearson_correlations.
+
+    The masked moments are each one matrix product, so the whole
+    (n_search x n_candidates) correlation matrix costs a handful of GEMMs
+    instead of a kernel call per search XIC. Those GEMMs are bound by
+    reading the candidate grid, so the matrix is only screened in float32;
+    pairs the screen can't rule out (within _SCREEN_MARGIN of the
+    threshold, or above it) are recomputed in float64 and decided there.
+
+    :return: (search_row, candidate_row) index pairs whose correlation
+             exceeds `min_correlation`, in row-major order
+    """
+    y, search_mask = _shifted_xics(search_xics, np.float32)
+    x, candidate_mask = _shifted_xics(candidate_xics, np.float32)
+
+    n_overlap = search_mask @ candidate_mask.T
+    screen = _masked_pearson(
+        n_overlap=n_overlap,
+        sy=y @ candidate_mask.T,
+        sx=search_mask @ x.T,
+        syy=(y * y) @ candidate_mask.T,
+        sxx=search_mask @ (x * x).T,
+        sxy=y @ x.T,
+    )
+
+    # NaN from rounding (a variance that came out <= 0) is rechecked too;
+    #   the overlap counts are exact, so too little overlap never is
+    rows, cols = np.nonzero(
+        ~(screen <= min_correlation - _SCREEN_MARGIN)
+        & (n_overlap >= min_nonzero_overlap)
+    )
+
+    y, search_mask = _shifted_xics(search_xics, np.float64)
+    keep = np.zeros(rows.size, dtype=bool)
+    for chunk in range(0, rows.size, _CONFIRM_CHUNK_SIZE):
+        pair = slice(chunk, chunk + _CONFIRM_CHUNK_SIZE)
+        x, candidate_mask = _shifted_xics(candidate_xics[cols[pair]], np.float64)
+        pair_y = y[rows[pair]]
+        pair_mask = search_mask[rows[pair]]
+
+        correlations = _masked_pearson(
+            n_overlap=(pair_mask * candidate_mask).sum(axis=1),
+            sy=(pair_y * candidate_mask).sum(axis=1),
+            sx=(pair_mask * x).sum(axis=1),
+            syy=(pair_y * pair_y * candidate_mask).sum(axis=1),
+            sxx=(pair_mask * x * x).sum(axis=1),
+            sxy=(pair_y * x).sum(axis=1),
+        )
+        keep[pair] = correlations > min_correlation
+
+    return np.column_stack((rows[keep], cols[keep]))
+
+
+def _shifted_xics(
+    xics: np.ndarray,
+    dtype: type,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns `xics` (as `dtype`) shifted by the mean of each row's nonzeros
+    and scaled to unit max magnitude, with zeros kept at zero, and the
+    nonzero mask. Pearson over any overlap is unchanged by either, and
+    the one-pass moments of _masked_pearson stay small (no cancellation
+    on raw intensities, no float32 overflow)
+    """
+    xics = np.asarray(xics, dtype=dtype)
+    mask = (xics != 0).astype(dtype)
+
+    n_nonzero = np.maximum(mask.sum(axis=1, keepdims=True), 1)
+    shifted = (xics - xics.sum(axis=1, keepdims=True) / n_nonzero) * mask
+
+    scale = np.abs(shifted).max(axis=1, keepdims=True, initial=0)
+    shifted /= np.where(scale > 0, scale, 1)
+
+    return shifted, mask
+
+
+def _masked_pearson(
+    n_overlap: np.ndarray,
+    sy: np.ndarray,
+    sx: np.ndarray,
+    syy: np.ndarray,
+    sxx: np.ndarray,
+    sxy: np.ndarray,
+) -> np.ndarray:
+    """
+    Pearson correlation from one-pass moments over each overlap (NaN for
+    zero variance). Insufficient overlap is left to the caller
+    """
+    var_y = n_overlap * syy - sy * sy
+    var_x = n_overlap * sxx - sx * sx
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlations = (n_overlap * sxy - sy * sx) / np.sqrt(var_x * var_y)
+
+    correlations[(var_x <= 0) | (var_y <= 0)] = np.nan
+
+    return correlations
+
+
 def _get_xic_grid(
     mass_lane_idxs: np.ndarray,
     scan_array: 'ScanArray',
     scan_start: int,
     scan_end: int,
     use_rel_intsy: bool,
-) -> np.ndarray:
+) -> sparse.csr_array:
     """
-    Generates a 2D np.ndarray representing XICs.
+    Generates a 2D sparse (CSR) array representing XICs. Kept sparse:
+    XIC grids are mostly zeros, and _calculate_pearson_correlations
+    only ever looks at nonzeros.
 
     :param scan_array: ScanArray to parse
     :param mass_lane_idxs: Indices of ScanArray to parse
@@ -109,108 +319,274 @@ def _get_xic_grid(
     :param scan_end: Scan to end with
     :return:
     """
-    candidate_xics = scan_array.intsy_arr[
-                     mass_lane_idxs,
-                     scan_start:scan_end,
-                     ].toarray()
-
+    # Two fast-path slices rather than one mixed (array, slice) index:
+    #   the scan range off the CSC copy (cached per window by the
+    #   ScanArray), then the lanes off CSR
+    col_block: sparse.csr_array = scan_array.get_xic_block(
+        scan_start, scan_end,
+    )
+    candidate_xics: sparse.csr_array = col_block[mass_lane_idxs]
+    candidate_xics.eliminate_zeros()
 
     # If requested, normalize (use_rel_intsy)
     if use_rel_intsy:
-        candidate_xics = (  # Normalize against max intsy in each ms lane
-            candidate_xics
-            /
-            np.max(
-                candidate_xics,
-                axis=1,
-            ).reshape(-1, 1)
+        # Normalize against max intsy in each ms lane, in place on the
+        #   stored values
+        row_max = candidate_xics.max(axis=1).toarray().ravel()
+        row_idxs = np.repeat(
+            np.arange(candidate_xics.shape[0]),
+            np.diff(candidate_xics.indptr),
         )
+        candidate_xics.data = candidate_xics.data / row_max[row_idxs]
 
     return candidate_xics
 
 
 def _find_nonzero_mass_lanes(
     scan_array: 'ScanArray',
-    scan_idxs: np.ndarray,
+    scan_idxs: np.ndarray | slice,
     min_intsy: float,
+    min_nonzero: int = 1,
 ):
-    mass_lane_intsy_max = scan_array.intsy_arr.toarray()[
-                           :, scan_idxs
-                           ].max(axis=1)
-    nonzero_mass_lane_idxs: np.ndarray = np.where(
-        mass_lane_intsy_max > min_intsy,
-    )[0]
+    """
+    Returns the mass lanes whose max intensity within `scan_idxs` exceeds
+    `min_intsy`, and that have at least `min_nonzero` nonzero scans there.
+    Lanes that can't reach a correlation's minimum overlap are pruned here,
+    before any XIC grid is built for them
+    """
+    # Scan windows are almost always a contiguous run of scans. A slice
+    #   takes scipy's cheap column-range path instead of fancy indexing
+    if not isinstance(scan_idxs, slice):
+        scan_idxs = _as_contiguous_slice(scan_idxs)
+
+    # Column-slice the cached CSC copy so only the nonzeros inside the
+    #   scan window are touched (never densify the whole ScanArray)
+    window: sparse.csc_array = scan_array.intsy_arr_csc[:, scan_idxs]
+    mass_lane_intsy_max: np.ndarray = window.max(axis=1).toarray().ravel()
+    keep = mass_lane_intsy_max > min_intsy
+
+    if min_nonzero > 1:
+        # CSC indices are row (lane) ids, one per stored value
+        n_nonzero = np.bincount(
+            window.indices[window.data != 0],
+            minlength=window.shape[0],
+        )
+        keep &= n_nonzero >= min_nonzero
+
+    nonzero_mass_lane_idxs: np.ndarray = np.flatnonzero(keep)
     return nonzero_mass_lane_idxs
 
 
+def _as_contiguous_slice(idxs: np.ndarray) -> np.ndarray | slice:
+    """
+    Returns `idxs` as an equivalent slice if it's a run of consecutive
+    ascending integers, otherwise returns it unchanged
+    """
+    idxs = np.asarray(idxs)
+    if idxs.ndim != 1 or idxs.size == 0:
+        return idxs
+
+    start = int(idxs[0])
+    stop = int(idxs[-1]) + 1
+    if stop - start == idxs.size and np.all(np.diff(idxs) == 1):
+        return slice(start, stop)
+
+    return idxs
+
+
 def _filter_candidates_by_correlation(
     correlations: np.ndarray,
     min_correlation: float,
     mass_lane_idxs: np.ndarray,
+    top_k: Optional[int] = None,
 ) -> np.ndarray:
-    matching_mass_lane_idxs = mass_lane_idxs[
-        np.where(
-            correlations > min_correlation
-        )[0]
-    ]
-    return matching_mass_lane_idxs
+    """
+    Returns the mass lanes whose correlation exceeds `min_correlation`
+    (NaN never does), in their original order. If `top_k` is given, only
+    the `top_k` best-correlated of those are kept.
+    """
+    passing = np.flatnonzero(correlations > min_correlation)
+
+    if top_k is not None and passing.size > top_k:
+        best = np.argpartition(-correlations[passing], top_k - 1)[:top_k]
+        passing = np.sort(passing[best])
+
+    return mass_lane_idxs[passing]
 
 
 def _calculate_pearson_correlations(
-    candidate_xics: np.ndarray[..., ...],
+    candidate_xics: np.ndarray[..., ...] | sparse.sparray,
     search_xic: np.ndarray,
-    min_nonzero_overlap: int = 4,  # TODO: Expose to user
+    min_nonzero_overlap: int = _MIN_NONZERO_OVERLAP,
 ) -> np.ndarray:
     """
     Calculate Pearson correlation considering only non-zero elements.
 
-    :param candidate_xics: 2D array of candidate XICs (n_candidates x n_timepoints)
+    :param candidate_xics: 2D array of candidate XICs (n_candidates x n_timepoints),
+                           dense or sparse
     :param search_xic: 1D array of the search XIC (n_timepoints)
     :param min_nonzero_overlap: Minimum number of overlapping non-zero elements
                                  required for a valid correlation (default: 3)
     :return: Array of correlation coefficients (NaN for insufficient overlap)
     """
-    n_candidates = candidate_xics.shape[0]
-    correlations = np.full(n_candidates, np.nan)
-
-    for i in range(n_candidates):
-        candidate_xic = candidate_xics[i]
-
-        # Find positions where both arrays are non-zero
-        nonzero_mask = (candidate_xic != 0) & (search_xic != 0)
-        n_overlap = np.sum(nonzero_mask)
+    if sparse.issparse(candidate_xics):
+        return _PearsonIndex(candidate_xics).correlate(
+            search_xic,
+            min_nonzero_overlap,
+        )
 
-        # If insufficient overlap, leave as NaN
-        if n_overlap < min_nonzero_overlap:
-            continue
+    # Prefer the numba-JIT kernel when available. Set
+    #   ``MZKIT_DISABLE_NUMBA=1`` to force the NumPy path
+    if _NUMBA_KERNEL_AVAILABLE and not os.environ.get("MZKIT_DISABLE_NUMBA"):
+        return _calculate_pearson_correlations_numba(
+            np.ascontiguousarray(candidate_xics, dtype=np.float64),
+            np.ascontiguousarray(search_xic, dtype=np.float64),
+            int(min_nonzero_overlap),
+        )
 
-        # Extract non-zero overlapping values
-        candidate_nonzero = candidate_xic[nonzero_mask]
-        search_nonzero = search_xic[nonzero_mask]
+    # All candidates at once: every per-row quantity below is a masked
+    #   row reduction, so the Python loop over candidates goes away.
+    #   Still two-pass (centre, then correlate) for the same numerics as
+    #   the per-row version
+    overlap_mask: np.ndarray = (candidate_xics != 0) & (search_xic != 0)
+    n_overlap: np.ndarray = overlap_mask.sum(axis=1)
 
-        # Calculate means of non-zero elements
-        candidate_mean = candidate_nonzero.mean()
-        search_mean = search_nonzero.mean()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        candidate_means = (
+            np.where(overlap_mask, candidate_xics, 0.0).sum(axis=1)
+            / n_overlap
+        )
+        search_means = (overlap_mask @ search_xic) / n_overlap
 
-        # Center the values
-        candidate_centered = candidate_nonzero - candidate_mean
-        search_centered = search_nonzero - search_mean
+        candidate_centered = np.where(
+            overlap_mask,
+            candidate_xics - candidate_means[:, None],
+            0.0,
+        )
+        search_centered = np.where(
+            overlap_mask,
+            search_xic - search_means[:, None],
+            0.0,
+        )
 
-        # Calculate correlation
-        numerator = np.dot(candidate_centered, search_centered)
+        numerator = np.einsum(
+            'ij,ij->i', candidate_centered, search_centered,
+        )
         denominator = np.sqrt(
-            np.sum(candidate_centered ** 2) * np.sum(search_centered ** 2)
+            np.einsum('ij,ij->i', candidate_centered, candidate_centered)
+            * np.einsum('ij,ij->i', search_centered, search_centered)
         )
 
-        # Avoid division by zero
-        if denominator == 0:
-            correlations[i] = np.nan
-        else:
-            correlations[i] = numerator / denominator
+        correlations = numerator / denominator
+
+    # Insufficient overlap or zero variance -> NaN
+    correlations[
+        (n_overlap < min_nonzero_overlap) | (denominator == 0)
+    ] = np.nan
 
     return correlations
 
 
+class _PearsonIndex:
+    """
+    A CSR grid of candidate XICs, prepared once for overlap-masked Pearson
+    correlation against any number of search XICs sharing its scan window.
+
+    Centring can't be cached: the means are taken over each (candidate,
+    search) overlap, which depends on the search XIC. What is cached is
+    everything that doesn't: contiguous CSR buffers and the row id of
+    every stored value.
+
+    Intensities are held as float32: correlation is a peak-shape measure
+    and doesn't need float64 inputs, and the kernels are bound by reading
+    the grid. Sums are still accumulated in float64.
+    """
+    def __init__(self, candidate_xics: sparse.sparray):
+        candidate_xics = sparse.csr_array(candidate_xics)
+        self.n_candidates: int = candidate_xics.shape[0]
+        self.indptr = candidate_xics.indptr.astype(np.int64)
+        self.indices = candidate_xics.indices.astype(np.int64)
+        self.data = candidate_xics.data.astype(np.float32, copy=False)
+        self.row_nnz = np.diff(self.indptr)
+        self.row_idxs = np.repeat(np.arange(self.n_candidates), self.row_nnz)
+
+    def correlate(
+        self,
+        search_xic: np.ndarray,
+        min_nonzero_overlap: int = _MIN_NONZERO_OVERLAP,
+    ) -> np.ndarray:
+        """
+        Same as _calculate_pearson_correlations, but walks only the stored
+        values of the grid. Implicit zeros never overlap, so they're never
+        touched.
+        """
+        search_xic = np.ascontiguousarray(search_xic, dtype=np.float32)
+
+        # Prefilter: the overlap can't exceed either side's nonzero count,
+        #   so sparse candidates (or a sparse search XIC) are NaN without
+        #   looking at their values. (Norm-based bounds don't help here:
+        #   |r| <= 1 holds for every centred pair)
+        if np.count_nonzero(search_xic) < min_nonzero_overlap:
+            return np.full(self.n_candidates, np.nan)
+
+        if (
+            _NUMBA_KERNEL_AVAILABLE
+            and not os.environ.get("MZKIT_DISABLE_NUMBA")
+        ):
+            return _calculate_sparse_pearson_correlations_numba(
+                self.indptr,
+                self.indices,
+                self.data,
+                search_xic,
+                int(min_nonzero_overlap),
+            )
+
+        n_candidates = self.n_candidates
+
+        # Keep only stored values that overlap a nonzero in search_xic
+        search_vals = search_xic[self.indices]
+        overlap = (
+            (self.data != 0)
+            & (search_vals != 0)
+            & (self.row_nnz >= min_nonzero_overlap)[self.row_idxs]
+        )
+        row_idxs = self.row_idxs[overlap]
+        x = self.data[overlap]
+        y = search_vals[overlap]
+
+        n_overlap = np.bincount(row_idxs, minlength=n_candidates)
+
+        # One-pass moments, taken about each row's first overlapping pair
+        #   (as in the numba kernels). Rows are contiguous in CSR order
+        is_first = np.ones(row_idxs.size, dtype=bool)
+        is_first[1:] = row_idxs[1:] != row_idxs[:-1]
+        first_of_row = np.maximum.accumulate(
+            np.where(is_first, np.arange(row_idxs.size), 0)
+        )
+        dx = x.astype(np.float64) - x[first_of_row]
+        dy = y.astype(np.float64) - y[first_of_row]
+
+        def row_sum(weights: np.ndarray) -> np.ndarray:
+            return np.bincount(row_idxs, weights, minlength=n_candidates)
+
+        sx, sy = row_sum(dx), row_sum(dy)
+        var_x = n_overlap * row_sum(dx * dx) - sx * sx
+        var_y = n_overlap * row_sum(dy * dy) - sy * sy
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlations = (
+                (n_overlap * row_sum(dx * dy) - sx * sy)
+                / np.sqrt(var_x * var_y)
+            )
+
+        # Insufficient overlap or zero variance -> NaN
+        correlations[
+            (n_overlap < min_nonzero_overlap) | (var_x <= 0) | (var_y <= 0)
+        ] = np.nan
+
+        return correlations
+
+
 def find_cofeatures_across_scan_array(
     source_scan_array: 'ScanArray',
     target_scan_array: 'ScanArray',
@@ -218,6 +594,7 @@ def find_cofeatures_across_scan_array(
     min_correlation: float,
     min_intsy: float,
     use_rel_intsy: bool,
+    search_xic: Optional[np.ndarray] = None,
 ) -> list['FeaturePointer']:
     """
     Given a *TARGET* ScanArray, and a search_target FeaturePointer,
@@ -239,57 +616,55 @@ def find_cofeatures_across_scan_array(
         Pearson correlation threshold to be considered cofeature
     :param use_rel_intsy:
         Whether to use absolute or relative intensities when calculating
-        Pearson correlation
+        Pearson correlation. Pearson is invariant to per-XIC scaling, so
+        this doesn't change the result (kept for API compatibility)
+    :param search_xic:
+        search_target's intensities (as from get_intensity_values) if the
+        caller already read them, e.g. for the MS1 search of the same
+        pointer. Saves a second pass over the source ScanArray
     :return:
     """
     # Find the search scan range that corresponds to the rt of search_target
-    rts_search: np.ndarray = search_target.get_retention_times(
-        source_scan_array
+    search_target.validate_source(source_scan_array)
+    rt_source, target_scan_start, target_scan_stop = _get_target_scan_window(
+        source_scan_array=source_scan_array,
+        target_scan_array=target_scan_array,
+        search_target=search_target,
     )
-    rt_start = rts_search.min()
-    rt_end = rts_search.max()
-
-    target_scan_idxs: np.ndarray = np.where(
-        (rt_start < target_scan_array.rt_arr) &
-        (target_scan_array.rt_arr < rt_end)
-    )[0]
-    if target_scan_idxs.size == 0:
+    if target_scan_stop <= target_scan_start:
         return []
-    target_scan_start = target_scan_idxs.min()
-    target_scan_end = target_scan_idxs.max()
+    target_scan_end = target_scan_stop - 1
+    target_scan_idxs = np.arange(target_scan_start, target_scan_stop)
 
     # Find mass lanes within the search scan range that actually have signals
     nonzero_mass_lane_idxs = _find_nonzero_mass_lanes(
         scan_array=target_scan_array,
-        scan_idxs=target_scan_idxs,
+        scan_idxs=slice(target_scan_start, target_scan_stop),
         min_intsy=min_intsy,
+        min_nonzero=_MIN_NONZERO_OVERLAP,
     )
 
-    # Get a grid of XIC/intensity values
-    candidate_xics: np.ndarray[..., ...] = _get_xic_grid(
+    # Get a grid of XIC/intensity values (raw; see
+    #   find_cofeatures_within_scan_array)
+    candidate_xics: sparse.csr_array = _get_xic_grid(
         mass_lane_idxs=nonzero_mass_lane_idxs,
         scan_array=target_scan_array,
         scan_start=target_scan_start,
         scan_end=target_scan_end,
-        use_rel_intsy=use_rel_intsy,
+        use_rel_intsy=False,
     )
 
     # Interpolate search_xic based on the retention times of target_scan_array
-    rt_source: np.ndarray = source_scan_array.rt_arr[
-        search_target.scan_start: search_target.scan_end
-    ]
-
-    rt_target: np.ndarray = target_scan_array.rt_arr[
+    rt_target: np.ndarray = target_scan_array.rt_arr_f64[
         target_scan_start:target_scan_end,
     ]
 
-    search_xic: np.ndarray[...,] = search_target.get_intensity_values(
-        source_scan_array,
-    )
-    if use_rel_intsy:
-        search_xic /= search_xic.max()
+    if search_xic is None:
+        search_xic = search_target.get_intensity_values(
+            source_scan_array,
+        )
 
-    interp_search_xic: np.ndarray = np.interp(
+    interp_search_xic: np.ndarray = _interp_monotonic(
         x=rt_target,
         xp=rt_source,
         fp=search_xic,
@@ -297,8 +672,7 @@ def find_cofeatures_across_scan_array(
 
     # Calculate XIC grid Pearson correlation coeffs against *interpolated*
     #   search_target xic
-    correlations = _calculate_pearson_correlations(
-        candidate_xics=candidate_xics,
+    correlations = _PearsonIndex(candidate_xics).correlate(
         search_xic=interp_search_xic,  # type: ignore
     )
 
@@ -309,14 +683,12 @@ def find_cofeatures_across_scan_array(
         mass_lane_idxs=nonzero_mass_lane_idxs,
     )
 
-    matching_cofeatures: list['FeaturePointer'] = []
-    for idx in matching_mass_lane_idxs:
-        matching_cofeatures.append(
-            target_scan_array.make_feature_pointer(
-                mass_lane_idx=idx,
-                scan_idxs=target_scan_idxs, # type: ignore
-            ),
+    matching_cofeatures: list['FeaturePointer'] = list(
+        target_scan_array.make_feature_pointer_batch(
+            mass_lane_idxs=matching_mass_lane_idxs,
+            scan_idxs=target_scan_idxs,  # type: ignore
         )
+    )
 
     # if len(matching_cofeatures) == 0:
     #     print('hi')
@@ -324,6 +696,162 @@ def find_cofeatures_across_scan_array(
     return matching_cofeatures
 
 
+def find_cofeatures_across_scan_array_batch(
+    source_scan_array: 'ScanArray',
+    target_scan_array: 'ScanArray',
+    search_targets: list['FeaturePointer'],
+    min_correlation: float,
+    min_intsy: float,
+    use_rel_intsy: bool,
+) -> list[list['FeaturePointer']]:
+    """
+    Same as find_cofeatures_across_scan_array, for many search targets at
+    once. Targets sharing a scan window map to the same target scans, so
+    they share one candidate grid, and all of their (interpolated) search
+    XICs are correlated against it together by _batch_correlate.
+
+    :return: One list of cofeatures per search target, in input order
+    """
+    groups: dict[tuple[int, int], list[int]] = {}
+    for i, search_target in enumerate(search_targets):
+        search_target.validate_source(source_scan_array)
+        key = (int(search_target.scan_start), int(search_target.scan_end))
+        groups.setdefault(key, []).append(i)
+
+    results: list[list['FeaturePointer']] = [[] for _ in search_targets]
+    for (scan_start, scan_end), target_idxs in groups.items():
+        group = [search_targets[i] for i in target_idxs]
+
+        rt_source, target_scan_start, target_scan_stop = (
+            _get_target_scan_window(
+                source_scan_array=source_scan_array,
+                target_scan_array=target_scan_array,
+                search_target=group[0],
+            )
+        )
+        if target_scan_stop <= target_scan_start:
+            continue
+        target_scan_end = target_scan_stop - 1
+        target_scan_idxs = np.arange(target_scan_start, target_scan_stop)
+
+        nonzero_mass_lane_idxs = _find_nonzero_mass_lanes(
+            scan_array=target_scan_array,
+            scan_idxs=slice(target_scan_start, target_scan_stop),
+            min_intsy=min_intsy,
+            min_nonzero=_MIN_NONZERO_OVERLAP,
+        )
+        if nonzero_mass_lane_idxs.size == 0:
+            continue
+
+        candidate_xics = _get_xic_grid(
+            mass_lane_idxs=nonzero_mass_lane_idxs,
+            scan_array=target_scan_array,
+            scan_start=target_scan_start,
+            scan_end=target_scan_end,
+            use_rel_intsy=False,
+        ).toarray()
+
+        # Every search XIC of the group, interpolated onto the same target
+        #   RTs. Rounded to float32 as _PearsonIndex.correlate does
+        rt_target: np.ndarray = target_scan_array.rt_arr_f64[
+            target_scan_start:target_scan_end
+        ]
+        source_xics = source_scan_array.get_xic_block(
+            scan_start, scan_end,
+        )[
+            np.fromiter(
+                (t.mz_lane_idx for t in group), dtype=np.int64, count=len(group),
+            )
+        ].toarray()
+        search_xics = np.stack([
+            _interp_monotonic(x=rt_target, xp=rt_source, fp=source_xic)
+            for source_xic in source_xics
+        ]).astype(np.float32)
+
+        pairs = _batch_correlate(search_xics, candidate_xics, min_correlation)
+
+        # argwhere is row-major: split it per search target
+        splits = np.searchsorted(pairs[:, 0], np.arange(1, len(group)))
+        for i, cols in zip(target_idxs, np.split(pairs[:, 1], splits)):
+            results[i] = list(
+                target_scan_array.make_feature_pointer_batch(
+                    mass_lane_idxs=nonzero_mass_lane_idxs[cols],
+                    scan_idxs=target_scan_idxs,  # type: ignore
+                )
+            )
+
+    return results
+
+
+def _get_target_scan_window(
+    source_scan_array: 'ScanArray',
+    target_scan_array: 'ScanArray',
+    search_target: 'FeaturePointer',
+) -> tuple[np.ndarray, int, int]:
+    """
+    Returns the source RTs of `search_target`'s scan window, and the
+    [start, stop) range of target scans strictly inside that RT range
+    (empty if stop <= start). Both arrays' RTs are read through their
+    cached float64 copies.
+    """
+    rt_source: np.ndarray = source_scan_array.rt_arr_f64[
+        search_target.scan_start: search_target.scan_end
+    ]
+    rt_start = rt_source.min()
+    rt_end = rt_source.max()
+
+    # rt_arr is sorted, so that's one contiguous block, found by binary
+    #   search
+    target_rt_arr: np.ndarray = target_scan_array.rt_arr_f64
+    target_scan_start = int(np.searchsorted(
+        target_rt_arr, rt_start, side='right',
+    ))
+    target_scan_stop = int(np.searchsorted(
+        target_rt_arr, rt_end, side='left',
+    ))
+    return rt_source, target_scan_start, target_scan_stop
+
+
+def _interp_monotonic(
+    x: np.ndarray,
+    xp: np.ndarray,
+    fp: np.ndarray,
+) -> np.ndarray:
+    """
+    Same as np.interp(x, xp, fp) for increasing `xp`. When `xp` is (near)
+    evenly spaced, as scan RTs usually are, each `x` is mapped straight to
+    its bracketing interval instead of binary-searching for it.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    xp = np.asarray(xp, dtype=np.float64)
+    if xp.size < 2 or x.size == 0:
+        return np.interp(x, xp, fp)
+
+    step = (xp[-1] - xp[0]) / (xp.size - 1)
+    if not step > 0:
+        return np.interp(x, xp, fp)
+
+    # Guess each point's interval from the mean spacing, then nudge the
+    #   guess by one interval to absorb jitter in the spacing
+    x_clamped = np.clip(x, xp[0], xp[-1])
+    lo_idxs = np.clip(
+        ((x_clamped - xp[0]) / step).astype(np.intp), 0, xp.size - 2,
+    )
+    lo_idxs -= (lo_idxs > 0) & (x_clamped < xp[lo_idxs])
+    lo_idxs += (lo_idxs < xp.size - 2) & (x_clamped >= xp[lo_idxs + 1])
+
+    # Spacing too uneven for one nudge to find the interval
+    if np.any(
+        (x_clamped < xp[lo_idxs]) | (x_clamped > xp[lo_idxs + 1])
+    ):
+        return np.interp(x, xp, fp)
+
+    fp = np.asarray(fp, dtype=np.float64)
+    x_lo = xp[lo_idxs]
+    frac = (x_clamped - x_lo) / (xp[lo_idxs + 1] - x_lo)
+    return fp[lo_idxs] + frac * (fp[lo_idxs + 1] - fp[lo_idxs])
+
+
 def get_all_features_in_scan_array(
     scan_array: 'ScanArray',
     rt_start: float,
@@ -383,3 +911,152 @@ def backfill_isotope_envelope(
     pass
 
 
+# ---------------------------------------------------------------------------
+# numba-JIT kernel
+# ---------------------------------------------------------------------------
+# Same overlap-masked Pearson as ``_calculate_pearson_correlations``, one
+# candidate per ``prange`` iteration (dense grid, or CSR buffers). Rows with
+# too little overlap bail out after the counting pass instead of doing
+# masked work for nothing.
+
+try:
+    from numba import njit, prange
+    _NUMBA_KERNEL_AVAILABLE = True
+except ImportError:
+    _NUMBA_KERNEL_AVAILABLE = False
+
+
+if _NUMBA_KERNEL_AVAILABLE:
+
+    # Reassociation lets LLVM split the row reductions across SIMD lanes
+    #   (and fuse multiply-adds); the loop bodies are written branch-free
+    #   (selects, not ifs) so they can be vectorized at all. No nnan/ninf:
+    #   NaN results are part of the contract
+    _SIMD_FASTMATH = {'reassoc', 'contract'}
+
+    @njit(cache=True)
+    def _pearson_from_moments(
+        k: int,
+        sx: float,
+        sy: float,
+        sxx: float,
+        syy: float,
+        sxy: float,
+    ) -> float:
+        """
+        Pearson r from streamed (shifted) moments; NaN for zero variance.
+        Rounding can push a zero variance slightly negative, hence <= 0.
+        """
+        var_x = k * sxx - sx * sx
+        var_y = k * syy - sy * sy
+        if var_x <= 0 or var_y <= 0:
+            return np.nan
+        return (k * sxy - sx * sy) / np.sqrt(var_x * var_y)
+
+    @njit(parallel=True, cache=True, fastmath=_SIMD_FASTMATH)
+    def _calculate_pearson_correlations_numba(
+        candidate_xics: np.ndarray,   # float64[n_candidates, n_timepoints]
+        search_xic: np.ndarray,       # float64[n_timepoints]
+        min_nonzero_overlap: int,
+    ) -> np.ndarray:
+        n_candidates, n_timepoints = candidate_xics.shape
+        correlations = np.full(n_candidates, np.nan)
+
+        search_nonzero = search_xic != 0
+
+        for i in prange(n_candidates):
+            row = candidate_xics[i]
+
+            # Moments are taken about the first overlapping pair rather
+            #   than about zero. Keeps the one-pass formula well
+            #   conditioned, and a constant row exactly zero-variance
+            t0 = 0
+            while t0 < n_timepoints and not (
+                search_nonzero[t0] and row[t0] != 0
+            ):
+                t0 += 1
+            if t0 == n_timepoints:
+                continue
+            shift_x = row[t0]
+            shift_y = search_xic[t0]
+
+            # One streaming pass over the row
+            k = 0
+            sx = 0.0
+            sy = 0.0
+            sxx = 0.0
+            syy = 0.0
+            sxy = 0.0
+            for t in range(t0, n_timepoints):
+                x = row[t]
+                overlap = search_nonzero[t] and x != 0
+                dx = x - shift_x if overlap else 0.0
+                dy = search_xic[t] - shift_y if overlap else 0.0
+                k += 1 if overlap else 0
+                sx += dx
+                sy += dy
+                sxx += dx * dx
+                syy += dy * dy
+                sxy += dx * dy
+
+            if k < min_nonzero_overlap:
+                continue
+
+            correlations[i] = _pearson_from_moments(k, sx, sy, sxx, syy, sxy)
+
+        return correlations
+
+    @njit(parallel=True, cache=True)
+    def _calculate_sparse_pearson_correlations_numba(
+        indptr: np.ndarray,      # int64[n_candidates + 1]
+        indices: np.ndarray,     # int64[nnz]
+        data: np.ndarray,        # float32[nnz]
+        search_xic: np.ndarray,  # float32[n_timepoints]
+        min_nonzero_overlap: int,
+    ) -> np.ndarray:
+        n_candidates = indptr.shape[0] - 1
+        correlations = np.full(n_candidates, np.nan)
+
+        for i in prange(n_candidates):
+            row_end = indptr[i + 1]
+
+            # Too few stored values to ever reach the overlap threshold
+            if row_end - indptr[i] < min_nonzero_overlap:
+                continue
+
+            # Shift about the first overlapping pair (see the dense kernel)
+            p0 = indptr[i]
+            while p0 < row_end and not (
+                data[p0] != 0 and search_xic[indices[p0]] != 0
+            ):
+                p0 += 1
+            if p0 == row_end:
+                continue
+            shift_x = float(data[p0])
+            shift_y = float(search_xic[indices[p0]])
+
+            k = 0
+            sx = 0.0
+            sy = 0.0
+            sxx = 0.0
+            syy = 0.0
+            sxy = 0.0
+            for p in range(p0, row_end):
+                x = data[p]
+                y = search_xic[indices[p]]
+                if x != 0 and y != 0:
+                    dx = x - shift_x
+                    dy = y - shift_y
+                    k += 1
+                    sx += dx
+                    sy += dy
+                    sxx += dx * dx
+                    syy += dy * dy
+                    sxy += dx * dy
+
+            if k < min_nonzero_overlap:
+                continue
+
+            correlations[i] = _pearson_from_moments(k, sx, sy, sxx, syy, sxy)
+
+        return correlations
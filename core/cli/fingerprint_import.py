@@ -1,6 +1,7 @@
 """
 Imports fingerprint .csv's as Sample objects
 """
+import numpy as np
 import pandas as pd
 
 from core.utils.filesystem import all_filepaths_exist
@@ -20,6 +21,13 @@ if TYPE_CHECKING:
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+# pyarrow is optional; pandas' C parser is used without it
+try:
+    import pyarrow  # noqa: F401
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    _PYARROW_AVAILABLE = False
+
 
 def csv_to_fingerprint(
         params: 'FingerprintImportParams',
@@ -41,6 +49,8 @@ def csv_to_fingerprint(
     df = pd.read_csv(
         params.csv_path,
         index_col=0,
+        # Multithreaded parsing for wide fingerprint tables, if available
+        engine='pyarrow' if _PYARROW_AVAILABLE else 'c',
     )
 
     if not params.samples_in_rows:
@@ -52,15 +62,19 @@ def csv_to_fingerprint(
     if params.sample_names:
         df = df.loc[params.sample_names]
 
-    # Iterate over dataframe and construct Fingerprints
+    # Pull the table out of pandas once, rather than boxing every row
+    #   into a Series with iterrows(). Fingerprints store float32, so cast
+    #   once here and each row becomes a view rather than a copy
+    arrays: np.ndarray = np.ascontiguousarray(df.to_numpy(dtype=np.float32))
+    samplenames: list[str] = df.index.tolist()
+    descriptors: list[str] = df.columns.tolist()
+
+    # Construct Fingerprints. They all share one interned DescriptorPanel
     samples: list[Sample] = []
-    for samplename, array in df.iterrows():
-        samplename: str
-        array: pd.Series
-        
+    for samplename, array in zip(samplenames, arrays):
         fingerprint = Fingerprint(
-            array=array.to_numpy(),  # type: ignore
-            descriptors=list(df.columns),
+            array=array,
+            descriptors=descriptors,
         )
 
         sample = Sample(
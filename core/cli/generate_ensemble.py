@@ -6,14 +6,16 @@ feature pointer (from the MS1 array).
 These must be set to an Injection to be viable
 """
 from collections import defaultdict
-from typing import NamedTuple, TYPE_CHECKING
+from typing import NamedTuple, Optional, TYPE_CHECKING
 
 import numpy as np
 
 from core.data_structs import Ensemble
 from core.cli.find_cofeatures import (
     find_cofeatures_within_scan_array,
+    find_cofeatures_within_scan_array_batch,
     find_cofeatures_across_scan_array,
+    find_cofeatures_across_scan_array_batch,
     get_all_features_in_scan_array, # for testing
 )
 from core.cli.segment_chromatogram import find_peak_boundaries, validate_peak
@@ -68,8 +70,37 @@ def get_cofeature_ensembles(
     :return:
     """
 
+    # MS1 cofeatures for every search pointer in one batched pass
+    #   (pointers sharing a scan window are correlated together)
+    ms1_cofeatures_per_ptr = find_cofeatures_within_scan_array_batch(
+        scan_array=injection.scan_array_ms1,
+        search_targets=search_ftr_ptrs,
+        min_correlation=ms1_corr_threshold,
+        min_intsy=min_intsy,
+        use_rel_intsy=use_rel_intsy,
+    )
+
+    # DIA MS2 cofeatures, batched the same way
+    ms2_cofeatures_per_ptr: list[Optional[list['FeaturePointer']]] = (
+        [None] * len(search_ftr_ptrs)
+    )
+    if (
+        injection.acquisition_mode != 'dda'
+        and injection.scan_array_ms2 is not None
+    ):
+        ms2_cofeatures_per_ptr = find_cofeatures_across_scan_array_batch(
+            source_scan_array=injection.scan_array_ms1,
+            target_scan_array=injection.scan_array_ms2,
+            search_targets=search_ftr_ptrs,
+            min_correlation=ms2_corr_threshold,
+            min_intsy=min_intsy,
+            use_rel_intsy=use_rel_intsy,
+        )
+
     ensembles: list[Ensemble] = []
-    for search_ftr_ptr in search_ftr_ptrs:
+    for search_ftr_ptr, ms1_cofeatures, ms2_cofeatures in zip(
+        search_ftr_ptrs, ms1_cofeatures_per_ptr, ms2_cofeatures_per_ptr,
+    ):
         ensemble = get_cofeature_ensemble(
             injection=injection,
             min_intsy=min_intsy,
@@ -78,12 +109,18 @@ def get_cofeature_ensembles(
             search_ftr_ptr=search_ftr_ptr,
             use_rel_intsy=use_rel_intsy,
             precursor_mz_tolerance=precursor_mz_tolerance,
+            ms1_cofeatures=ms1_cofeatures,
+            ms2_cofeatures=ms2_cofeatures,
+            register=False,
         )
 
         ensembles.append(
             ensemble
         )
 
+    # Registered together, so their intensities are read in one pass
+    injection.add_ensembles(ensembles)
+
     return ensembles
 
 
@@ -95,16 +132,42 @@ def get_cofeature_ensemble(
     min_intsy: float,
     use_rel_intsy: bool,
     precursor_mz_tolerance: float = 0.5,
+    ms1_cofeatures: Optional[list['FeaturePointer']] = None,
+    ms2_cofeatures: Optional[list['FeaturePointer']] = None,
+    register: bool = True,
 ) -> Ensemble:
-    ms1_cofeatures = find_cofeatures_within_scan_array(
-        scan_array=injection.scan_array_ms1,
-        search_target=search_ftr_ptr,
-        min_correlation=ms1_corr_threshold,
-        min_intsy=min_intsy,
-        use_rel_intsy=use_rel_intsy,
+    """
+    Extracts one Ensemble around `search_ftr_ptr`. If `ms1_cofeatures` or
+    (DIA) `ms2_cofeatures` were already found (e.g. by
+    get_cofeature_ensembles' batched searches), they're used
+    as-is instead of being searched for again.
+
+    With `register=False` the Ensemble isn't added to `injection`; the
+    caller must (e.g. with Injection.add_ensembles)
+    """
+    search_ms2 = (
+        injection.acquisition_mode != 'dda'
+        and ms2_cofeatures is None
+        and injection.scan_array_ms2 is not None
     )
 
-    ms2_cofeatures: list['FeaturePointer'] = []
+    # Read the search XIC off MS1 once, for both searches below
+    search_xic: Optional[np.ndarray] = None
+    if ms1_cofeatures is None or search_ms2:
+        search_xic = search_ftr_ptr.get_intensity_values(
+            injection.scan_array_ms1,
+        )
+
+    if ms1_cofeatures is None:
+        ms1_cofeatures = find_cofeatures_within_scan_array(
+            scan_array=injection.scan_array_ms1,
+            search_target=search_ftr_ptr,
+            min_correlation=ms1_corr_threshold,
+            min_intsy=min_intsy,
+            use_rel_intsy=use_rel_intsy,
+            search_xic=search_xic,
+        )
+
     precursor_mz: 'float | None' = None
     precursor_charge: 'int | None' = None
 
@@ -119,7 +182,7 @@ def get_cofeature_ensemble(
                 precursor_mz_tolerance=precursor_mz_tolerance,
             )
         )
-    elif injection.scan_array_ms2 is not None:
+    elif search_ms2:
         # DIA / MS1_only-but-MS2-present: original correlation path.
         ms2_cofeatures = find_cofeatures_across_scan_array(
             source_scan_array=injection.scan_array_ms1,
@@ -128,16 +191,18 @@ def get_cofeature_ensemble(
             min_correlation=ms2_corr_threshold,
             min_intsy=min_intsy,
             use_rel_intsy=use_rel_intsy,
+            search_xic=search_xic,
         )
 
     ensemble = Ensemble(
         ms1_cofeatures=ms1_cofeatures,
-        ms2_cofeatures=ms2_cofeatures,
+        ms2_cofeatures=ms2_cofeatures or [],
         precursor_mz=precursor_mz,
         precursor_charge=precursor_charge,
     )
 
-    injection.add_ensemble(ensemble)
+    if register:
+        injection.add_ensemble(ensemble)
     return ensemble
 
 
@@ -170,7 +235,10 @@ def _dda_link_ms2_cofeatures(
 
     # m/z of every MS1 cofeature (lane-label mean is good enough for matching).
     cofeature_mzs = ms1_arr.mz_lane_label[
-        [cf.mz_lane_idx for cf in ms1_cofeatures]
+        np.fromiter(
+            (cf.mz_lane_idx for cf in ms1_cofeatures),
+            dtype=np.int64, count=len(ms1_cofeatures),
+        )
     ]
 
     # Mask MS2 scans by RT window.
@@ -358,105 +426,113 @@ def auto_generate_ensembles(
 
     ensembles: list[Ensemble] = []
 
-    while True:
-        seed_lane_idx: int = int(np.argmax(lane_max_intsy))
+    try:
+        while True:
+            seed_lane_idx: int = int(np.argmax(lane_max_intsy))
 
-        if lane_max_intsy[seed_lane_idx] < params.parent_threshold:
-            break
+            if lane_max_intsy[seed_lane_idx] < params.parent_threshold:
+                break
 
-        # Extract this lane's chromatogram, zeroing assigned regions
-        chromatogram: np.ndarray = (
-            scan_array.intsy_arr[seed_lane_idx]
-            .toarray()
-            .flatten()
-        )
-        if rt_mask is not None:
-            chromatogram[rt_mask] = 0
-        for start, end in assigned_ranges.get(seed_lane_idx, []):
-            chromatogram[start:end] = 0
-
-        max_scan_idx: int = int(np.argmax(chromatogram))
-
-        if chromatogram[max_scan_idx] < params.parent_threshold:
-            lane_max_intsy[seed_lane_idx] = 0
-            continue
-
-        # Find consumption boundaries (valley/edge-aware)
-        seg_start, seg_end = find_peak_boundaries(
-            chromatogram,
-            max_scan_idx,
-            edge_fraction=params.edge_fraction,
-        )
-
-        # Validate: is this a real peak worth extracting?
-        if not validate_peak(
-            chromatogram,
-            max_scan_idx,
-            seg_start,
-            seg_end,
-            min_rise_ratio=params.min_rise_ratio,
-            min_peak_width=params.min_peak_width,
-        ):
-            # Bad peak: zero out and skip, no cofeatures consumed
-            _zero_out_lane_region(
-                seed_lane_idx, seg_start, seg_end,
-                assigned_ranges, lane_max_intsy, scan_array,
+            # Extract this lane's chromatogram, zeroing assigned regions
+            chromatogram: np.ndarray = (
+                scan_array.intsy_arr[seed_lane_idx]
+                .toarray()
+                .flatten()
+            )
+            if rt_mask is not None:
+                chromatogram[rt_mask] = 0
+            for start, end in assigned_ranges.get(seed_lane_idx, []):
+                chromatogram[start:end] = 0
+
+            max_scan_idx: int = int(np.argmax(chromatogram))
+
+            if chromatogram[max_scan_idx] < params.parent_threshold:
+                lane_max_intsy[seed_lane_idx] = 0
+                continue
+
+            # Find consumption boundaries (valley/edge-aware)
+            seg_start, seg_end = find_peak_boundaries(
+                chromatogram,
+                max_scan_idx,
+                edge_fraction=params.edge_fraction,
             )
-            continue
-
-        # Build extraction window: +-N scans around apex,
-        # but clamped to peak boundaries for narrow peaks
-        ext_start = max(seg_start, max_scan_idx - params.extraction_half_width)
-        ext_end = min(seg_end, max_scan_idx + params.extraction_half_width + 1)
-        extraction_scan_idxs = np.arange(ext_start, ext_end)
-
-        seed_ftr_ptr = scan_array.make_feature_pointer(
-            mass_lane_idx=seed_lane_idx,
-            scan_idxs=extraction_scan_idxs,
-        )
 
-        # Find MS1 cofeatures
-        ms1_cofeatures = find_cofeatures_within_scan_array(
-            scan_array=scan_array,
-            search_target=seed_ftr_ptr,
-            min_correlation=params.ms1_corr_threshold,
-            min_intsy=params.cofeature_threshold,
-            use_rel_intsy=params.use_rel_intsy,
-        )
+            # Validate: is this a real peak worth extracting?
+            if not validate_peak(
+                chromatogram,
+                max_scan_idx,
+                seg_start,
+                seg_end,
+                min_rise_ratio=params.min_rise_ratio,
+                min_peak_width=params.min_peak_width,
+            ):
+                # Bad peak: zero out and skip, no cofeatures consumed
+                _zero_out_lane_region(
+                    seed_lane_idx, seg_start, seg_end,
+                    assigned_ranges, lane_max_intsy, scan_array,
+                )
+                continue
+
+            # Build extraction window: +-N scans around apex,
+            # but clamped to peak boundaries for narrow peaks
+            ext_start = max(seg_start, max_scan_idx - params.extraction_half_width)
+            ext_end = min(seg_end, max_scan_idx + params.extraction_half_width + 1)
+            extraction_scan_idxs = np.arange(ext_start, ext_end)
+
+            seed_ftr_ptr = scan_array.make_feature_pointer(
+                mass_lane_idx=seed_lane_idx,
+                scan_idxs=extraction_scan_idxs,
+            )
 
-        # Find MS2 cofeatures (if MS2 data exists)
-        ms2_cofeatures: list['FeaturePointer'] = []
-        if injection.scan_array_ms2 is not None:
-            ms2_cofeatures = find_cofeatures_across_scan_array(
-                source_scan_array=scan_array,
-                target_scan_array=injection.scan_array_ms2,
+            # Find MS1 cofeatures. The seed's XIC is read once, for both
+            #   searches
+            seed_xic = seed_ftr_ptr.get_intensity_values(scan_array)
+            ms1_cofeatures = find_cofeatures_within_scan_array(
+                scan_array=scan_array,
                 search_target=seed_ftr_ptr,
-                min_correlation=params.ms2_corr_threshold,
+                min_correlation=params.ms1_corr_threshold,
                 min_intsy=params.cofeature_threshold,
                 use_rel_intsy=params.use_rel_intsy,
+                search_xic=seed_xic,
             )
 
-        ensemble = Ensemble(
-            ms1_cofeatures=ms1_cofeatures,
-            ms2_cofeatures=ms2_cofeatures,
-        )
-        injection.add_ensemble(ensemble)
-        ensembles.append(ensemble)
+            # Find MS2 cofeatures (if MS2 data exists)
+            ms2_cofeatures: list['FeaturePointer'] = []
+            if injection.scan_array_ms2 is not None:
+                ms2_cofeatures = find_cofeatures_across_scan_array(
+                    source_scan_array=scan_array,
+                    target_scan_array=injection.scan_array_ms2,
+                    search_target=seed_ftr_ptr,
+                    min_correlation=params.ms2_corr_threshold,
+                    min_intsy=params.cofeature_threshold,
+                    use_rel_intsy=params.use_rel_intsy,
+                    search_xic=seed_xic,
+                )
+
+            ensemble = Ensemble(
+                ms1_cofeatures=ms1_cofeatures,
+                ms2_cofeatures=ms2_cofeatures,
+            )
+            ensembles.append(ensemble)
 
-        # Zero out the seed lane's consumption region (full peak,
-        # not just extraction window)
-        _zero_out_lane_region(
-            seed_lane_idx, seg_start, seg_end,
-            assigned_ranges, lane_max_intsy, scan_array,
-        )
+            # Zero out the seed lane's consumption region (full peak,
+            # not just extraction window)
+            _zero_out_lane_region(
+                seed_lane_idx, seg_start, seg_end,
+                assigned_ranges, lane_max_intsy, scan_array,
+            )
 
-        # Mark cofeature extraction regions as assigned
-        _mark_assigned(
-            ms1_cofeatures,
-            assigned_ranges,
-            lane_max_intsy,
-            scan_array,
-        )
+            # Mark cofeature extraction regions as assigned
+            _mark_assigned(
+                ms1_cofeatures,
+                assigned_ranges,
+                lane_max_intsy,
+                scan_array,
+            )
+    finally:
+        # Registered together, so their intensities are read in one pass.
+        #   Ensembles built before an error are still kept
+        injection.add_ensembles(ensembles)
 
     return ensembles
 
@@ -292,11 +292,10 @@ def pregroup_features(
         seed_feat, _, seed_ftr_ptr, seed_scan_array = feat_info[i]
         groups.append(seed_feat)
 
-        # Extract seed chromatogram (normalized)
+        # Extract seed chromatogram. Raw intensities: Pearson is invariant
+        #   to per-XIC scaling, so normalizing by the max changes nothing
         seed_xic = seed_ftr_ptr.get_intensity_values(seed_scan_array)
-        if seed_xic.max() > 0:
-            seed_xic_norm = seed_xic / seed_xic.max()
-        else:
+        if not seed_xic.max() > 0:
             continue
 
         # Collect candidates within RT tolerance
@@ -340,9 +339,6 @@ def pregroup_features(
                 xic = np.zeros_like(seed_xic)
                 xic[:other_xic.size] = other_xic
 
-            if xic.max() > 0:
-                xic = xic / xic.max()
-
             candidate_xics.append(xic)
 
         if not candidate_xics:
@@ -353,7 +349,7 @@ def pregroup_features(
         # Use the same correlation function as cofeature finding
         correlations = _calculate_pearson_correlations(
             candidate_xics=candidate_xic_arr,
-            search_xic=seed_xic_norm,
+            search_xic=seed_xic,
         )
 
         for k, j in enumerate(candidates):
@@ -3,13 +3,20 @@ Imports .mzML files as Sample objects
 """
 import pyopenms as oms
 
+from core.utils.config import get_cache_dir, load_config
 from core.utils.filesystem import all_filepaths_exist
 from core.data_structs.injection import Injection
 from core.data_structs.sample import Sample
+from core.data_structs.uuid_types import new_uuid
 
 import argparse
+import functools
+import hashlib
 import logging
+import os
+import pickle
 import threading
+from itertools import repeat
 from pathlib import Path
 # TESTING
 import time
@@ -22,7 +29,159 @@ if TYPE_CHECKING:
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+# Bytes read from each end of a file for its cache key
+_CACHE_KEY_EDGE_BYTES = 64 * 1024
 
+# Part of every cache key. Cached Injections are unpickled as they were
+#   built (no __post_init__), so bump this whenever Injection, ScanArray or
+#   build_scan_array change what an import produces
+_CACHE_FORMAT_VERSION = 1
+
+
+def _cached_injection(func):
+    """
+    Caches mzml_to_injection's result on disk, keyed by a fingerprint of
+    the input file (size, mtime and its first/last 64 KiB), the import
+    parameters and _CACHE_FORMAT_VERSION, so re-importing an unchanged
+    file skips parsing.
+
+    Off unless enabled in the config ([injection_cache] enabled). Entries
+    are evicted least-recently-used first once the cache grows past
+    [injection_cache] max_size_mb. Set ``MZKIT_DISABLE_INJECTION_CACHE=1``
+    to always parse, whatever the config says.
+    """
+    @functools.wraps(func)
+    def wrapper(
+            input_filepath: Path,
+            scan_array_params,
+            acquisition_mode: str = 'ms1_only',
+            **kwargs,
+    ) -> Injection:
+        config = load_config()
+        if (
+            os.environ.get("MZKIT_DISABLE_INJECTION_CACHE")
+            or not config.getboolean(
+                'injection_cache', 'enabled', fallback=False,
+            )
+        ):
+            return func(
+                input_filepath, scan_array_params, acquisition_mode, **kwargs,
+            )
+        max_bytes = int(
+            config.getfloat('injection_cache', 'max_size_mb', fallback=2048)
+            * 1024 * 1024
+        )
+
+        cache_key = _injection_cache_key(
+            input_filepath, scan_array_params, acquisition_mode,
+        )
+        cache_path = get_cache_dir() / 'injections' / f"{cache_key}.pkl"
+
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'rb') as f:
+                    injection: Injection = pickle.load(f)
+                # mtime marks recent use, for eviction
+                os.utime(cache_path)
+                logger.debug(f"Loaded {input_filepath.name} from cache")
+                return _with_fresh_uuids(injection)
+            except Exception as e:
+                logger.warning(
+                    f"Ignoring unreadable cache entry {cache_path}: {e}"
+                )
+
+        injection = func(
+            input_filepath, scan_array_params, acquisition_mode, **kwargs,
+        )
+
+        # The MSExperiment isn't picklable (and isn't needed once the
+        #   ScanArrays are built), so it's left out of the cached copy.
+        #   Written to a temp file then renamed, as parallel imports may
+        #   race on the same entry
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+            exp, injection.exp = injection.exp, None
+            try:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(injection, f, protocol=5)
+            finally:
+                injection.exp = exp
+            os.replace(tmp_path, cache_path)
+            _evict_cached_injections(cache_path.parent, max_bytes)
+        except Exception as e:
+            logger.warning(
+                f"Could not cache {input_filepath.name}: {e}"
+            )
+
+        return injection
+
+    return wrapper
+
+
+def _evict_cached_injections(
+        cache_dir: Path,
+        max_bytes: int,
+) -> None:
+    """
+    Deletes the least recently used entries in `cache_dir` until it holds
+    at most `max_bytes`. This also clears out entries orphaned by edited
+    files or an older _CACHE_FORMAT_VERSION
+    """
+    entries = []
+    for path in cache_dir.glob('*.pkl'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # Evicted by a parallel import
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def _injection_cache_key(
+        input_filepath: Path,
+        scan_array_params: tuple,
+        acquisition_mode: str,
+) -> str:
+    stat = input_filepath.stat()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(input_filepath, 'rb') as f:
+        h.update(f.read(_CACHE_KEY_EDGE_BYTES))
+        if stat.st_size > _CACHE_KEY_EDGE_BYTES:
+            f.seek(max(
+                _CACHE_KEY_EDGE_BYTES,
+                stat.st_size - _CACHE_KEY_EDGE_BYTES,
+            ))
+            h.update(f.read())
+    h.update(repr((
+        _CACHE_FORMAT_VERSION, scan_array_params, acquisition_mode,
+    )).encode())
+    return h.hexdigest()
+
+
+def _with_fresh_uuids(
+        injection: Injection,
+) -> Injection:
+    """
+    A cached Injection is a new import: give it (and its ScanArrays) new
+    uuids so it never collides with an earlier import of the same file
+    """
+    injection.uuid = new_uuid()
+    for scan_array in (injection.scan_array_ms1, injection.scan_array_ms2):
+        if scan_array is not None:
+            scan_array.uuid = new_uuid()
+    return injection
+
+
+@_cached_injection
 def mzml_to_injection(
         input_filepath: Path,
         scan_array_params: tuple[
@@ -45,11 +204,19 @@ def mzml_to_injection(
 
 
 
-    exp = oms.MSExperiment()
-    oms.MzMLFile().load(
-        str(input_filepath),
-        exp,
-    )
+    # Indexed .mzML files are read on disk, so spectra are streamed into
+    #   the ScanArrays instead of all being held in memory at once.
+    #   Files without an index have to be loaded whole
+    exp = oms.OnDiscMSExperiment()
+    if not exp.openFile(str(input_filepath)):
+        logger.debug(
+            f"{input_filepath.name} has no index, loading it into memory"
+        )
+        exp = oms.MSExperiment()
+        oms.MzMLFile().load(
+            str(input_filepath),
+            exp,
+        )
 
     injection = Injection(
         exp=exp,
@@ -102,63 +269,93 @@ def main(
     # Validate inputs
     _validate(input_filepaths, sample_names)
 
-    # Generate Sample objects
+    # Generate Sample objects, one file at a time. The GUI already runs
+    #   this whole function in a worker process (executor_kind='process'),
+    #   so files aren't spread over a second, nested pool
     total = len(input_filepaths)
     samples: list[Sample] = []
-    for i, (sample_name, filepath) in enumerate(zip(
+    jobs = zip(
         sample_names,
         input_filepaths,
+        repeat(scan_array_params),
+        repeat(acquisition_mode),
+    )
+
+    results = map(_import_one, jobs)
+
+    if progress_callback is not None:
+        progress_callback(0.0, f"Importing {total} file(s)")
+
+    for i, (sample_name, filepath, result) in enumerate(zip(
+        sample_names,
+        input_filepaths,
+        results,
     )):
-        # Cooperative cancellation between files. Partial result (samples
-        # imported so far) is preserved and returned to the GUI.
-        if cancel_event is not None and cancel_event.is_set():
+        if isinstance(result, Exception):
+            logger.warning(
+                f"Error processing {sample_name}: \n"
+                f"{result}"
+            )
+        else:
+            samples.append(result)
             logger.info(
-                f"Import cancelled after {len(samples)}/{total} samples"
+                f"Imported {filepath.name}"
             )
-            break
 
         if progress_callback is not None:
             progress_callback(
-                100.0 * i / total,
-                f"Importing {filepath.name} ({i + 1}/{total})",
+                100.0 * (i + 1) / total,
+                f"Imported {filepath.name} ({i + 1}/{total})",
             )
 
-        try:
-
+        # Cooperative cancellation between files. Partial result
+        #   (samples imported so far) is preserved and returned to
+        #   the GUI
+        if cancel_event is not None and cancel_event.is_set():
             logger.info(
-                f"Importing {filepath.name}"
+                f"Import cancelled after {len(samples)}/{total} samples"
             )
-            t0 = time.perf_counter()
+            break
 
-            injection = mzml_to_injection(
-                    input_filepath=filepath,
-                    scan_array_params=scan_array_params,
-                    acquisition_mode=acquisition_mode,
-                )
+    if progress_callback is not None and not (cancel_event and cancel_event.is_set()):
+        progress_callback(100.0, "Done")
 
-            samples.append(
-                Sample(
-                    name=sample_name,
-                    injection=injection,
-                )
-            )
+    return samples
 
-            t1 = time.perf_counter()
-            logger.info(
-                f"Done ({t1 - t0:.1f} sec)"
-            )
 
+def _import_one(
+        job: tuple[str, Path, tuple, str],
+) -> Sample | ValueError:
+    """
+    Imports one .mzML file as a Sample. A ValueError (e.g. missing MS
+    level) is returned rather than raised so one bad file doesn't abort
+    the whole batch.
 
-        except ValueError as e:
-            logger.warning(
-                f"Error processing {sample_name}: \n"
-                f"{e}"
-            )
+    The parsed MSExperiment is dropped from the Injection: it isn't
+    picklable (the Sample is sent back from a worker process), and
+    nothing reads it once the ScanArrays are built
+    """
+    sample_name, filepath, scan_array_params, acquisition_mode = job
+    try:
+        t0 = time.perf_counter()
+
+        injection = mzml_to_injection(
+            input_filepath=filepath,
+            scan_array_params=scan_array_params,
+            acquisition_mode=acquisition_mode,
+        )
+        injection.exp = None
 
-    if progress_callback is not None and not (cancel_event and cancel_event.is_set()):
-        progress_callback(100.0, "Done")
+        logger.info(
+            f"Done {filepath.name} ({time.perf_counter() - t0:.1f} sec)"
+        )
+        return Sample(
+            name=sample_name,
+            injection=injection,
+        )
 
-    return samples
+    except ValueError as e:
+        return e
 
 
 def _validate(input_filepaths, sample_names):
@@ -171,7 +368,9 @@ def _validate(input_filepaths, sample_names):
             f"input_filepaths and sample_names are not the same length. "
             f"({len(input_filepaths)} vs {len(sample_names)}"
         )
-    if len(input_filepaths) != len(set(input_filepaths)):
+    # Paths are compared by their string form: hashing a str is cheaper
+    #   than Path.__hash__, and Path already normalized it
+    if len(input_filepaths) != len(set(map(str, input_filepaths))):
         raise ValueError(
             "input_filepaths contains duplicates"
         )
@@ -1,20 +1,38 @@
+import os
 import threading
+import time
 import queue
 import importlib.util
 import importlib
+import multiprocessing
 import traceback
 import logging
-from typing import Literal, Any, Union, Optional, TextIO
+import weakref
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from types import ModuleType
+from typing import Literal, Any, Callable, Union, Optional, TextIO
 
 
 from typing import Literal
 
 
-class ProcessRunner(
-    threading.Thread,
-):
+class ProcessRunner:
     """
-    Runs a Python function/script in a background thread.
+    Runs a Python function/script in the background, on a thread pool
+    shared by every ProcessRunner (so submitting a job doesn't start a new
+    OS thread). Imported modules are cached by module path.
+
+    Pool threads are daemons, so quitting doesn't wait for running jobs.
+    shutdown() (called when the GUI quits) also cancels them, and stops
+    the worker-process pool.
+
+    With ``executor_kind='process'`` the function itself runs in a shared
+    pool of worker processes instead (so CPU-bound Python work doesn't
+    hold the GUI's GIL); the pool thread just relays its logs, progress
+    and cancellation. Only use it for functions whose parameters and
+    return value are picklable and that don't mutate their arguments:
+    changes made in the worker are not seen by the caller.
 
     Every wrapped function is unconditionally called with two extra kwargs:
       - ``progress_callback(percent: float, message: str = "")`` — emits a
@@ -25,19 +43,49 @@ class ProcessRunner(
 
     Functions that don't need progress/cancellation should still accept
     these two kwargs and ignore them.
+
+    The module is imported when the runner is created, so import errors
+    show up (logged, with status 'error') before the job is submitted.
+    An optional ``warmup(module)`` hook then runs on the caller's thread,
+    e.g. to call @njit functions on tiny inputs so JIT compilation happens
+    before the job rather than inside it. For 'process' jobs it only warms
+    this process, not the workers.
+
+    Consumers that don't want to poll can set ``listener``: a no-argument
+    callable, called from the job's threads whenever output, progress or
+    status may have changed (possibly more often; it should only schedule
+    a read, e.g. by emitting a queued Qt signal).
     """
+    _MODULE_CACHE: dict[str, ModuleType] = {}
+    _FILE_MODULE_CACHE: dict[tuple[str, int], ModuleType] = {}
+    _EXECUTOR: '_DaemonThreadPool' = None  # set below the class
+    # Runners whose jobs haven't finished, for shutdown()
+    _LIVE_RUNNERS: 'weakref.WeakSet[ProcessRunner]' = weakref.WeakSet()
+    # Started on first use by a 'process' job
+    _PROCESS_EXECUTOR: Optional[ProcessPoolExecutor] = None
+    _MANAGER = None
+    _PROCESS_POOL_LOCK = threading.Lock()
+    # How often a 'process' job's relay loop checks on the worker
+    _RELAY_INTERVAL = 0.05  # seconds
+
     def __init__(
             self,
             module_path: str,
             function_name: str = "main",
             parameters: Optional[dict[str, Any]] = None,
             log_level: int = logging.INFO,
+            executor_kind: Literal['thread', 'process'] = 'thread',
+            warmup: Optional[Callable[[ModuleType], None]] = None,
     ):
-        super().__init__()
         self.module_path = module_path
         self.function_name = function_name
         self.parameters = parameters or {}
-        self.output_queue: queue.Queue = queue.Queue()
+        self.executor_kind = executor_kind
+        self.log_level = log_level
+        # Log output arrives in batches (see QueueLogHandler); messages
+        # of a batch not yet handed out by get_output() wait here.
+        self.output_queue: _OutputQueue = _OutputQueue()
+        self._pending_output: deque[tuple[str, str]] = deque()
         # Progress updates: (percent: float, message: str). Kept separate from
         # output_queue so progress polling doesn't interleave with log polling.
         self.progress_queue: queue.Queue = queue.Queue()
@@ -46,8 +94,11 @@ class ProcessRunner(
         self.cancel_event: threading.Event = threading.Event()
         self.status: Literal['ready', 'running', 'completed', 'failed', 'error', 'cancelled'] = 'ready'
         self.progress: str = ""
-        self.daemon = True  # Allow main program to exit
         self.result = None
+        self._future: Optional[Future] = None
+        self.listener: Optional[Callable[[], None]] = None
+        # Set once run() is done with status, result and logging
+        self.finished: bool = False
 
         # Set up a logger for this process
         self.logger = logging.getLogger(
@@ -62,10 +113,75 @@ class ProcessRunner(
 
         # Handler that puts log messages into queue
         self.queue_handler = QueueLogHandler(
-            self.output_queue
+            self.output_queue,
+            on_emit=self._notify,
         )
         self.logger.addHandler(self.queue_handler)
 
+        # Import now rather than in run(); a failure is kept and re-raised
+        # there, so the job still ends as 'error'
+        self._module: Optional[ModuleType] = None
+        self._import_error: Optional[Exception] = None
+        try:
+            self._module = self._import_module()
+        except Exception as e:
+            self._import_error = e
+
+        if warmup is not None and self._module is not None:
+            try:
+                warmup(self._module)
+            except Exception as e:
+                # A failed warmup only costs the JIT time it meant to save
+                self.logger.warning(
+                    f"Warmup failed for {self.module_path}: {e}"
+                )
+
+
+    def start(
+            self
+    ) -> None:
+        """
+        Submit this job to the shared pool
+        """
+        self._LIVE_RUNNERS.add(self)
+        self._future = self._EXECUTOR.submit(self.run)
+
+
+    @classmethod
+    def shutdown(
+            cls
+    ) -> None:
+        """
+        Cancel every running job and stop the worker-process pool, without
+        waiting for either. Called when the application quits. Worker
+        processes are terminated: the interpreter would otherwise wait on
+        their jobs at exit
+        """
+        for runner in list(cls._LIVE_RUNNERS):
+            runner.cancel_event.set()
+
+        with cls._PROCESS_POOL_LOCK:
+            executor = cls._PROCESS_EXECUTOR
+            if executor is not None:
+                cls._PROCESS_EXECUTOR = None
+                # ProcessPoolExecutor.terminate_workers() is 3.14+
+                workers = list((executor._processes or {}).values())
+                executor.shutdown(wait=False, cancel_futures=True)
+                for worker in workers:
+                    worker.terminate()
+            if cls._MANAGER is not None:
+                cls._MANAGER.shutdown()
+                cls._MANAGER = None
+
+
+    def is_alive(
+            self
+    ) -> bool:
+        """
+        Whether the job has been submitted and hasn't finished yet
+        """
+        return self._future is not None and not self._future.done()
+
 
     def run(
             self
@@ -79,30 +195,9 @@ class ProcessRunner(
                 f"Starting process: {self.module_path}.{self.function_name}"
             )
 
-            # Import the module
-            try:
-                # First, try importing as a regular package
-                module = importlib.import_module(
-                    self.module_path
-                )
-            except ImportError:
-                # If that fails, try loading from a filepath
-                try:
-                    spec = importlib.util.spec_from_file_location(
-                        name="dynamic_module",
-                        location=self.module_path,
-                    )
-                    if spec is None or spec.loader is None:
-                        raise ImportError(
-                            f"Could not load module from {self.module_path}"
-                        )
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                except Exception as e:
-                    self.logger.error(
-                        f"Failed to import module: {e}"
-                    )
-                    raise
+            if self._module is None:
+                raise self._import_error
+            module = self._module
 
             # Get the function
             if not hasattr(module, self.function_name):
@@ -123,11 +218,14 @@ class ProcessRunner(
             # injects progress_callback + cancel_event; callees must accept
             # them (even if just to ignore).
             try:
-                self.result = func(
-                    **self.parameters,
-                    progress_callback=self._emit_progress,
-                    cancel_event=self.cancel_event,
-                )
+                if self.executor_kind == 'process':
+                    self.result = self._run_in_process()
+                else:
+                    self.result = func(
+                        **self.parameters,
+                        progress_callback=self._emit_progress,
+                        cancel_event=self.cancel_event,
+                    )
                 if self.cancel_event.is_set():
                     self.status = "cancelled"
                     self.logger.info(
@@ -159,6 +257,155 @@ class ProcessRunner(
             self.logger.error(
                 str(traceback.format_exc()),
             )
+        finally:
+            self.finished = True
+            self._LIVE_RUNNERS.discard(self)
+            # The final status may not have been logged (log_level)
+            self._notify()
+
+
+    def _notify(
+            self
+    ) -> None:
+        listener = self.listener
+        if listener is not None:
+            try:
+                listener()
+            except Exception:
+                # Never let a listener take down the job
+                pass
+
+
+    def _run_in_process(
+            self
+    ) -> Any:
+        """
+        Run the function on the shared process pool, relaying its log
+        output and progress into this runner's queues, and this runner's
+        cancel_event into the worker, until it finishes
+        """
+        executor, manager = self._get_process_pool()
+        log_queue = manager.Queue()
+        progress_queue = manager.Queue()
+        cancel_event = manager.Event()
+
+        future = executor.submit(
+            _run_module_func,
+            self.module_path,
+            self.function_name,
+            self.parameters,
+            self.log_level,
+            log_queue,
+            progress_queue,
+            cancel_event,
+        )
+
+        def relay() -> None:
+            relayed = False
+            for src, dst in (
+                    (log_queue, self.output_queue),
+                    (progress_queue, self.progress_queue),
+            ):
+                while True:
+                    try:
+                        dst.put(src.get_nowait())
+                        relayed = True
+                    except queue.Empty:
+                        break
+            if relayed:
+                self._notify()
+
+        while not future.done():
+            if self.cancel_event.is_set() and not cancel_event.is_set():
+                cancel_event.set()
+            relay()
+            wait([future], timeout=self._RELAY_INTERVAL)
+        relay()
+
+        return future.result()
+
+
+    @classmethod
+    def _get_process_pool(
+            cls
+    ) -> tuple[ProcessPoolExecutor, Any]:
+        """
+        The shared worker-process pool, and a Manager for the queues and
+        events it shares with runners. spawn, not fork: runners live on
+        threads, and forking a multithreaded process isn't safe
+        """
+        with cls._PROCESS_POOL_LOCK:
+            if cls._PROCESS_EXECUTOR is None:
+                ctx = multiprocessing.get_context('spawn')
+                cls._MANAGER = ctx.Manager()
+                cls._PROCESS_EXECUTOR = ProcessPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    mp_context=ctx,
+                )
+            return cls._PROCESS_EXECUTOR, cls._MANAGER
+
+
+    def _import_module(
+            self
+    ) -> ModuleType:
+        try:
+            return self.load_module(self.module_path)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to import module: {e}"
+            )
+            raise
+
+
+    @classmethod
+    def load_module(
+            cls,
+            module_path: str,
+    ) -> ModuleType:
+        """
+        Import the module at `module_path` (an import path, or failing
+        that a file path), or reuse the one imported for an earlier job.
+        Modules loaded from a file path are keyed on the file's mtime too,
+        so an edited script is loaded afresh
+        """
+        module = cls._MODULE_CACHE.get(module_path)
+        if module is not None:
+            return module
+
+        try:
+            # First, try importing as a regular package
+            module = importlib.import_module(
+                module_path
+            )
+        except ImportError:
+            # If that fails, try loading from a filepath
+            return cls._load_module_from_file(module_path)
+
+        return cls._MODULE_CACHE.setdefault(module_path, module)
+
+
+    @classmethod
+    def _load_module_from_file(
+            cls,
+            module_path: str,
+    ) -> ModuleType:
+        key = (module_path, os.stat(module_path).st_mtime_ns)
+        module = cls._FILE_MODULE_CACHE.get(key)
+        if module is not None:
+            return module
+
+        spec = importlib.util.spec_from_file_location(
+            name="dynamic_module",
+            location=module_path,
+        )
+        if spec is None or spec.loader is None:
+            raise ImportError(
+                f"Could not load module from {module_path}"
+            )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        return cls._FILE_MODULE_CACHE.setdefault(key, module)
 
 
     def get_output(
@@ -173,13 +420,19 @@ class ProcessRunner(
         :param timeout: Seconds to timeout (if blocking)
         :return: (stream, message) tuple, or None
         """
-        try:
-            return self.output_queue.get(
-                block=block,
-                timeout=timeout,
-            )
-        except queue.Empty:
-            return None
+        if not self._pending_output:
+            self.queue_handler.flush()
+            try:
+                self._pending_output.extend(
+                    self.output_queue.get(
+                        block=block,
+                        timeout=timeout,
+                    )
+                )
+            except queue.Empty:
+                return None
+
+        return self._pending_output.popleft()
 
 
     def _emit_progress(
@@ -193,6 +446,7 @@ class ProcessRunner(
         except Exception:
             # Never let progress reporting take down the worker
             pass
+        self._notify()
 
     def get_progress(self) -> Optional[tuple[float, str]]:
         """Return the most recent progress update, or None."""
@@ -208,40 +462,264 @@ class ProcessRunner(
         """
         Get all available output, without blocking
         """
-        all_output = []
+        self.queue_handler.flush()
+        all_output = list(self._pending_output)
+        self._pending_output.clear()
         while True:
             try:
-                output = self.output_queue.get_nowait()
-                all_output.append(output)
+                batch = self.output_queue.get_nowait()
+                all_output.extend(batch)
             except queue.Empty:
                 break
 
         return all_output
 
 
+class _DaemonThreadPool:
+    """
+    Minimal stand-in for ThreadPoolExecutor whose threads are daemons:
+    ThreadPoolExecutor's threads are joined at interpreter exit, so
+    quitting would wait for every running job. Threads are started as
+    jobs are submitted, up to `max_workers`, and then reused
+    """
+    def __init__(
+            self,
+            max_workers: int,
+            thread_name_prefix: str,
+    ):
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        # Released by a thread each time it goes idle (as in
+        #   ThreadPoolExecutor), so a submit can reuse it
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+
+    def submit(
+            self,
+            fn: Callable[[], Any],
+    ) -> Future:
+        future = Future()
+        self._jobs.put((future, fn))
+        if self._idle.acquire(timeout=0):
+            return future
+
+        with self._lock:
+            if len(self._threads) < self._max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"{self._thread_name_prefix}_{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+
+    def _work(
+            self
+    ) -> None:
+        while True:
+            future, fn = self._jobs.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn())
+                except BaseException as e:
+                    future.set_exception(e)
+            # Drop references before idling on the next job
+            del future, fn
+            self._idle.release()
+
+
+ProcessRunner._EXECUTOR = _DaemonThreadPool(
+    max_workers=os.cpu_count(),
+    thread_name_prefix="ProcessRunner",
+)
+
+
+def _run_module_func(
+        module_path: str,
+        function_name: str,
+        parameters: dict[str, Any],
+        log_level: int,
+        log_queue,
+        progress_queue,
+        cancel_event,
+) -> Any:
+    """
+    Worker-process side of ProcessRunner's 'process' jobs. Logs of the
+    target module go to `log_queue` and progress to `progress_queue`;
+    the parent relays both
+    """
+    func = getattr(ProcessRunner.load_module(module_path), function_name)
+
+    handler = QueueLogHandler(log_queue)
+    # Unbatched: the parent's get_output() can't flush this process's
+    #   buffer, so a buffered record would wait on the next one
+    handler.BATCH_SIZE = 1
+    module_logger = logging.getLogger(module_path)
+    original_handlers = list(module_logger.handlers)
+    original_level = module_logger.level
+    module_logger.addHandler(handler)
+    module_logger.setLevel(log_level)
+
+    def progress_callback(
+            percent: float,
+            message: str = "",
+    ) -> None:
+        try:
+            progress_queue.put((float(percent), str(message)))
+        except Exception:
+            # Never let progress reporting take down the worker
+            pass
+
+    try:
+        return func(
+            **parameters,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+    finally:
+        handler.flush()
+        module_logger.handlers = original_handlers
+        module_logger.setLevel(original_level)
+
+
+class _OutputQueue:
+    """
+    The queue between a runner's QueueLogHandler and its reader, both
+    threads of this process. deque.append()/popleft() are atomic under the
+    GIL, so unlike queue.Queue a put takes no lock; an Event only wakes
+    readers blocked in get(). Single reader; same interface (and
+    queue.Empty) as queue.Queue.
+    """
+    def __init__(
+            self,
+    ):
+        self._items: deque = deque()
+        self._ready = threading.Event()
+
+
+    def put(
+            self,
+            item,
+    ) -> None:
+        self._items.append(item)
+        self._ready.set()
+
+
+    def get(
+            self,
+            block: bool = True,
+            timeout: Optional[float] = None,
+    ):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                if not block:
+                    raise queue.Empty
+
+            # Clear, then look again: a put() landing in between has
+            # already appended, so it isn't missed
+            self._ready.clear()
+            if self._items:
+                continue
+
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Empty
+            self._ready.wait(remaining)
+
+
+    def get_nowait(
+            self,
+    ):
+        return self.get(block=False)
+
+
 class QueueLogHandler(logging.Handler):
     """
-    A logging handler that puts logs into a queue
+    A logging handler that puts logs into a queue.
+
+    Records are buffered per emitting thread and put on the queue as a
+    tuple of (level, message) pairs, once BATCH_SIZE have built up or
+    FLUSH_INTERVAL seconds have passed since that thread last flushed.
+    flush() (called by the consumer before reading) drains every buffer,
+    so nothing waits on the next record to show up. Order is kept per
+    thread, not across threads. `on_emit`, if given, is called after
+    every record, to tell the consumer there's something to read.
     """
+    BATCH_SIZE = 64
+    FLUSH_INTERVAL = 0.05  # seconds
+
     def __init__(
             self,
             output_queue,
+            on_emit: Optional[Callable[[], None]] = None,
     ):
         super().__init__()
         self.output_queue = output_queue
+        self.on_emit = on_emit
+        self._local = threading.local()
+        # Every thread's buffer, so flush() can reach all of them
+        self._buffers: list[deque[tuple[str, str]]] = []
 
 
     def emit(
             self,
             record,
     ):
+        # Runs under self.lock (held by Handler.handle), as does flush()
         try:
             # Format the record
             msg = self.format(record)
 
-            # Put in queue with level as first element
-            self.output_queue.put(
+            buffer = getattr(self._local, 'buffer', None)
+            if buffer is None:
+                buffer = self._local.buffer = deque()
+                self._local.last_flush = 0.0
+                self._buffers.append(buffer)
+
+            # Level first, then message
+            buffer.append(
                 (record.levelname.lower(), msg)
             )
+
+            now = time.monotonic()
+            if (
+                len(buffer) >= self.BATCH_SIZE
+                or now - self._local.last_flush > self.FLUSH_INTERVAL
+            ):
+                self._put_batch(buffer)
+                self._local.last_flush = now
+
+            if self.on_emit is not None:
+                self.on_emit()
         except Exception as e:
-            self.handleError(record)
\ No newline at end of file
+            self.handleError(record)
+
+
+    def flush(
+            self,
+    ):
+        """
+        Put every thread's buffered records on the queue
+        """
+        with self.lock:
+            for buffer in self._buffers:
+                self._put_batch(buffer)
+
+
+    def _put_batch(
+            self,
+            buffer: deque,
+    ):
+        if buffer:
+            self.output_queue.put(tuple(buffer))
+            buffer.clear()
@@ -6,7 +6,9 @@ from PyQt5.QtCore import (
 )
 import logging
 import threading
-from typing import Optional, TYPE_CHECKING
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Callable, Literal, Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from gui.controllers.main_controller import MainController
 
@@ -15,9 +17,13 @@ class ProcessSignals(QObject):
     """
     Defines the signals available for commnuicating process events
     """
-    output_ready = pyqtSignal(int, str, str)  # process_id, level, msg
+    # process_id, [(level, msg), ...]: everything a process logged since
+    # its last batch
+    output_batch_ready = pyqtSignal(int, list)
     status_changed = pyqtSignal(int, str)  # process_id, new_status
     process_finished = pyqtSignal(int, object)  # process_id, result
+    # Emitted from a process's own threads when it has something new
+    process_activity = pyqtSignal(int)  # process_id
 
 
 class ProcessController:
@@ -42,18 +48,29 @@ class ProcessController:
 
         # Signals object for process communication
         self.process_signals = ProcessSignals()
-        self.process_signals.output_ready.connect(self._handle_process_output)
+        self.process_signals.output_batch_ready.connect(self._handle_process_output)
         self.process_signals.status_changed.connect(self._handle_status_change)
         self.process_signals.process_finished.connect(self._handle_process_finished)
+        # Processes push activity (see ProcessRunner.listener); the queued
+        # connection runs _poll_process on the GUI thread
+        self.process_signals.process_activity.connect(
+            self._poll_process,
+            Qt.QueuedConnection,
+        )
+        # Processes with a process_activity signal in flight, so a chatty
+        # process queues one poll at a time rather than one per record
+        self._activity_pending: set[int] = set()
 
-        # Create a timer for continuously polling processes
+        # Slow watchdog poll, as a fallback for anything not pushed
         self.process_poll_timer = QTimer()
-        self.process_poll_timer.setInterval(100)  # 100ms
+        self.process_poll_timer.setInterval(1000)  # 1s
         self.process_poll_timer.timeout.connect(self._poll_active_processes)
         self.process_poll_timer.start()
 
-        # Use a thread-safe dictionary for processes
-        self._processes_lock = threading.RLock()
+        # Copy-on-write: writers build a new dict (serialized by
+        # _processes_lock) and swap it in, so readers never lock. Don't
+        # mutate running_processes in place
+        self._processes_lock = threading.Lock()
         self.running_processes: dict[int, ProcessRunner] = {}
         self.last_known_status: dict[int, str] = {}
 
@@ -69,6 +86,8 @@ class ProcessController:
             parameters: Optional[dict[str, any]] = None,
             on_completion_func: Optional[callable] = None,
             log_level: Optional[int] = None,
+            executor_kind: Literal['thread', 'process'] = 'thread',
+            warmup: Optional[Callable[[ModuleType], None]] = None,
     ) -> int:
         """
         Start a function/process in the background
@@ -78,6 +97,11 @@ class ProcessController:
         :param on_completion_func: Function that's called upon process completion,
             with the results
         :param log_level: Optional log level override
+        :param executor_kind: 'process' runs the function in a worker
+            process (see ProcessRunner); only for picklable, side-effect
+            free functions
+        :param warmup: Optional hook called with the imported module before
+            the process starts (see ProcessRunner)
         :return: process_id (int)
         """
         if not log_level:
@@ -88,13 +112,18 @@ class ProcessController:
             function_name=function_name,
             parameters=parameters,
             log_level=log_level,
+            executor_kind=executor_kind,
+            warmup=warmup,
         )
 
         process_id = self.process_counter
         self.process_counter += 1
 
         with self._processes_lock:
-            self.running_processes[process_id] = process
+            self.running_processes = {
+                **self.running_processes,
+                process_id: process,
+            }
             self.last_known_status[process_id] = process.status
 
         # Register the 'on_completion' function, so it receives the output
@@ -102,6 +131,7 @@ class ProcessController:
         if on_completion_func:
             self.return_func_registry[process_id] = on_completion_func
 
+        process.listener = lambda: self._on_process_activity(process_id)
         process.start()
         self.model.addProcess(
             process_id=process_id,
@@ -123,6 +153,8 @@ class ProcessController:
             function_name: str,
             parameters: Optional[dict[str, any]] = None,
             log_level: Optional[int] = None,
+            executor_kind: Literal['thread', 'process'] = 'thread',
+            warmup: Optional[Callable[[ModuleType], None]] = None,
     ) -> ProcessRunner:
         """
         Create a process runner for the specified Python function
@@ -131,6 +163,8 @@ class ProcessController:
         :param function_name: Name of the function to call
         :param parameters: Dictionary of parameters to pass to the function
         :param log_level: Optional log level override
+        :param executor_kind: 'thread' or 'process'
+        :param warmup: Optional hook called with the imported module
         :return: ProcessRunner instance
         """
         return ProcessRunner(
@@ -138,6 +172,8 @@ class ProcessController:
             function_name=function_name,
             parameters=parameters,
             log_level=log_level,
+            executor_kind=executor_kind,
+            warmup=warmup,
         )
 
 
@@ -146,15 +182,14 @@ class ProcessController:
             process_id: int,
     ) -> Optional[ProcessRunner]:
         """
-        Get a process by ID (thread-safe)
+        Get a process by ID (thread-safe, lock-free)
 
         :param process_id: ID of the process
         :return: ProcessRunner instance, or None
         """
-        with self._processes_lock:
-            return self.running_processes.get(
-                process_id
-            )
+        return self.running_processes.get(
+            process_id
+        )
 
 
     def get_process_status(
@@ -243,20 +278,41 @@ class ProcessController:
 
 
     def cleanup_completed_processes(
-            self
+            self,
+            pids: Optional[list[int]] = None,
     ) -> list[int]:
         """
         Remove completed or failed processes from the running list
 
+        :param pids: Processes known to have finished (and been reported);
+            if None, every process is checked
         :return: List of process IDs that were cleaned up
         """
-        to_remove = []
-        for pid, process in self.running_processes.items():
-            if process.status in ["completed", "failed", "error", "cancelled"]:
-                to_remove.append(pid)
+        with self._processes_lock:
+            if pids is not None:
+                to_remove = [
+                    pid for pid in pids if pid in self.running_processes
+                ]
+            else:
+                to_remove = []
+                for pid, process in self.running_processes.items():
+                    # Kept until its finish has been reported (see
+                    # _poll_process)
+                    if (
+                        process.status in ["completed", "failed", "error", "cancelled"]
+                        and pid not in self.last_known_status
+                    ):
+                        to_remove.append(pid)
+
+            if to_remove:
+                self.running_processes = {
+                    pid: process
+                    for pid, process in self.running_processes.items()
+                    if pid not in to_remove
+                }
 
         for pid in to_remove:
-            del self.running_processes[pid]
+            self.return_func_registry.pop(pid, None)
             self.logger.debug(
                 f"Cleaned up process {pid}"
             )
@@ -291,100 +347,124 @@ class ProcessController:
         return False
 
 
+    def _on_process_activity(
+            self,
+            process_id: int,
+    ) -> None:
+        """
+        ProcessRunner listener; called from the process's threads
+        """
+        if process_id not in self._activity_pending:
+            self._activity_pending.add(process_id)
+            self.process_signals.process_activity.emit(process_id)
+
+
     def _poll_active_processes(
             self
     ) -> None:
         """
         Poll all active processes for output and status changes.
 
-        Called by a QTimer at regular intervals
+        Called by the watchdog QTimer; routine updates arrive through
+        process_activity instead
         :return:
         """
-        processes_to_remove = []
+        for process_id in list(self.last_known_status):
+            self._poll_process(process_id)
 
-        for process_id, status in self.last_known_status.items():
-            # Check for new output:
-            while True:
-                output = self.get_process_output(
-                    process_id,
-                    block=False,
-                )
-
-                if not output:
-                    break
 
-                level, message = output
+    def _poll_process(
+            self,
+            process_id: int,
+    ) -> None:
+        """
+        Read a process's new output, progress and status, and emit the
+        corresponding signals
+        :param process_id:
+        :return:
+        """
+        # Cleared first: activity from here on queues another poll
+        self._activity_pending.discard(process_id)
 
-                # Emit signal with the output
-                self.process_signals.output_ready.emit(
-                    process_id, level, message
-                )
+        status = self.last_known_status.get(process_id)
+        if status is None:
+            # Already finished
+            return
 
-            # Check for progress updates (latest-wins)
-            process = self.get_process(process_id)
-            if process is not None:
-                progress = process.get_progress()
-                if progress is not None:
-                    percent, prog_msg = progress
-                    prog_str = (
-                        f"{percent:.0f}% ; {prog_msg}" if prog_msg
-                        else f"{percent:.0f}%"
-                    )
-                    self.model.updateProcess(
-                        process_id=process_id,
-                        progress=prog_str,
-                    )
-
-            # Check for status changes
-            current_status = self.get_process_status(
-                process_id
+        # Check for new output, all of it in one signal
+        outputs = self.get_all_process_output(process_id)
+        if outputs:
+            self.process_signals.output_batch_ready.emit(
+                process_id, outputs,
             )
 
-            last_known_status = status
-
-            if current_status != last_known_status:
-                self.last_known_status[process_id] = current_status
-                self.process_signals.status_changed.emit(
-                    process_id, current_status,
+        # Check for progress updates (latest-wins)
+        process = self.get_process(process_id)
+        if process is not None:
+            progress = process.get_progress()
+            if progress is not None:
+                percent, prog_msg = progress
+                prog_str = (
+                    f"{percent:.0f}% ; {prog_msg}" if prog_msg
+                    else f"{percent:.0f}%"
+                )
+                self.model.updateProcess(
+                    process_id=process_id,
+                    progress=prog_str,
                 )
 
-                # If process is completed, failed, or has an error:
-                if current_status in ["completed", "failed", "error", "cancelled"]:
-                    result = self.get_process_result(
-                        process_id
-                    )
+        # Check for status changes
+        current_status = self.get_process_status(
+            process_id
+        )
 
-                    self.process_signals.process_finished.emit(
-                        process_id, result,
-                    )
+        # A final status is only reported once the process has also
+        #   finished logging, so no output arrives after process_finished
+        if (
+            current_status in ["completed", "failed", "error", "cancelled"]
+            and process is not None
+            and not process.finished
+        ):
+            return
+
+        if current_status != status:
+            self.last_known_status[process_id] = current_status
+            self.process_signals.status_changed.emit(
+                process_id, current_status,
+            )
 
-                    processes_to_remove.append(process_id)
+            # If process is completed, failed, or has an error:
+            if current_status in ["completed", "failed", "error", "cancelled"]:
+                # Stop tracking its status
+                del self.last_known_status[process_id]
 
-                # Need to break because dictionary was changed mid-loop!
-                break
+                result = self.get_process_result(
+                    process_id
+                )
 
-        # Remove finished processes from having status tracked
-        for process_id in processes_to_remove:
-            del self.last_known_status[process_id]
+                self.process_signals.process_finished.emit(
+                    process_id, result,
+                )
 
 
     def _handle_process_output(
             self,
             process_id: int,
-            level: str,
-            message: str,
+            outputs: list[tuple[str, str]],
     ) -> None:
         """
-        Handle output from a process
+        Handle a batch of output from a process
         :param process_id:
-        :param level:
-        :param message:
+        :param outputs: (level, message) tuples
         :return:
         """
-        logging.info(
-            f"[Process {process_id}] [{level}] {message}"
-        )
-        pass
+        # Checked once per batch rather than per message
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        for level, message in outputs:
+            self.logger.info(
+                "[Process %s] [%s] %s", process_id, level, message,
+            )
 
 
     def _handle_status_change(
@@ -398,8 +478,8 @@ class ProcessController:
         :param status:
         :return:
         """
-        logging.info(
-            f"Process {process_id} status changed to: {status}"
+        self.logger.info(
+            "Process %s status changed to: %s", process_id, status,
         )
 
         # Update process monitor UI
@@ -420,17 +500,18 @@ class ProcessController:
         :param result:
         :return:
         """
-        logging.info(
-            f"Process {process_id} finished with result: {result}"
+        self.logger.info(
+            "Process %s finished with result: %s", process_id, result,
         )
 
         # Call the 'on completion' function corresponding to this process,
         # (if it has one)
-        if process_id in self.return_func_registry.keys():
-            self.return_func_registry[process_id](result)
+        on_completion_func = self.return_func_registry.pop(process_id, None)
+        if on_completion_func:
+            on_completion_func(result)
 
         # Clean up the process
-        self.cleanup_completed_processes()
+        self.cleanup_completed_processes([process_id])
 
     def cancel_process(
             self,
@@ -442,25 +523,50 @@ class ProcessController:
         :return:
         """
         if self.terminate_process(process_id):
-            logging.info(
-                f"Process {process_id} cancelled"
+            self.logger.info(
+                "Process %s cancelled", process_id,
             )
 
 
+@dataclass(slots=True)
+class ProcessRow:
+    """
+    One row of ProcessTableModel
+    """
+    pid: int
+    name: str
+    status: str
+    progress: str
+
+
 # noinspection PyMethodOverriding
 class ProcessTableModel(QAbstractTableModel):
     """
     Model for storing information about running processes
     """
+    # Same for every cell, so built once
+    _ALIGNMENT = QVariant(int(Qt.AlignHCenter | Qt.AlignVCenter))
+    # ProcessRow field shown in each column
+    _COLUMN_FIELDS = ('pid', 'name', 'status', 'progress')
     def __init__(
             self,
             parent=None,
     ):
         super().__init__(parent)
         self.headers = ["Process ID", "Name", "Status", "Progress"]
+        # Horizontal header values per role, one per section, built once
+        self._horizontal_header_data: dict[int, list[QVariant]] = {
+            Qt.DisplayRole: [QVariant(header) for header in self.headers],
+            Qt.SizeHintRole: [
+                QVariant(QSize(250, 15)) if section == 1 else QVariant()
+                for section in range(len(self.headers))
+            ],
+        }
 
         # Initialize empty data list
-        self.processes = []
+        self.processes: list[ProcessRow] = []
+        # process_id -> row in self.processes
+        self._pid_to_row: dict[int, int] = {}
 
 
     def rowCount(
@@ -489,17 +595,20 @@ class ProcessTableModel(QAbstractTableModel):
         :param role:
         :return:
         """
-        if not index.isValid() or not (0 <= index.row() < len(self.processes)):
-            return QVariant()
+        if role == Qt.TextAlignmentRole:
+            return self._ALIGNMENT
 
-        if role == Qt.DisplayRole:
-            if index.isValid():
-                return str(self.processes[index.row()][index.column()])
+        if role != Qt.DisplayRole:
+            return QVariant()
 
-        if role == Qt.TextAlignmentRole:
-            return Qt.AlignHCenter + Qt.AlignVCenter
+        if not index.isValid() or not (0 <= index.row() < len(self.processes)):
+            return QVariant()
 
-        return QVariant()
+        process = self.processes[index.row()]
+        if index.column() == 0:
+            # The only non-string field; formatted on demand
+            return str(process.pid)
+        return getattr(process, self._COLUMN_FIELDS[index.column()])
 
 
     def headerData(
@@ -515,17 +624,14 @@ class ProcessTableModel(QAbstractTableModel):
         :param role:
         :return:
         """
-        if role == Qt.DisplayRole:
-            if orientation == Qt.Horizontal and self.headers:
-                if 0 <= section < len(self.headers):
-                    return self.headers[section]
+        if orientation != Qt.Horizontal:
+            return QVariant()
 
-        if role == Qt.SizeHintRole:
-            if orientation == Qt.Horizontal:
-                if section == 1:
-                    return QVariant(QSize(250, 15))
+        values = self._horizontal_header_data.get(role)
+        if values is None or not (0 <= section < len(values)):
+            return QVariant()
 
-        return QVariant()
+        return values[section]
 
 
     def addProcess(
@@ -549,13 +655,14 @@ class ProcessTableModel(QAbstractTableModel):
             len(self.processes),
         )
 
+        self._pid_to_row[process_id] = len(self.processes)
         self.processes.append(
-            [
-                str(process_id),
-                process_name,
-                process_status,
-                process_progress,
-            ]
+            ProcessRow(
+                pid=process_id,
+                name=str(process_name),
+                status=str(process_status),
+                progress=str(process_progress),
+            )
         )
 
         self.endInsertRows()
@@ -576,31 +683,34 @@ class ProcessTableModel(QAbstractTableModel):
         :param progress:
         :return:
         """
+        row = self._pid_to_row.get(process_id)
+        if row is None:
+            # Process not found
+            return False
 
-        for row, process in enumerate(self.processes):
-            if process[0] == str(process_id):
-                if status:
-                    process[2] = status
+        process = self.processes[row]
 
-                if progress:
-                    process[3] = progress
-
-                # Emit data changed signal
-                top_left = self.index(row, 0)
-                bottom_right = self.index(
-                    row,
-                    len(self.headers) - 1,
-                )
+        # Emit data changed signal per cell that actually changed, and
+        # only for the role that reads it
+        if status and process.status != status:
+            process.status = status
+            self._emit_cell_changed(row, 2)
+        if progress and process.progress != progress:
+            process.progress = progress
+            self._emit_cell_changed(row, 3)
 
-                self.dataChanged.emit(
-                    top_left,
-                    bottom_right,
-                )
-
-                return True
+        return True
 
-        # Process not found
-        return False
+    def _emit_cell_changed(
+            self,
+            row: int,
+            column: int,
+    ):
+        self.dataChanged.emit(
+            self.index(row, column),
+            self.index(row, column),
+            [Qt.DisplayRole],
+        )
 
     def deleteAllProcesses(self):
         """
@@ -610,6 +720,7 @@ class ProcessTableModel(QAbstractTableModel):
 
         self.beginResetModel()
         self.processes.clear()
+        self._pid_to_row.clear()
         self.endResetModel()
 
         return True
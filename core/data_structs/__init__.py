@@ -1,10 +1,12 @@
 from .data_registry import DataRegistry
 from .sample import Sample
-from .fingerprint import Fingerprint
+from .fingerprint import Fingerprint, DescriptorPanel
 from .injection import Injection
 from .scan_array import ScanArray
 from .ensemble import Ensemble, IonAnnotation
-from .feature_pointer import FeaturePointer
+from .feature_pointer import (
+    FeaturePointer, FeaturePointerBatch, FeaturePointerTable,
+)
 from .alignment import EnsembleAlignment, AlignedAnalyte, AlignmentParams
 from .uuid_types import (
     SampleUUID, FingerprintUUID, InjectionUUID, ScanArrayUUID,
@@ -16,6 +18,7 @@ __all__ = [
     "DataRegistry",
     "Sample",
     "Fingerprint",
+    "DescriptorPanel",
     "Injection",
     "ScanArray",
     "Ensemble",
@@ -29,5 +32,7 @@ __all__ = [
     "InjectionUUID",
     "ScanArrayUUID",
     "FeaturePointer",
+    "FeaturePointerBatch",
+    "FeaturePointerTable",
     "AlignmentUUID",
 ]
\ No newline at end of file
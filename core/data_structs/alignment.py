@@ -13,10 +13,12 @@ to Sample, Injection, Ensemble) is what lets ``data_registry`` and
 from dataclasses import dataclass, field
 from typing import NamedTuple, TYPE_CHECKING
 
-import uuid as _uuid
+import numpy as np
+
+from core.data_structs.uuid_types import new_uuid
 
 if TYPE_CHECKING:
-    from core.data_structs import SampleUUID, EnsembleUUID
+    from core.data_structs import Sample, SampleUUID, EnsembleUUID
 
 
 class AlignmentParams(NamedTuple):
@@ -69,7 +71,7 @@ class EnsembleAlignment:
     sample_uuids: tuple['SampleUUID', ...]
     analytes: list[AlignedAnalyte] = field(default_factory=list)
     parameters: AlignmentParams = field(default_factory=AlignmentParams)
-    uuid: int = field(default_factory=lambda: _uuid.uuid4().int)
+    uuid: int = field(default_factory=new_uuid)
     name: str = ""
 
     @property
@@ -79,3 +81,110 @@ class EnsembleAlignment:
     @property
     def analyte_count(self) -> int:
         return len(self.analytes)
+
+    # Columnar views over `analytes`, for whole-alignment computations
+    #   without walking AlignedAnalytes in Python. Built once on first use
+    #   and kept (the alignment is immutable); treat them as read-only.
+
+    @property
+    def consensus_mzs(self) -> np.ndarray:
+        """
+        consensus_mz of every analyte, as float64 (n_analytes,)
+        """
+        return self._get_columns()['consensus_mz']
+
+    @property
+    def consensus_rts(self) -> np.ndarray:
+        """
+        consensus_rt of every analyte, as float64 (n_analytes,)
+        """
+        return self._get_columns()['consensus_rt']
+
+    @property
+    def presence(self) -> np.ndarray:
+        """
+        Boolean (n_analytes, n_samples) matrix: whether each analyte was
+        found in each sample, columns in `sample_uuids` order. Samples
+        outside `sample_uuids` aren't represented
+        """
+        return self._get_columns()['presence']
+
+    @property
+    def matched_count(self) -> int:
+        """
+        Number of analytes found in more than one sample
+        """
+        return self._get_columns()['matched_count']
+
+    def base_intensities(
+        self,
+        sample_lookup: dict['SampleUUID', 'Sample'],
+    ) -> np.ndarray:
+        """
+        Ensemble.base_intsy of every analyte in every sample, as float32
+        (n_analytes, n_samples), columns in `sample_uuids` order. NaN where
+        the analyte wasn't found, or its ensemble can't be resolved through
+        `sample_lookup`. Not cached, since it depends on `sample_lookup`
+        """
+        sample_cols = self._get_columns()['sample_cols']
+
+        # Resolve each sample's ensembles once, rather than per analyte
+        ensembles_by_col: list[dict] = []
+        for sample_uuid in self.sample_uuids:
+            sample = sample_lookup.get(sample_uuid)
+            injection = sample.injection if sample else None
+            ensembles_by_col.append(injection.ensembles if injection else {})
+
+        intsys = np.full(
+            (len(self.analytes), len(sample_cols)), np.nan, dtype=np.float32,
+        )
+        for row, analyte in enumerate(self.analytes):
+            for sample_uuid, ensemble_uuid in analyte.ensemble_map.items():
+                col = sample_cols.get(sample_uuid)
+                if col is None:
+                    continue
+                ensemble = ensembles_by_col[col].get(ensemble_uuid)
+                if ensemble:
+                    intsys[row, col] = ensemble.base_intsy
+        return intsys
+
+    def _get_columns(self) -> dict:
+        columns = getattr(self, '_columns', None)
+        if columns is not None:
+            return columns
+
+        sample_cols = {
+            sample_uuid: col for col, sample_uuid in enumerate(self.sample_uuids)
+        }
+        n_analytes = len(self.analytes)
+
+        # Presence as (row, col) coordinates, filled in one assignment
+        rows: list[int] = []
+        cols: list[int] = []
+        for row, analyte in enumerate(self.analytes):
+            for sample_uuid in analyte.ensemble_map:
+                col = sample_cols.get(sample_uuid)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        presence = np.zeros((n_analytes, len(sample_cols)), dtype=bool)
+        presence[rows, cols] = True
+
+        columns = {
+            'consensus_mz': np.fromiter(
+                (a.consensus_mz for a in self.analytes),
+                dtype=np.float64, count=n_analytes,
+            ),
+            'consensus_rt': np.fromiter(
+                (a.consensus_rt for a in self.analytes),
+                dtype=np.float64, count=n_analytes,
+            ),
+            'presence': presence,
+            'sample_cols': sample_cols,
+            'matched_count': sum(
+                1 for a in self.analytes if len(a.ensemble_map) > 1
+            ),
+        }
+        # Not a dataclass field, so it's never persisted
+        self._columns = columns
+        return columns
@@ -33,6 +33,11 @@ class DataRegistry(
     sigSampleAdded = QtCore.pyqtSignal(
         object  # Sample
     )
+    # Every addition is announced here, once per register_sample(s) call.
+    #   sigSampleAdded is re-emitted from it, per Sample
+    sigSamplesAdded = QtCore.pyqtSignal(
+        list  # list[Sample]
+    )
     sigSampleRemoved = QtCore.pyqtSignal(
         object  # Sample
     )
@@ -47,11 +52,14 @@ class DataRegistry(
     )
 
     def __init__(self):
-        self._samples: dict['SampleUUID', 'Sample'] = {}
-        self._sample_name_to_uuid: dict[str, 'SampleUUID'] = {}
+        self._samples = _SampleIndex()
         self._alignments: dict['AlignmentUUID', 'EnsembleAlignment'] = {}
         super().__init__()
 
+        self.sigSamplesAdded.connect(
+            self._emit_each_sample_added
+        )
+
     def subscribe_to_changes(
         self,
         addition_callback,
@@ -98,6 +106,84 @@ class DataRegistry(
         """
         self.validate_new_sample(sample)
 
+        if self._add_or_merge_sample(sample):
+            self.sigSamplesAdded.emit(
+                [sample]
+            )
+
+    def register_samples(
+        self,
+        samples: list['Sample'],
+    ):
+        """
+        Registers many Samples (see register_sample). All of them are
+        validated before any is registered, including merges between
+        Samples of the same batch, and the new ones are announced with a
+        single sigSamplesAdded.
+        :param samples:
+        :return:
+        """
+        batch_uuids: set['SampleUUID'] = set()
+        # (has fingerprint, has injection) of each name's Sample, as it
+        #   will be once the batch so far has been added or merged
+        batch_contents: dict[str, tuple[bool, bool]] = {}
+        for sample in samples:
+            self.validate_new_sample(sample)
+
+            if sample.uuid in batch_uuids:
+                raise ValueError(
+                    f"Sample {sample.name} appears more than once in the "
+                    f"batch (uuid: {sample.uuid})"
+                )
+            batch_uuids.add(sample.uuid)
+
+            destination = batch_contents.get(sample.name)
+            if destination is None:
+                matched_sample_uuid = self.match_samplename(sample.name)
+                if matched_sample_uuid:
+                    destination = _contents(
+                        self.get_sample(matched_sample_uuid)
+                    )
+
+            source = _contents(sample)
+            if destination is None:
+                batch_contents[sample.name] = source
+                continue
+
+            if not _contents_merge_is_valid(source, destination):
+                raise ValueError(
+                    f"Incompatible merge attempted:\n"
+                    f"Source: {sample}\n"
+                    f"Destination: a Sample named {sample.name} with "
+                    f"fingerprint: {destination[0]}, "
+                    f"injection: {destination[1]}"
+                )
+            batch_contents[sample.name] = (
+                source[0] or destination[0],
+                source[1] or destination[1],
+            )
+
+        added_samples = []
+        try:
+            for sample in samples:
+                if self._add_or_merge_sample(sample):
+                    added_samples.append(sample)
+        finally:
+            # Announce whatever was added, even if a later Sample failed
+            if added_samples:
+                self.sigSamplesAdded.emit(
+                    added_samples
+                )
+
+    def _add_or_merge_sample(
+        self,
+        sample: 'Sample',
+    ) -> bool:
+        """
+        Adds a validated Sample, or merges it into the registered Sample
+        of the same name. Emits nothing for an addition.
+        :return: Whether the Sample was added (rather than merged)
+        """
         matched_sample_uuid: Optional['SampleUUID'] = self.match_samplename(
             sample.name
         )
@@ -108,21 +194,20 @@ class DataRegistry(
                 source=sample,
                 destination_uuid=matched_sample_uuid
             )
+            return False
 
-        else:
-            # Brand new sample
-            self._samples[sample.uuid] = sample
-            self._sample_name_to_uuid[sample.name] = sample.uuid
-            self.sigSampleAdded.emit(
-                sample
-            )
+        # Brand new sample
+        self._samples.add(sample)
+        return True
 
-    def register_samples(
+    def _emit_each_sample_added(
         self,
         samples: list['Sample'],
     ):
         for sample in samples:
-            self.register_sample(sample)
+            self.sigSampleAdded.emit(
+                sample
+            )
 
     def get_sample(
         self,
@@ -131,22 +216,21 @@ class DataRegistry(
         return self._samples.get(uuid)
 
     def get_all_samples(self) -> list['Sample']:
-        return list(self._samples.values())
+        return self._samples.samples()
 
     def get_all_sample_uuids(self) -> list['SampleUUID']:
-        return list(self._samples.keys())
+        return self._samples.uuids()
 
     def remove_sample(
         self,
         uuid: 'SampleUUID',
     ):
-        if uuid in self._samples:
-            sample_to_remove = self._samples[uuid]
+        sample_to_remove = self._samples.get(uuid)
+        if sample_to_remove is not None:
             self.sigSampleRemoved.emit(
                 sample_to_remove
             )
-            del self._samples[uuid]
-            del self._sample_name_to_uuid[sample_to_remove.name]
+            self._samples.remove(uuid)
 
             return
 
@@ -173,7 +257,7 @@ class DataRegistry(
         if sample.uuid in self._samples:
             raise ValueError(
                 f"Sample {sample.name} is already registered with uuid: "
-                f"{self._samples[sample.uuid].uuid}"
+                f"{self._samples.get(sample.uuid).uuid}"
             )
 
         if not sample.injection and not sample.fingerprint:
@@ -195,10 +279,7 @@ class DataRegistry(
         :param name:
         :return:
         """
-        if name in self._sample_name_to_uuid:
-            return self._sample_name_to_uuid[name]
-
-        return None
+        return self._samples.find_by_name(name)
 
     def merge_samples(
         self,
@@ -283,12 +364,18 @@ class DataRegistry(
         """
         Given a UUID and a metadata dictionary, updates the
         sample's "metadata" attribute and signals that it was
-        changed.
+        changed. Doesn't signal if nothing actually changed.
         """
         sample = self.get_sample(uuid)
+        current = sample.metadata
+        changed = any(
+            key not in current or current[key] != value
+            for key, value in metadata.items()
+        )
+        if not changed:
+            return
 
-        for key, value in metadata.items():
-            sample.metadata[key] = value
+        current.update(metadata)
 
         self.sigSampleUpdated.emit(sample)
 
@@ -324,31 +411,93 @@ class DataRegistry(
     def alignment_count(self) -> int:
         return len(self._alignments)
 
+class _SampleIndex:
+    """
+    The registry's Samples, by uuid and by name. Both maps are only
+    changed together, through add() and remove().
+
+    The name a Sample was added under is remembered, so removal still
+    finds its entry if the Sample was renamed since.
+    """
+    def __init__(self):
+        self._by_uuid: dict['SampleUUID', 'Sample'] = {}
+        self._uuid_by_name: dict[str, 'SampleUUID'] = {}
+        self._name_by_uuid: dict['SampleUUID', str] = {}
+
+    def __contains__(self, uuid: 'SampleUUID') -> bool:
+        return uuid in self._by_uuid
+
+    def __len__(self) -> int:
+        return len(self._by_uuid)
+
+    def add(
+        self,
+        sample: 'Sample',
+    ):
+        self._by_uuid[sample.uuid] = sample
+        self._uuid_by_name[sample.name] = sample.uuid
+        self._name_by_uuid[sample.uuid] = sample.name
+
+    def remove(
+        self,
+        uuid: 'SampleUUID',
+    ) -> Optional['Sample']:
+        sample = self._by_uuid.pop(uuid, None)
+        name = self._name_by_uuid.pop(uuid, None)
+        # Only drop the name if it still points at this Sample
+        if name is not None and self._uuid_by_name.get(name) == uuid:
+            del self._uuid_by_name[name]
+        return sample
+
+    def get(
+        self,
+        uuid: 'SampleUUID',
+    ) -> Optional['Sample']:
+        return self._by_uuid.get(uuid)
+
+    def find_by_name(
+        self,
+        name: str,
+    ) -> Optional['SampleUUID']:
+        return self._uuid_by_name.get(name)
+
+    def samples(self) -> list['Sample']:
+        return list(self._by_uuid.values())
+
+    def uuids(self) -> list['SampleUUID']:
+        return list(self._by_uuid.keys())
+
+
 def _merge_is_valid(
     source: 'Sample',
     destination: 'Sample',
 ) -> bool:
-    source_pattern = (
-        source.fingerprint is not None,
-        source.injection is not None,
-    )
+    """
+    A merge is valid if one sample has only a fingerprint and the other
+    only an injection
+    """
+    return _contents_merge_is_valid(_contents(source), _contents(destination))
 
-    destination_pattern = (
-        destination.fingerprint is not None,
-        destination.injection is not None,
-    )
 
-    match (source_pattern, destination_pattern):
-        case (
-        ( (True, False),
-          (False, True) )
-        |
-        ( (False, True),
-          (True, False) )
-        ):
-            return True
-
-        case _:
-            return False
+def _contents(
+    sample: 'Sample',
+) -> tuple[bool, bool]:
+    """
+    (has fingerprint, has injection)
+    """
+    return sample.fingerprint is not None, sample.injection is not None
+
+
+def _contents_merge_is_valid(
+    source: tuple[bool, bool],
+    destination: tuple[bool, bool],
+) -> bool:
+    """
+    _merge_is_valid, given each Sample's _contents()
+    """
+    src_fp, src_inj = source
+    dst_fp, dst_inj = destination
+
+    return (src_fp != src_inj) and (src_fp != dst_fp) and (src_inj != dst_inj)
 
 
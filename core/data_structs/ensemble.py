@@ -2,7 +2,7 @@
 Data structue for organizing co-feature ensembles
 """
 from dataclasses import dataclass, field
-import uuid
+import os
 from typing import Literal, Optional, TYPE_CHECKING
 
 import numpy as np
@@ -10,10 +10,17 @@ from find_mfs import FormulaCandidate, get_isotope_envelope
 from molmass import Formula
 from numpy.typing import NDArray
 
-from core.utils.array_types import to_spec_arr, to_ensemble_arr
+from core.data_structs.feature_pointer import (
+    FeaturePointerTable,
+    _get_row_window,
+)
+from core.data_structs.uuid_types import new_uuid
+from core.utils.array_types import to_spec_arr, to_chrom_arr, to_ensemble_arr
 from core.utils.formula_formatting import format_formula_obj_to_html
 
 if TYPE_CHECKING:
+    from scipy.sparse import csr_array
+
     from core.data_structs import(
         Injection,
         ScanArray,
@@ -23,12 +30,12 @@ if TYPE_CHECKING:
 
     from core.utils.array_types import SpectrumArray, ChromArray, EnsembleArray
 
-@dataclass
+@dataclass(slots=True)
 class Ensemble:
     ms1_cofeatures: list['FeaturePointer']
     ms2_cofeatures: list['FeaturePointer']
 
-    uuid: 'EnsembleUUID' = field(default_factory=lambda: uuid.uuid4().int)
+    uuid: 'EnsembleUUID' = field(default_factory=new_uuid)
     injection: Optional[ 'Injection' ] = None
 
     # Calculated on initialization
@@ -39,11 +46,11 @@ class Ensemble:
     base_ms1_cofeature_idx: int = field(init=False, repr=False)
     base_scan_num: int = field(init=False, repr=False)
 
-    # Calculated and cached on demand
-    _ms1_cofeature_mz_lane_idxs: np.ndarray[int, ...] = field(
+    # Calculated and cached on demand (see _get_cofeature_table)
+    _ms1_cofeature_table: Optional[FeaturePointerTable] = field(
         default=None, init=False, repr=False,
     )
-    _ms2_cofeature_mz_lane_idxs: np.ndarray[int, ...] = field(
+    _ms2_cofeature_table: Optional[FeaturePointerTable] = field(
         default=None, init=False, repr=False,
     )
 
@@ -90,38 +97,43 @@ class Ensemble:
         inj_name: str = self.injection.name
         return f"{inj_name}_{self.peak_rt:.1f}s_{self.base_mz:.5f}mz"
 
-    def _populate_attrs(self):
+    def _populate_attrs(
+        self,
+        ms1_max_intsys: Optional[np.ndarray] = None,
+    ):
         # Find base co-feature
         ms1_scan_array: 'ScanArray' = self.injection.get_scan_array(ms_level=1)
-        ftr_ptr_intsys: np.ndarray = np.array(
-            [
-                x.get_max_intsy(
-                    scan_array=ms1_scan_array,
-                ) for x in self.ms1_cofeatures
-            ]
-        )
+        if ms1_max_intsys is None:
+            ms1_max_intsys = _get_max_intsys(
+                self._get_cofeature_table(ms_level=1),
+                ms1_scan_array,
+            )
+        ftr_ptr_intsys: np.ndarray = ms1_max_intsys
 
         self.base_ms1_cofeature_idx: int = np.argmax(ftr_ptr_intsys) # type: ignore
         base_ftr_ptr = self.ms1_cofeatures[self.base_ms1_cofeature_idx]
 
+        # Apex of the base cofeature. Its intensity is the max found above
+        self.base_intsy = float(ftr_ptr_intsys[self.base_ms1_cofeature_idx])
         self.base_scan_num = base_ftr_ptr.get_max_intsy_scan_num(
-            scan_array=self.injection.scan_array_ms1
+            ms1_scan_array
         )
+        self.peak_rt = float(ms1_scan_array.rt_arr[self.base_scan_num])
 
-        self.base_mz = base_ftr_ptr.get_mz_values(
-            self.injection.scan_array_ms1
-        ).mean()
-
-        bpc = base_ftr_ptr.get_chrom_array(ms1_scan_array)
-        self.base_intsy = np.max(bpc['intsy'])
-        self.peak_rt = bpc['rt'][np.argmax(bpc['intsy'])]
+        # Averaged over the scans it was observed in only
+        self.base_mz = base_ftr_ptr.get_mean_mz(ms1_scan_array)
 
     def set_injection(
         self,
         injection: 'Injection',
+        ms1_max_intsys: Optional[np.ndarray] = None,
     ):
+        """
+        :param ms1_max_intsys: Max intensity of each MS1 cofeature, if the
+            caller already computed them (see Injection.add_ensembles)
+        """
         self.injection = injection
-        self._populate_attrs()
+        self._populate_attrs(ms1_max_intsys)
 
     def get_spectrum(
         self,
@@ -162,30 +174,32 @@ class Ensemble:
         this ensemble. This retrieval is done only once, then
         cached for later use, unless 'force_refresh' is True
         """
-        # Select based on MS1 or MS2. (Use `is None` checks rather than
-        # truthiness — these are ndarrays, whose truth value is ambiguous.)
-        if ms_level == 1:
-            cached = self._ms1_cofeature_mz_lane_idxs
-            cofeatures = self.ms1_cofeatures
-        else:
-            cached = self._ms2_cofeature_mz_lane_idxs
-            cofeatures = self.ms2_cofeatures
+        return self._get_cofeature_table(
+            ms_level, force_refresh,
+        ).mz_lane_idxs
 
+    def _get_cofeature_table(
+        self,
+        ms_level: Literal[1, 2],
+        force_refresh: bool = False,
+    ) -> FeaturePointerTable:
+        """
+        Returns the cofeatures at ms_level as a FeaturePointerTable. Built
+        once, then cached for later use, unless 'force_refresh' is True
+        """
+        cache_attr = _attr_for_ms_level(_COFEATURE_TABLE_ATTRS, ms_level)
+
+        # (Use `is None` checks: an empty table is falsy)
+        cached = getattr(self, cache_attr)
         if not force_refresh and cached is not None:
             return cached
 
-        mz_lane_idxs: NDArray[int] = np.array(
-            [x.mz_lane_idx for x in cofeatures]
+        table = FeaturePointerTable.from_pointers(
+            self._get_cofeatures(ms_level)
         )
+        setattr(self, cache_attr, table)
 
-        # Write back to the cache (the previous implementation never did,
-        # so every call recomputed).
-        if ms_level == 1:
-            self._ms1_cofeature_mz_lane_idxs = mz_lane_idxs
-        else:
-            self._ms2_cofeature_mz_lane_idxs = mz_lane_idxs
-
-        return mz_lane_idxs
+        return table
 
 
     def get_chromatograms(
@@ -209,16 +223,30 @@ class Ensemble:
                 "Use set_injection()"
             )
 
-        cofeatures: list['FeaturePointer'] = self._get_cofeatures(
-            ms_level,
-            idxs,
-        )
+        table: FeaturePointerTable = self._get_cofeature_table(ms_level)[idxs]
         scan_array: 'ScanArray' = self._get_scan_array(ms_level)
+        table.validate_source(scan_array)
+
+        # to_chrom_arr copies, so every row can be read into one buffer
+        widths = table.scan_ends - table.scan_starts
+        row_buffer = np.empty(
+            int(widths.max(initial=0)), dtype=scan_array.intsy_arr.dtype,
+        )
 
         chroms: list[np.ndarray] = []
-        for ftr_ptr in cofeatures:
+        for mz_lane_idx, scan_start, scan_end in zip(
+            table.mz_lane_idxs.tolist(),
+            table.scan_starts.tolist(),
+            table.scan_ends.tolist(),
+        ):
             chroms.append(
-                ftr_ptr.get_chrom_array(scan_array)
+                to_chrom_arr(
+                    scan_array.rt_arr[scan_start:scan_end],
+                    _get_row_window(
+                        scan_array.intsy_arr, mz_lane_idx, scan_start, scan_end,
+                        out=row_buffer,
+                    ),
+                )
             )
 
         return chroms
@@ -259,34 +287,27 @@ class Ensemble:
                 "Use set_injection()"
             )
 
-        match ms_level:
-            case 1:
-                return self.injection.scan_array_ms1
-
-            case 2:
-                return self.injection.scan_array_ms2
-
-            case _:
-                raise ValueError(
-                    f"Invalid ms_level specified: {ms_level}"
-                )
+        return getattr(
+            self.injection,
+            _attr_for_ms_level(_SCAN_ARRAY_ATTRS, ms_level),
+        )
 
     def _get_cofeatures(
         self,
         ms_level: Literal[1, 2],
-        idxs: slice = slice(None),
+        idxs: Optional[slice] = None,
     ) -> list['FeaturePointer']:
-        match ms_level:
-            case 1:
-                return self.ms1_cofeatures[idxs]
-
-            case 2:
-                return self.ms2_cofeatures[idxs]
-
-            case _:
-                raise ValueError(
-                    f"Invalid ms_level specified: {ms_level}"
-                )
+        """
+        Returns the cofeatures at ms_level. Without `idxs` this is the
+        list itself rather than a copy, so don't modify it
+        """
+        cofeatures: list['FeaturePointer'] = getattr(
+            self,
+            _attr_for_ms_level(_COFEATURE_ATTRS, ms_level),
+        )
+        if idxs is None:
+            return cofeatures
+        return cofeatures[idxs]
 
     def _generate_spectrum(
         self,
@@ -298,24 +319,14 @@ class Ensemble:
         scan_array = self._get_scan_array(
             ms_level=ms_level
         )
-        ftr_ptrs = self._get_cofeatures(
+        table = self._get_cofeature_table(
             ms_level=ms_level
         )
 
-        mz_values: list[float] = []
-        intsy_values: list[float] = []
-        for ftr_ptr in ftr_ptrs:
-            mz_values.append(
-                ftr_ptr.get_mz_values(scan_array).max()
-                # ftr_ptr.get_mz_values(scan_array).mean()
-            )
-            intsy_values.append(
-                ftr_ptr.get_max_intsy(scan_array)
-            )
-
+        max_mzs, max_intsys = _get_max_mzs_and_intsys(table, scan_array)
         return to_spec_arr(
-            mz_arr=np.array(mz_values),
-            intsy_arr=np.array(intsy_values),
+            mz_arr=max_mzs,
+            intsy_arr=max_intsys,
         )
 
     def add_mz_diff_annot(
@@ -475,7 +486,7 @@ class MzDiffAnnotation:
     cofeature_b_idx: int
     ms_level: Literal[1, 2]
     delta_mz: float
-    uuid: int = field(default_factory=lambda: uuid.uuid4().int)
+    uuid: int = field(default_factory=new_uuid)
     user_label: Optional[str] = None
     scan_num: Optional[int] = None
     formula: Optional[FormulaCandidate] = None
@@ -490,7 +501,7 @@ class GenericAnnotation:
     cofeature_idx: int
     ms_level: Literal[1, 2]
     text: str
-    uuid: int = field(default_factory=lambda: uuid.uuid4().int)
+    uuid: int = field(default_factory=new_uuid)
     scan_num: Optional[int] = None
 
 
@@ -504,7 +515,7 @@ class IonAnnotation:
     cofeature_idxs: list[int]
     ms_level: Literal[1, 2]
     formula: FormulaCandidate
-    uuid: int = field(default_factory=lambda: uuid.uuid4().int)
+    uuid: int = field(default_factory=new_uuid)
     user_label: Optional[str] = None
     scan_num: Optional[int] = None
 
@@ -560,5 +571,305 @@ class IonPairAnnotation:
     user_label: Optional[str] = None
 
 
+# Per-ms_level attribute names, for Ensemble's _get_* methods
+_SCAN_ARRAY_ATTRS = {1: 'scan_array_ms1', 2: 'scan_array_ms2'}
+_COFEATURE_ATTRS = {1: 'ms1_cofeatures', 2: 'ms2_cofeatures'}
+_COFEATURE_TABLE_ATTRS = {1: '_ms1_cofeature_table', 2: '_ms2_cofeature_table'}
+
+
+def _attr_for_ms_level(
+    attrs: dict[int, str],
+    ms_level: Literal[1, 2],
+) -> str:
+    attr = attrs.get(ms_level)
+    if attr is None:
+        raise ValueError(
+            f"Invalid ms_level specified: {ms_level}"
+        )
+    return attr
+
+
+def _get_max_intsys(
+    table: FeaturePointerTable,
+    scan_array: 'ScanArray',
+) -> np.ndarray:
+    """
+    Same as [x.get_max_intsy(scan_array) for x in ftr_ptrs] over the
+    pointers in `table`, but pointers sharing a scan window (as all
+    cofeatures of a within-array search do) are reduced together off one
+    cached column block, rather than slicing a row per pointer
+    """
+    table.validate_source(scan_array)
+
+    if _use_numba_kernel():
+        return _get_window_maxima(scan_array.intsy_arr, table)
+
+    max_intsys = np.empty(len(table), dtype=scan_array.intsy_arr.dtype)
+    for (scan_start, scan_end), rows in table.windows().items():
+        _check_window(scan_start, scan_end)
+        max_intsys[rows] = (
+            scan_array.get_xic_block(scan_start, scan_end)[
+                table.mz_lane_idxs[rows]
+            ]
+            .max(axis=1)
+            .toarray()
+            .ravel()
+        )
+
+    return max_intsys
+
+
+def _get_max_intsys_of_many(
+    tables: list[FeaturePointerTable],
+    scan_array: 'ScanArray',
+) -> list[np.ndarray]:
+    """
+    _get_max_intsys for several tables at once (e.g. every Ensemble of an
+    Injection). Their pointers are reduced in one pass, ordered by
+    (mz_lane_idx, scan_start) so that CSR rows are read in storage order
+    rather than jumping between lanes
+    """
+    if not tables:
+        return []
+
+    combined = FeaturePointerTable(
+        mz_lane_idxs=np.concatenate([t.mz_lane_idxs for t in tables]),
+        scan_starts=np.concatenate([t.scan_starts for t in tables]),
+        scan_ends=np.concatenate([t.scan_ends for t in tables]),
+        source_array_uuids=frozenset().union(
+            *(t.source_array_uuids for t in tables)
+        ),
+    )
+    order = np.lexsort((combined.scan_starts, combined.mz_lane_idxs))
+
+    max_intsys = np.empty(len(combined), dtype=scan_array.intsy_arr.dtype)
+    max_intsys[order] = _get_max_intsys(combined[order], scan_array)
+
+    return np.split(max_intsys, np.cumsum([len(t) for t in tables])[:-1])
+
+
+def _get_max_mzs(
+    table: FeaturePointerTable,
+    scan_array: 'ScanArray',
+) -> np.ndarray:
+    """
+    Same as [x.get_mz_values(scan_array).max() for x in ftr_ptrs] over the
+    pointers in `table`, but pointers sharing a scan window take their lanes out of `mz_arr` in a
+    single slice
+    """
+    table.validate_source(scan_array)
+
+    if _use_numba_kernel():
+        return _get_window_maxima(scan_array.mz_arr, table)
+
+    max_mzs = np.empty(len(table), dtype=scan_array.mz_arr.dtype)
+    for (scan_start, scan_end), rows in table.windows().items():
+        _check_window(scan_start, scan_end)
+        max_mzs[rows] = (
+            scan_array.mz_arr[table.mz_lane_idxs[rows]][:, scan_start:scan_end]
+            .max(axis=1)
+            .toarray()
+            .ravel()
+        )
+
+    return max_mzs
+
+
+def _get_max_mzs_and_intsys(
+    table: FeaturePointerTable,
+    scan_array: 'ScanArray',
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (_get_max_mzs(...), _get_max_intsys(...)), with the numba kernel
+    reducing both matrices in a single pass over the pointers
+    """
+    if not _use_numba_kernel():
+        return (
+            _get_max_mzs(table, scan_array),
+            _get_max_intsys(table, scan_array),
+        )
+
+    table.validate_source(scan_array)
+    _check_windows(table)
+
+    mz_arr, intsy_arr = scan_array.mz_arr, scan_array.intsy_arr
+    max_mzs = np.empty(len(table), dtype=mz_arr.dtype)
+    max_intsys = np.empty(len(table), dtype=intsy_arr.dtype)
+    _window_maxima_pair_numba(
+        mz_arr.indptr, mz_arr.indices, mz_arr.data,
+        bool(mz_arr.has_sorted_indices),
+        intsy_arr.indptr, intsy_arr.indices, intsy_arr.data,
+        bool(intsy_arr.has_sorted_indices),
+        table.mz_lane_idxs,
+        table.scan_starts,
+        table.scan_ends,
+        max_mzs,
+        max_intsys,
+    )
+    return max_mzs, max_intsys
+
+
+def _check_window(
+    scan_start: int,
+    scan_end: int,
+):
+    # FeaturePointers read [scan_start, scan_end), so a single-scan pointer
+    #   has no values to take the max of
+    if scan_end <= scan_start:
+        raise ValueError(
+            f"FeaturePointer spans no scans "
+            f"(scan_start: {scan_start}, scan_end: {scan_end})"
+        )
+
+
+def _check_windows(
+    table: FeaturePointerTable,
+):
+    empty = table.scan_ends <= table.scan_starts
+    if empty.any():
+        row = int(np.argmax(empty))
+        _check_window(int(table.scan_starts[row]), int(table.scan_ends[row]))
 
 
+def _use_numba_kernel() -> bool:
+    """
+    True if the numba kernel should be used. Set ``MZKIT_DISABLE_NUMBA=1``
+    to force the SciPy path.
+    """
+    return (
+        _NUMBA_KERNEL_AVAILABLE
+        and not os.environ.get("MZKIT_DISABLE_NUMBA")
+    )
+
+
+def _get_window_maxima(
+    matrix: 'csr_array',
+    table: FeaturePointerTable,
+) -> np.ndarray:
+    """
+    matrix[lane, scan_start:scan_end].max() for every row of `table`, in
+    one call to the numba kernel
+    """
+    _check_windows(table)
+
+    maxima = np.empty(len(table), dtype=matrix.dtype)
+    _window_maxima_numba(
+        matrix.indptr,
+        matrix.indices,
+        matrix.data,
+        bool(matrix.has_sorted_indices),
+        table.mz_lane_idxs,
+        table.scan_starts,
+        table.scan_ends,
+        maxima,
+    )
+    return maxima
+
+
+# ---------------------------------------------------------------------------
+# numba-JIT kernel
+# ---------------------------------------------------------------------------
+# Same reduction as the sparse max(axis=1) in _get_max_intsys/_get_max_mzs,
+# run per pointer directly on the CSR buffers: no column block or row
+# subset is built, and pointers are reduced in parallel.
+
+try:
+    from numba import njit, prange
+    _NUMBA_KERNEL_AVAILABLE = True
+except ImportError:
+    _NUMBA_KERNEL_AVAILABLE = False
+
+
+if _NUMBA_KERNEL_AVAILABLE:
+
+    @njit(cache=True)
+    def _row_window_max(
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        sorted_indices: bool,
+        lane: int,
+        start: int,
+        end: int,           # exclusive, > start
+    ):
+        """
+        Max over columns [start, end) of row `lane`, counting the window's
+        unstored entries as zeros (as scipy does).
+        """
+        row_start = indptr[lane]
+        row_end = indptr[lane + 1]
+        if sorted_indices:
+            lo = row_start + np.searchsorted(
+                indices[row_start:row_end], start,
+            )
+            hi = row_start + np.searchsorted(
+                indices[row_start:row_end], end,
+            )
+        else:
+            lo = row_start
+            hi = row_end
+
+        n_stored = 0
+        best = data.dtype.type(0)
+        for k in range(lo, hi):
+            col = indices[k]
+            if col < start or col >= end:
+                continue
+            if n_stored == 0 or data[k] > best:
+                best = data[k]
+            n_stored += 1
+
+        # Unstored entries in the window are zeros
+        if n_stored < end - start and best < 0:
+            best = data.dtype.type(0)
+        return best
+
+    @njit(parallel=True, cache=True)
+    def _window_maxima_numba(
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        sorted_indices: bool,
+        lanes: np.ndarray,     # int64[n_ptrs]
+        starts: np.ndarray,    # int64[n_ptrs]
+        ends: np.ndarray,      # int64[n_ptrs], exclusive, > starts
+        out: np.ndarray,       # [n_ptrs], same dtype as data
+    ):
+        """
+        _row_window_max for every pointer
+        """
+        for i in prange(lanes.size):
+            out[i] = _row_window_max(
+                indptr, indices, data, sorted_indices,
+                lanes[i], starts[i], ends[i],
+            )
+
+    @njit(parallel=True, cache=True)
+    def _window_maxima_pair_numba(
+        mz_indptr: np.ndarray,
+        mz_indices: np.ndarray,
+        mz_data: np.ndarray,
+        mz_sorted_indices: bool,
+        intsy_indptr: np.ndarray,
+        intsy_indices: np.ndarray,
+        intsy_data: np.ndarray,
+        intsy_sorted_indices: bool,
+        lanes: np.ndarray,     # int64[n_ptrs]
+        starts: np.ndarray,    # int64[n_ptrs]
+        ends: np.ndarray,      # int64[n_ptrs], exclusive, > starts
+        mz_out: np.ndarray,    # [n_ptrs], same dtype as mz_data
+        intsy_out: np.ndarray, # [n_ptrs], same dtype as intsy_data
+    ):
+        """
+        _window_maxima_numba over the m/z and intensity matrices together,
+        in one loop over the pointers
+        """
+        for i in prange(lanes.size):
+            mz_out[i] = _row_window_max(
+                mz_indptr, mz_indices, mz_data, mz_sorted_indices,
+                lanes[i], starts[i], ends[i],
+            )
+            intsy_out[i] = _row_window_max(
+                intsy_indptr, intsy_indices, intsy_data, intsy_sorted_indices,
+                lanes[i], starts[i], ends[i],
+            )
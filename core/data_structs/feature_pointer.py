@@ -3,75 +3,111 @@ This is a data structure that indexes ScanArrays.
 Can be used to retrieve a particular 'slice' of time-contiguous
 MS signals (i.e. a feature).
 """
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
+from typing import Optional, TYPE_CHECKING
 
 import numpy as np
 
 from core.utils.array_types import to_chrom_arr
 
 if TYPE_CHECKING:
+    from scipy.sparse import csr_array
+
     from core.data_structs.scan_array import ScanArray
     from core.utils.array_types import ChromArray
 
-@dataclass
+@dataclass(slots=True)
 class FeaturePointer:
     """
     A reference to a time-contiguous m/z signal within a ScanArray.
 
     Stores indices that can be used to retrieve specific feature
     from a ScanArray.
+
+    Slotted, since there is one per cofeature of every ensemble.
     """
     mz_lane_idx: int
     scan_idxs: np.ndarray[...,]
     source_array_uuid: int
     source_array_shape: tuple
 
+    # First and last of the sorted scan_idxs, set on initialization
+    scan_start: int = field(init=False, repr=False, compare=False)
+    scan_end: int = field(init=False, repr=False, compare=False)
+
     def __post_init__(self):
         self.scan_idxs.sort()
+        self._cache_scan_range()
+
+    def __setstate__(self, state):
+        # Projects saved before __slots__ pickled a plain __dict__;
+        #   newer pickles give (None, slot_state)
+        if isinstance(state, tuple):
+            state = state[1]
+        for name, value in state.items():
+            setattr(self, name, value)
+        # Older pickles don't carry the scan range
+        self._cache_scan_range()
+
+    def _cache_scan_range(self):
+        if self.scan_idxs.size:
+            self.scan_start = int(self.scan_idxs[0])
+            self.scan_end = int(self.scan_idxs[-1])
+        else:
+            # No scans: an empty [0, 0) range
+            self.scan_start = self.scan_end = 0
 
     def get_mz_values(
             self,
             scan_array: 'ScanArray',
+            out: Optional[np.ndarray] = None,
     ) -> np.ndarray:
         """
         Get the m/z values for this feature.
 
         Parameters:
             scan_array (ScanArray): The ScanArray containing the data.
+            out (numpy.ndarray, optional): Scratch buffer to write into
+                (see _get_row_window)
 
         Returns:
             numpy.ndarray: Array of m/z values for this feature.
         """
         self.validate_source(scan_array)
 
-        row_data = scan_array.mz_arr[
-           self.mz_lane_idx,
-           self.scan_start: self.scan_end,
-        ]
-        return row_data.toarray().flatten()
+        return _get_row_window(
+            scan_array.mz_arr,
+            self.mz_lane_idx,
+            self.scan_start,
+            self.scan_end,
+            out=out,
+        )
 
     def get_intensity_values(
             self,
             scan_array: 'ScanArray',
+            out: Optional[np.ndarray] = None,
     ) -> np.ndarray[...,]:
         """
         Get the intensity values for this feature.
 
         Parameters:
             scan_array (ScanArray): The ScanArray containing the data.
+            out (numpy.ndarray, optional): Scratch buffer to write into
+                (see _get_row_window)
 
         Returns:
             numpy.ndarray: Array of intensity values for this feature.
         """
         self.validate_source(scan_array)
 
-        row_data = scan_array.intsy_arr[
-           self.mz_lane_idx,
-           self.scan_start: self.scan_end
-        ]
-
-        return row_data.toarray().flatten()
+        return _get_row_window(
+            scan_array.intsy_arr,
+            self.mz_lane_idx,
+            self.scan_start,
+            self.scan_end,
+            out=out,
+        )
 
     def get_retention_times(
             self,
@@ -92,6 +128,26 @@ class FeaturePointer:
            self.scan_start: self.scan_end
         ]
 
+    def get_mean_mz(
+            self,
+            scan_array: 'ScanArray',
+    ) -> float:
+        """
+        Mean of this feature's m/z values, over the scans where it was
+        actually observed (scans without a value aren't counted as 0 m/z).
+        Returns 0.0 if it has no values at all.
+        """
+        self.validate_source(scan_array)
+
+        _, mzs = _get_row_window_stored(
+            scan_array.mz_arr,
+            self.mz_lane_idx,
+            self.scan_start,
+            self.scan_end,
+        )
+        mzs = mzs[mzs != 0]
+        return float(mzs.mean()) if mzs.size else 0.0
+
     def get_chrom_array(
         self,
         scan_array: 'ScanArray',
@@ -102,14 +158,6 @@ class FeaturePointer:
             rts, intsys  # type: ignore
         )
 
-    @property
-    def scan_start(self) -> int:
-        return self.scan_idxs[0]
-
-    @property
-    def scan_end(self) -> int:
-        return self.scan_idxs[-1]
-
     @property
     def n_scans(self):
         """Number of scans this feature spans."""
@@ -125,6 +173,43 @@ class FeaturePointer:
         """
         return self.get_intensity_values(scan_array).max()
 
+    def get_mz_and_intsy_max(
+        self,
+        scan_array: 'ScanArray',
+    ) -> tuple[float, float]:
+        """
+        Same as (get_mz_values(...).max(), get_max_intsy(...)), reading
+        each row's stored values once instead of densifying them
+        """
+        self.validate_source(scan_array)
+
+        maxima = []
+        for matrix in (scan_array.mz_arr, scan_array.intsy_arr):
+            _, values = _get_row_window_stored(
+                matrix,
+                self.mz_lane_idx,
+                self.scan_start,
+                self.scan_end,
+            )
+            width = self.scan_end - self.scan_start
+            if values.size == 0:
+                if width <= 0:
+                    raise ValueError(
+                        f"FeaturePointer spans no scans "
+                        f"(scan_start: {self.scan_start}, "
+                        f"scan_end: {self.scan_end})"
+                    )
+                maxima.append(0.0)
+                continue
+
+            vmax = float(values.max())
+            # Unstored entries in the window are zeros
+            if values.size < width and vmax < 0:
+                vmax = 0.0
+            maxima.append(vmax)
+
+        return maxima[0], maxima[1]
+
     def get_max_intsy_scan_num(
         self,
         scan_array: 'ScanArray',
@@ -133,9 +218,24 @@ class FeaturePointer:
         Return the scan number containing the maximum intensity
         given by this pointer
         """
-        idx = self.get_intensity_values(scan_array).argmax()
-        rt = self.get_retention_times(scan_array)[idx]
-        return scan_array.rt_to_scan_num(rt)
+        self.validate_source(scan_array)
+
+        # Scan nums are idxs into rt_arr, so the apex is the column of the
+        #   largest stored intensity; no need to densify the window, or for
+        #   rt_to_scan_num's search over all RTs
+        cols, intsys = _get_row_window_stored(
+            scan_array.intsy_arr,
+            self.mz_lane_idx,
+            self.scan_start,
+            self.scan_end,
+        )
+        if intsys.size == 0 or intsys.max() <= 0:
+            # No signal: argmax of the dense window, as before
+            idx = self.get_intensity_values(scan_array).argmax()
+            return self.scan_start + int(idx)
+
+        # Earliest scan among ties, like argmax
+        return int(cols[intsys == intsys.max()].min())
 
     def validate_source(
         self,
@@ -156,4 +256,239 @@ class FeaturePointer:
             )
 
     def __repr__(self):
-        return f"FeaturePointer(n_scans={self.n_scans})"
\ No newline at end of file
+        return f"FeaturePointer(n_scans={self.n_scans})"
+
+
+@dataclass
+class FeaturePointerBatch:
+    """
+    Several FeaturePointers into the same ScanArray that all span the
+    same scans, stored column-wise: one array of mass lane idxs and one
+    shared array of scan idxs.
+
+    Iterating yields ordinary FeaturePointers (sharing `scan_idxs`, as
+    repeated ScanArray.make_feature_pointer calls would), for callers that
+    need per-feature objects.
+    """
+    mz_lane_idxs: np.ndarray[int]
+    scan_idxs: np.ndarray[...,]
+    source_array_uuid: int
+    source_array_shape: tuple
+
+    # As on FeaturePointer
+    scan_start: int = field(init=False, repr=False, compare=False)
+    scan_end: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.mz_lane_idxs = np.asarray(self.mz_lane_idxs)
+        self.scan_idxs.sort()
+        if self.scan_idxs.size:
+            self.scan_start = int(self.scan_idxs[0])
+            self.scan_end = int(self.scan_idxs[-1])
+        else:
+            self.scan_start = self.scan_end = 0
+
+    def __len__(self) -> int:
+        return self.mz_lane_idxs.size
+
+    def __iter__(self):
+        for mz_lane_idx in self.mz_lane_idxs.tolist():
+            yield FeaturePointer(
+                mz_lane_idx=mz_lane_idx,
+                scan_idxs=self.scan_idxs,
+                source_array_uuid=self.source_array_uuid,
+                source_array_shape=self.source_array_shape,
+            )
+
+    def get_intensity_values(
+            self,
+            scan_array: 'ScanArray',
+    ) -> np.ndarray:
+        """
+        Intensity values of every feature in the batch, as a 2D
+        (n_features, n_scans) array. Same scan range as
+        FeaturePointer.get_intensity_values.
+        """
+        self.validate_source(scan_array)
+
+        return scan_array.intsy_arr[
+            self.mz_lane_idxs,
+            self.scan_start: self.scan_end,
+        ].toarray()
+
+    def get_retention_times(
+            self,
+            scan_array: 'ScanArray',
+    ) -> np.ndarray:
+        """
+        Retention times shared by every feature in the batch.
+        """
+        self.validate_source(scan_array)
+
+        return scan_array.rt_arr[
+           self.scan_start: self.scan_end
+        ]
+
+    def validate_source(
+        self,
+        scan_array: 'ScanArray',
+    ):
+        if scan_array.uuid != self.source_array_uuid:
+            raise ValueError(
+                f"FeaturePointerBatch was used to access a ScanArray with "
+                f"a non-matching UUID. \n"
+                f"FeaturePointerBatch.source_array_uuid: "
+                f"{self.source_array_uuid} \n"
+                f"scan_array.uuid: {scan_array.uuid}"
+            )
+
+    def __repr__(self):
+        return (
+            f"FeaturePointerBatch(n_features={len(self)}, "
+            f"n_scans={len(self.scan_idxs)})"
+        )
+
+
+@dataclass
+class FeaturePointerTable:
+    """
+    The (mz_lane_idx, scan_start, scan_end) of a list of FeaturePointers,
+    stored column-wise, for reductions over all of them without walking
+    the list. Rows follow the list's order.
+
+    Built from the list (FeaturePointerTable.from_pointers), which stays
+    the canonical storage: a table is a read-only snapshot of it.
+    """
+    mz_lane_idxs: np.ndarray[int]
+    scan_starts: np.ndarray[int]
+    scan_ends: np.ndarray[int]
+    source_array_uuids: frozenset[int]
+
+    @classmethod
+    def from_pointers(
+        cls,
+        ftr_ptrs: list['FeaturePointer'],
+    ) -> 'FeaturePointerTable':
+        n_ptrs = len(ftr_ptrs)
+        columns = {
+            name: np.fromiter(
+                (getattr(x, attr) for x in ftr_ptrs),
+                dtype=np.int64, count=n_ptrs,
+            )
+            for name, attr in (
+                ('mz_lane_idxs', 'mz_lane_idx'),
+                ('scan_starts', 'scan_start'),
+                ('scan_ends', 'scan_end'),
+            )
+        }
+        # Tables get cached (see Ensemble._get_cofeature_table), so callers
+        #   mustn't be able to edit them in place
+        for column in columns.values():
+            column.flags.writeable = False
+
+        return cls(
+            **columns,
+            source_array_uuids=frozenset(
+                x.source_array_uuid for x in ftr_ptrs
+            ),
+        )
+
+    def __len__(self) -> int:
+        return self.mz_lane_idxs.size
+
+    def __getitem__(
+        self,
+        idxs: slice | np.ndarray,
+    ) -> 'FeaturePointerTable':
+        """
+        Rows `idxs` of this table (views of its columns, if `idxs` is a
+        slice)
+        """
+        return FeaturePointerTable(
+            mz_lane_idxs=self.mz_lane_idxs[idxs],
+            scan_starts=self.scan_starts[idxs],
+            scan_ends=self.scan_ends[idxs],
+            source_array_uuids=self.source_array_uuids,
+        )
+
+    def windows(self) -> dict[tuple[int, int], np.ndarray]:
+        """
+        Row idxs grouped by (scan_start, scan_end), in order of first
+        appearance
+        """
+        windows: dict[tuple[int, int], list[int]] = {}
+        for row, window in enumerate(
+            zip(self.scan_starts.tolist(), self.scan_ends.tolist())
+        ):
+            windows.setdefault(window, []).append(row)
+        return {
+            window: np.array(rows) for window, rows in windows.items()
+        }
+
+    def validate_source(
+        self,
+        scan_array: 'ScanArray',
+    ):
+        for source_array_uuid in self.source_array_uuids:
+            if scan_array.uuid != source_array_uuid:
+                raise ValueError(
+                    f"FeaturePointer was used to access a ScanArray with "
+                    f"a non-matching UUID. \n"
+                    f"FeaturePointer.source_array_uuid: {source_array_uuid} \n"
+                    f"scan_array.uuid: {scan_array.uuid}"
+                )
+
+    def __repr__(self):
+        return f"FeaturePointerTable(n_features={len(self)})"
+
+
+def _get_row_window(
+    matrix: 'csr_array',
+    row: int,
+    start: int,
+    end: int,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Same as matrix[row, start:end].toarray().flatten(), but read straight
+    off the CSR arrays: only the row's stored values are touched, and no
+    intermediate sparse array is built.
+
+    If `out` is given (1D, matrix.dtype, at least end - start long), the
+    window is written into its start and a view of that is returned, so a
+    loop over many rows can reuse one buffer. The view is overwritten by
+    the next call using the same buffer.
+    """
+    end = min(end, matrix.shape[1])
+    cols, values = _get_row_window_stored(matrix, row, start, end)
+
+    width = max(end - start, 0)
+    if out is None:
+        dense = np.zeros(width, dtype=matrix.dtype)
+    else:
+        dense = out[:width]
+        dense.fill(0)
+    dense[cols - start] = values
+    return dense
+
+
+def _get_row_window_stored(
+    matrix: 'csr_array',
+    row: int,
+    start: int,
+    end: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The column idxs and values stored in matrix[row, start:end] (i.e.
+    without the implicit zeros)
+    """
+    row_start, row_end = matrix.indptr[row], matrix.indptr[row + 1]
+    cols = matrix.indices[row_start:row_end]
+    values = matrix.data[row_start:row_end]
+
+    if matrix.has_sorted_indices:
+        lo, hi = np.searchsorted(cols, (start, end))
+        return cols[lo:hi], values[lo:hi]
+
+    in_window = (cols >= start) & (cols < end)
+    return cols[in_window], values[in_window]
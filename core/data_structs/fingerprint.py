@@ -5,35 +5,118 @@ import numpy as np
 
 from dataclasses import dataclass, field
 from pathlib import Path
-import uuid
+import weakref
 
-from typing import TYPE_CHECKING
+from core.data_structs.uuid_types import new_uuid
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from core.data_structs import FingerprintUUID
 
 
+class DescriptorPanel(Sequence[str]):
+    """
+    An immutable, ordered sequence of assay descriptor names. Fingerprints
+    with the same descriptors share a single instance (see
+    intern_descriptors()), along with its descriptor -> index lookup.
+
+    Not a tuple subclass, since tuples can't be weakly referenced.
+    """
+    __slots__ = ('_names', '_lookup', '__weakref__')
+
+    def __init__(self, names: Iterable[str]):
+        self._names: tuple[str, ...] = tuple(names)
+        self._lookup: Optional[dict[str, int]] = None
+
+    def __getitem__(self, idx):
+        return self._names[idx]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, DescriptorPanel):
+            return self is other or self._names == other._names
+        if isinstance(other, (tuple, list)):
+            return self._names == tuple(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._names)
+
+    def __reduce__(self):
+        # Unpickled panels are interned too
+        return intern_descriptors, (self._names,)
+
+    def __repr__(self) -> str:
+        return f"DescriptorPanel({list(self._names)})"
+
+    def index_of(self, descriptor: str) -> int:
+        """
+        Returns the position of `descriptor` in this panel.
+        Raises KeyError if it is absent.
+        """
+        if self._lookup is None:
+            # Built once per panel. First occurrence wins, like list.index
+            lookup = {}
+            for idx, name in enumerate(self._names):
+                lookup.setdefault(name, idx)
+            self._lookup = lookup
+        return self._lookup[descriptor]
+
+
+# Live panels, keyed by their contents. An entry is dropped once nothing
+#   holds on to its panel
+_PANELS: 'weakref.WeakValueDictionary[tuple[str, ...], DescriptorPanel]' = (
+    weakref.WeakValueDictionary()
+)
+
+
+def intern_descriptors(descriptors: Iterable[str]) -> DescriptorPanel:
+    """
+    Returns the shared DescriptorPanel with these descriptors,
+    creating it if needed
+    """
+    key = tuple(descriptors)
+    panel = _PANELS.get(key)
+    if panel is None:
+        panel = DescriptorPanel(key)
+        _PANELS[key] = panel
+    return panel
+
+
 @dataclass
 class Fingerprint:
     """
     Dataclass containing activity fingerprint data.
 
-    array: a 1D array containing floats representing assay data
-    descriptors: a list (of the same length) naming each assay
-    uuid: A unique 128-bit integer generated upon initializing this class
+    array: a 1D array containing floats representing assay data. Stored as
+        contiguous float32
+    descriptors: a sequence (of the same length) naming each assay. Stored
+        as a DescriptorPanel shared by all fingerprints with the same
+        descriptors
+    uuid: A unique integer generated upon initializing this class
     injection_uuid: Assigned as an Injection object's UUID if the fingerprint
         is 'linked' (i.e. is deemed to correspond to the same sample)
     metadata: A dictionary containing other information about the fingerprint
     that the user can import
     """
-    array: np.ndarray[float]
-    descriptors: list[str]
-    uuid: 'FingerprintUUID' = field(default_factory=lambda: uuid.uuid4().int)
+    array: np.ndarray[np.float32]
+    descriptors: DescriptorPanel
+    uuid: 'FingerprintUUID' = field(default_factory=new_uuid)
 
     def __post_init__(self):
         """
-        Some error checks
+        Normalizes storage, then some error checks
         :return:
         """
+        self.array = np.ascontiguousarray(self.array, dtype=np.float32)
+        self.descriptors = intern_descriptors(self.descriptors)
+
         if self.array.ndim != 1:
             raise ValueError(
                 f"array must be 1-dimensional. "
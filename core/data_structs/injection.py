@@ -4,13 +4,13 @@ Dataclass containing data from an LC/MS injection
 import pyopenms as oms
 # import numpy as np
 
+from core.data_structs.uuid_types import new_uuid
 from core.data_structs.scan_array import (
     ScanArray, build_scan_array, ScanArrayParameters)
 # from core.utils.array_types import to_spec_arr, SpectrumArray
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from uuid import uuid4
 import numpy as np
 from typing import Literal, Optional, TYPE_CHECKING
 
@@ -24,15 +24,17 @@ if TYPE_CHECKING:
         Ensemble,
     )
 
-@dataclass
+@dataclass(slots=True)
 class Injection:
     """
     Container for raw LC/MS data
     """
     filename: str
     scan_array_parameters: tuple[ScanArrayParameters, ...]
-    exp: Optional[oms.MSExperiment] = None
-    uuid: 'InjectionUUID' = field(default_factory=lambda: uuid4().int)
+    # Either fully loaded, or an indexed .mzML opened on disk (spectra
+    # are then read one at a time while the ScanArrays are built)
+    exp: Optional[oms.MSExperiment | oms.OnDiscMSExperiment] = None
+    uuid: 'InjectionUUID' = field(default_factory=new_uuid)
     sample_uuid: Optional['SampleUUID'] = None
     scan_array_ms1: Optional[ScanArray] = None
     scan_array_ms2: Optional[ScanArray] = None
@@ -50,26 +52,37 @@ class Injection:
         if not self.exp:
             return
 
-        # Calling this loads the thing in memory
-        # (some functions don't work otherwise)
-        self.exp.get_df()
+        if isinstance(self.exp, oms.MSExperiment):
+            # Calling this loads the thing in memory
+            # (some functions don't work otherwise)
+            self.exp.get_df()
 
         # Build MS1 and MS2 scan arrays
-        available_ms_levels = self.exp.getMSLevels()
+        metadata = self._get_spectra_metadata()
+        available_ms_levels = metadata.getMSLevels()
 
-        for level, params in enumerate(self.scan_array_parameters):
-            level = level + 1
+        levels = range(1, len(self.scan_array_parameters) + 1)
+        for level in levels:
             if level not in available_ms_levels:
                 raise ValueError(
                     f"Requested MS level {level}, but file {self.filename} only"
                     f" contains MS levels {available_ms_levels}"
                 )
 
+        # Split the spectra by MS level in a single sweep, rather than one
+        #   sweep per ScanArray
+        selections = self._select_spectra(
+            metadata,
+            [level for level in levels if not self.get_scan_array(level)],
+        )
+
+        for level, params in zip(levels, self.scan_array_parameters):
             self.assemble_scan_array(
                 ms_level=level,
                 mz_tolerance=params.mz_tolerance,
                 scan_gap_tolerance=params.scan_gap_tolerance,
                 min_intsy=params.min_intsy,
+                selection=selections.get(level),
             )
 
     def get_scan_array(
@@ -94,6 +107,7 @@ class Injection:
         mz_tolerance: float,
         scan_gap_tolerance: int,
         min_intsy: float,
+        selection: Optional['_SpectraSelection'] = None,
     ) -> None:
         """
         Constructs a ScanArray and fills the self.scan_array property.
@@ -106,12 +120,15 @@ class Injection:
         :param scan_gap_tolerance: Maximum number of empty scans before
                     starting a new mass lane
         :param min_intsy: Minimum intensity to consider (i.e. noise threshold)
+        :param selection: This level's spectra, if already picked out by
+                    _select_spectra()
         :return:
         """
-        if ms_level not in self.exp.getMSLevels():
+        metadata = self._get_spectra_metadata()
+        if ms_level not in metadata.getMSLevels():
             raise ValueError(
                 f"Invalid ms_level specified: {ms_level}. "
-                f"Experiment only contains {self.exp.getMSLevels()}"
+                f"Experiment only contains {metadata.getMSLevels()}"
             )
 
         match ms_level:
@@ -123,56 +140,12 @@ class Injection:
                 if self.scan_array_ms2:
                     return
 
-        # DDA at MS2: replicate MS2 scans of one precursor are interleaved
-        # with MS2s of other precursors, so any finite gap tolerance would
-        # fragment mass lanes incorrectly. The Ensemble layer does the
-        # compound-level filtering downstream.
         is_dda_ms2 = (ms_level == 2 and self.acquisition_mode == 'dda')
 
-        # Iterate through experiment and retrieve appropriate spectra,
-        # tracking the most recent MS1 scan_num as we go (used to populate
-        # `triggering_ms1_scan_arr` for DDA MS2 ScanArrays).
-        spectra: list[oms.MSSpectrum] = []
-        scan_nums: list[int] = []
-        precursor_mzs: list[float] = []
-        precursor_charges: list[int] = []
-        isolation_los: list[float] = []
-        isolation_his: list[float] = []
-        triggering_ms1_scans: list[int] = []
-        last_ms1_scan_num: int = -1
-
-        for num, spectrum in enumerate(self.exp.getSpectra()):
-            spectrum: oms.MSSpectrum
-
-            current_level = spectrum.getMSLevel()
-            if current_level == 1:
-                last_ms1_scan_num = num
-
-            if current_level != ms_level:
-                continue
-
-            spectra.append(spectrum)
-            scan_nums.append(num)
-
-            if is_dda_ms2:
-                precursors = spectrum.getPrecursors()
-                if precursors:
-                    prec = precursors[0]
-                    prec_mz = prec.getMZ()
-                    lo_off = prec.getIsolationWindowLowerOffset()
-                    hi_off = prec.getIsolationWindowUpperOffset()
-                    precursor_mzs.append(prec_mz)
-                    precursor_charges.append(prec.getCharge())
-                    isolation_los.append(prec_mz - lo_off)
-                    isolation_his.append(prec_mz + hi_off)
-                else:
-                    # MS2 scan with no precursor metadata — shouldn't happen
-                    # in real DDA data but stay defensive
-                    precursor_mzs.append(np.nan)
-                    precursor_charges.append(0)
-                    isolation_los.append(np.nan)
-                    isolation_his.append(np.nan)
-                triggering_ms1_scans.append(last_ms1_scan_num)
+        if selection is None:
+            selection = self._select_spectra(metadata, [ms_level])[ms_level]
+        spectra = selection.spectra
+        scan_nums = selection.scan_nums
 
         effective_gap = scan_gap_tolerance
         if is_dda_ms2:
@@ -180,6 +153,9 @@ class Injection:
             # gap_counter > tolerance, so any value >= len(spectra) suffices.
             effective_gap = len(spectra) + 1
 
+        if isinstance(self.exp, oms.OnDiscMSExperiment):
+            spectra = _OnDiscSpectra(self.exp, scan_nums)
+
         scan_array: ScanArray = build_scan_array(
             spectra=spectra,
             mz_tolerance=mz_tolerance,
@@ -189,11 +165,16 @@ class Injection:
         )
 
         if is_dda_ms2:
-            scan_array.precursor_mz_arr = np.array(precursor_mzs, dtype='f4')
-            scan_array.precursor_charge_arr = np.array(precursor_charges, dtype='i4')
-            scan_array.isolation_lo_arr = np.array(isolation_los, dtype='f4')
-            scan_array.isolation_hi_arr = np.array(isolation_his, dtype='f4')
-            scan_array.triggering_ms1_scan_arr = np.array(triggering_ms1_scans, dtype='i4')
+            scan_array.precursor_mz_arr = np.array(
+                selection.precursor_mzs, dtype='f4')
+            scan_array.precursor_charge_arr = np.array(
+                selection.precursor_charges, dtype='i4')
+            scan_array.isolation_lo_arr = np.array(
+                selection.isolation_los, dtype='f4')
+            scan_array.isolation_hi_arr = np.array(
+                selection.isolation_his, dtype='f4')
+            scan_array.triggering_ms1_scan_arr = np.array(
+                selection.triggering_ms1_scans, dtype='i4')
 
         match ms_level:
             case 1:
@@ -206,6 +187,77 @@ class Injection:
                     f"only MS1 and MS2 are supported."
                 )
 
+    def _select_spectra(
+        self,
+        metadata: oms.MSExperiment,
+        ms_levels: list[int],
+    ) -> dict[int, '_SpectraSelection']:
+        """
+        Picks out the spectra of each of `ms_levels` in one pass over
+        `metadata`.
+
+        Tracks the most recent MS1 scan_num along the way (used to populate
+        `triggering_ms1_scan_arr` for DDA MS2 ScanArrays). Spectra are walked
+        via their metadata (levels, precursors); when reading from disk,
+        peaks are only loaded later, one spectrum at a time, by
+        build_scan_array
+        """
+        selections = {level: _SpectraSelection() for level in ms_levels}
+
+        # DDA at MS2: replicate MS2 scans of one precursor are interleaved
+        # with MS2s of other precursors, so any finite gap tolerance would
+        # fragment mass lanes incorrectly. The Ensemble layer does the
+        # compound-level filtering downstream.
+        dda_ms2 = (
+            selections.get(2) if self.acquisition_mode == 'dda' else None
+        )
+        last_ms1_scan_num: int = -1
+
+        for num, spectrum in enumerate(metadata.getSpectra()):
+            spectrum: oms.MSSpectrum
+
+            current_level = spectrum.getMSLevel()
+            if current_level == 1:
+                last_ms1_scan_num = num
+
+            selection = selections.get(current_level)
+            if selection is None:
+                continue
+
+            selection.spectra.append(spectrum)
+            selection.scan_nums.append(num)
+
+            if selection is dda_ms2:
+                precursors = spectrum.getPrecursors()
+                if precursors:
+                    prec = precursors[0]
+                    prec_mz = prec.getMZ()
+                    lo_off = prec.getIsolationWindowLowerOffset()
+                    hi_off = prec.getIsolationWindowUpperOffset()
+                    selection.precursor_mzs.append(prec_mz)
+                    selection.precursor_charges.append(prec.getCharge())
+                    selection.isolation_los.append(prec_mz - lo_off)
+                    selection.isolation_his.append(prec_mz + hi_off)
+                else:
+                    # MS2 scan with no precursor metadata — shouldn't happen
+                    # in real DDA data but stay defensive
+                    selection.precursor_mzs.append(np.nan)
+                    selection.precursor_charges.append(0)
+                    selection.isolation_los.append(np.nan)
+                    selection.isolation_his.append(np.nan)
+                selection.triggering_ms1_scans.append(last_ms1_scan_num)
+
+        return selections
+
+    def _get_spectra_metadata(self) -> oms.MSExperiment:
+        """
+        Returns an MSExperiment holding every spectrum's metadata (MS level,
+        RT, precursors). For an on-disc experiment this has no peaks
+        """
+        if isinstance(self.exp, oms.OnDiscMSExperiment):
+            return self.exp.getMetaData()
+        return self.exp
+
     def add_ensemble(
         self,
         ensemble: 'Ensemble',
@@ -221,6 +273,33 @@ class Injection:
         ensemble.set_injection(self)
         self.ensembles[ensemble.uuid] = ensemble
 
+    def add_ensembles(
+        self,
+        ensembles: list['Ensemble'],
+    ) -> None:
+        """
+        Same as calling add_ensemble for each Ensemble, but the MS1
+        cofeature intensities every Ensemble needs are read in one pass
+        over the scan array
+        """
+        from core.data_structs.ensemble import _get_max_intsys_of_many
+
+        batch_uuids: set['EnsembleUUID'] = set()
+        for ensemble in ensembles:
+            if ensemble.uuid in self.ensembles or ensemble.uuid in batch_uuids:
+                raise ValueError(
+                    f"Ensemble already exists: {ensemble}"
+                )
+            batch_uuids.add(ensemble.uuid)
+
+        all_max_intsys = _get_max_intsys_of_many(
+            [ensemble._get_cofeature_table(ms_level=1) for ensemble in ensembles],
+            self.get_scan_array(ms_level=1),
+        )
+        for ensemble, ms1_max_intsys in zip(ensembles, all_max_intsys):
+            ensemble.set_injection(self, ms1_max_intsys=ms1_max_intsys)
+            self.ensembles[ensemble.uuid] = ensemble
+
     def remove_ensemble(
         self,
         uuid: 'EnsembleUUID',
@@ -243,4 +322,44 @@ class Injection:
         return (f"Injection("
                 f"{self.filename}, "
                 f"uuid={self.uuid}"
-                f")")
\ No newline at end of file
+                f")")
+
+
+@dataclass(slots=True)
+class _SpectraSelection:
+    """
+    The spectra of one MS level, as picked out by
+    Injection._select_spectra(). The precursor lists are only filled for
+    DDA MS2
+    """
+    spectra: list[oms.MSSpectrum] = field(default_factory=list)
+    scan_nums: list[int] = field(default_factory=list)
+    precursor_mzs: list[float] = field(default_factory=list)
+    precursor_charges: list[int] = field(default_factory=list)
+    isolation_los: list[float] = field(default_factory=list)
+    isolation_his: list[float] = field(default_factory=list)
+    triggering_ms1_scans: list[int] = field(default_factory=list)
+
+
+class _OnDiscSpectra:
+    """
+    Sequence of the spectra at `idxs` of an on-disc experiment, each read
+    from disk only when accessed
+    """
+    def __init__(
+        self,
+        exp: oms.OnDiscMSExperiment,
+        idxs: list[int],
+    ):
+        self.exp = exp
+        self.idxs = idxs
+
+    def __len__(self) -> int:
+        return len(self.idxs)
+
+    def __getitem__(self, i: int) -> oms.MSSpectrum:
+        return self.exp.getSpectrum(self.idxs[i])
+
+    def __iter__(self):
+        for idx in self.idxs:
+            yield self.exp.getSpectrum(idx)
@@ -5,7 +5,8 @@ that was either chemically or biologically analyzed
 
 from dataclasses import dataclass, field
 from typing import Optional, TYPE_CHECKING
-import uuid
+
+from core.data_structs.uuid_types import new_uuid
 
 if TYPE_CHECKING:
     from core.data_structs import (
@@ -14,11 +15,11 @@ if TYPE_CHECKING:
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class Sample:
     name: str
     uuid: 'SampleUUID' = field(
-        default_factory=lambda: uuid.uuid4().int
+        default_factory=new_uuid
     )
     injection: Optional['Injection'] = None
     fingerprint: Optional['Fingerprint'] = None
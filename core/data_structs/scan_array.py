@@ -6,8 +6,8 @@ This implementation uses sparse arrays to preserve memory.
 
 This representation is appropriate for the algorithms used later on
 """
+from collections import OrderedDict
 from dataclasses import dataclass, field
-import uuid
 from typing import TYPE_CHECKING, Optional
 from hashlib import sha256
 
@@ -16,12 +16,20 @@ from scipy.sparse import csr_array, csc_array
 import pyopenms as oms
 
 from core.utils.array_types import to_spec_arr, SpectrumArray
-from core.data_structs.feature_pointer import FeaturePointer
+from core.data_structs.uuid_types import new_uuid
+from core.data_structs.feature_pointer import (
+    FeaturePointer,
+    FeaturePointerBatch,
+)
 
 if TYPE_CHECKING:
     from core.data_structs import ScanArrayUUID
 
 
+# Max number of column blocks kept by ScanArray.get_xic_block
+_XIC_BLOCK_CACHE_SIZE = 16
+
+
 @dataclass
 class ScanArray:
     """
@@ -81,7 +89,7 @@ class ScanArray:
     intsy_arr: csr_array
     rt_arr: np.ndarray[float]
     scan_num_arr: np.ndarray[int]
-    uuid: 'ScanArrayUUID' = field(default_factory=lambda: uuid.uuid4().int)
+    uuid: 'ScanArrayUUID' = field(default_factory=new_uuid)
     mz_lane_label: Optional[np.ndarray[float]] = None
     mz_arr_csc: Optional[csc_array] = None
     intsy_arr_csc: Optional[csc_array] = None
@@ -98,6 +106,16 @@ class ScanArray:
 
 
     def __post_init__(self):
+        # Intensities don't need float64, and every hot path over them
+        #   (lane maxima, slicing, correlation) is bandwidth-bound. m/z
+        #   keeps float64: ppm-level accuracy needs it
+        self.intsy_arr = _compact_csr(self.intsy_arr, dtype=np.float32)
+        if (
+            self.intsy_arr_csc is not None
+            and self.intsy_arr_csc.dtype != np.float32
+        ):
+            self.intsy_arr_csc = None
+
         # Get m/z value of the tallest signal in each row
         # This is used as a measure of the 'm/z lane' represented by row
         max_col_idxs = self.intsy_arr.argmax(axis=1)
@@ -116,6 +134,52 @@ class ScanArray:
         if type(self.intsy_arr_csc) is type(None):
             self.intsy_arr_csc = self.intsy_arr.tocsc(copy=True)
 
+        # Recently used scan-range column blocks (see get_xic_block). Not a
+        #   dataclass field, so it's never persisted
+        self._xic_block_cache: OrderedDict[tuple[int, int], csr_array] = (
+            OrderedDict()
+        )
+
+    @property
+    def rt_arr_f64(self) -> np.ndarray:
+        """
+        rt_arr as float64, converted once and kept. Interpolation and RT
+        binary searches work in float64; reading this instead of
+        converting a slice of rt_arr saves a copy per cofeature search.
+        Treat as read-only.
+        """
+        rt_arr_f64 = getattr(self, '_rt_arr_f64', None)
+        if rt_arr_f64 is None:
+            rt_arr_f64 = np.asarray(self.rt_arr, dtype=np.float64)
+            self._rt_arr_f64 = rt_arr_f64
+        return rt_arr_f64
+
+    def get_xic_block(
+        self,
+        scan_start: int,
+        scan_end: int,
+    ) -> csr_array:
+        """
+        Returns intensities of every mass lane over scans
+        [scan_start, scan_end) as a CSR array. The most recently used
+        blocks are cached (ScanArrays aren't mutated after construction),
+        so repeated cofeature searches over the same window only slice once.
+        Treat the returned array as read-only.
+        """
+        key = (int(scan_start), int(scan_end))
+        block = self._xic_block_cache.get(key)
+        if block is not None:
+            self._xic_block_cache.move_to_end(key)
+            return block
+
+        block = self.intsy_arr_csc[:, key[0]:key[1]].tocsr(copy=False)
+
+        self._xic_block_cache[key] = block
+        if len(self._xic_block_cache) > _XIC_BLOCK_CACHE_SIZE:
+            self._xic_block_cache.popitem(last=False)
+
+        return block
+
     def get_bpc(
             self,
             mz_range:Optional[tuple[float, float]] = None,
@@ -273,8 +337,8 @@ class ScanArray:
         Given a scan number, retrieves the spectrum corresponding to that scan
         """
         return to_spec_arr(
-            mz_arr=self.mz_arr_csc._getcol(scan_num).toarray().flatten(),
-            intsy_arr=self.intsy_arr_csc._getcol(scan_num).toarray().flatten(),
+            mz_arr=self.mz_arr_csc._getcol(scan_num).toarray().ravel(),
+            intsy_arr=self.intsy_arr_csc._getcol(scan_num).toarray().ravel(),
         )
 
     def rt_to_scan_num(
@@ -312,6 +376,22 @@ class ScanArray:
             source_array_shape=self.mz_arr.shape,
         )
 
+    def make_feature_pointer_batch(
+        self,
+        mass_lane_idxs: np.ndarray,
+        scan_idxs: np.ndarray[...,],
+    ) -> 'FeaturePointerBatch':
+        """
+        'Low level API' - make_feature_pointer for many mass lanes at once,
+        all spanning the same scan_idxs.
+        """
+        return FeaturePointerBatch(
+            mz_lane_idxs=mass_lane_idxs,
+            scan_idxs=scan_idxs,
+            source_array_uuid=self.uuid,
+            source_array_shape=self.mz_arr.shape,
+        )
+
     def extract_feature_pointer(
         self,
         target_mz: float,
@@ -342,18 +422,15 @@ class ScanArray:
             )
         ]
 
-        # Get scan idxs
-        rts: np.ndarray = self.rt_arr[
+        # Get scan idxs. These are the positions of the in-window RTs, so
+        #   there's no need to look each RT up again with rt_to_scan_num
+        scan_idxs: np.ndarray[int] = np.flatnonzero(
             np.abs(self.rt_arr - target_rt) < rt_window
-        ]
+        )
 
-        if rts.size == 0:
+        if scan_idxs.size == 0:
             return None
 
-        scan_idxs: np.ndarray[int] = np.array(
-            [self.rt_to_scan_num(rt) for rt in rts],
-        )
-
         return self.make_feature_pointer(
             mass_lane_idx=mz_lane_idx,
             scan_idxs=scan_idxs,
@@ -462,6 +539,28 @@ def build_scan_array(
     return scan_array
 
 
+def _compact_csr(
+    arr: csr_array,
+    dtype: np.dtype,
+) -> csr_array:
+    """
+    Returns `arr` with its values cast to `dtype` and its index arrays
+    as int32 (when the matrix is small enough), without copying whatever
+    already matches.
+    """
+    if arr.nnz >= 2**31 or max(arr.shape) >= 2**31:
+        return arr.astype(dtype, copy=False)
+
+    return csr_array(
+        (
+            arr.data.astype(dtype, copy=False),
+            arr.indices.astype(np.int32, copy=False),
+            arr.indptr.astype(np.int32, copy=False),
+        ),
+        shape=arr.shape,
+    )
+
+
 def argrange(
         arr: np.ndarray,
         start: float | int,
@@ -498,7 +597,7 @@ class Feature:
             self.total_num_scans,
             dtype= [
                 ('mz', 'f8'),
-                ('intsy', 'f8'),
+                ('intsy', 'f4'),
                 ('rt', 'f8'),
             ]
         )
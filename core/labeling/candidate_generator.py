@@ -152,8 +152,14 @@ def stratify(
 
     rng = np.random.default_rng(seed)
 
-    intsys = np.array([c.apex_intsy for c in candidates])
-    widths = np.array([c.rough_width for c in candidates])
+    intsys = np.fromiter(
+        (c.apex_intsy for c in candidates),
+        dtype=np.float64, count=len(candidates),
+    )
+    widths = np.fromiter(
+        (c.rough_width for c in candidates),
+        dtype=np.int64, count=len(candidates),
+    )
 
     intsy_bins = _quantile_bin(intsys, n_intensity_bins)
     width_bins = _quantile_bin(widths, n_width_bins)
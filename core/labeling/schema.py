@@ -51,7 +51,7 @@ class Label:
     boundary_splits: list[int] = field(default_factory=list)
 
     # Per-label provenance — which sample this candidate came from.
-    # SampleUUID is an int (uuid4().int), regenerated on every import,
+    # SampleUUID is an int (new_uuid()), regenerated on every import,
     # so it also catches re-imported-into-new-mzk mistakes without
     # needing content hashing.
     sample_uuid: int = 0
@@ -74,7 +74,7 @@ class LabelFile:
         payload = {
             "schema_version": self.schema_version,
             "extraction_params": self.extraction_params,
-            # JSON keys must be strings; uuid4().int exceeds JS number
+            # JSON keys must be strings; uuids exceed the JS number
             # safe range anyway, so store as strings to be explicit.
             "sample_uuids": [str(u) for u in self.sample_uuids],
             "labels": [_label_to_dict(lbl) for lbl in self.labels],
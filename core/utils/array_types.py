@@ -1,9 +1,12 @@
 """
 Defines custom numpy array type (I use this alot; ergonomic)
+
+Intensities are stored as float32, same as ScanArray.intsy_arr; m/z and
+RT stay float64. Upcast explicitly before accumulating large sums.
 """
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 
 from typing import NewType
 
@@ -13,21 +16,26 @@ SpectrumArray = NewType(
         np.dtype(  # type: ignore
             [
                 ('mz', 'f8'),
-                ('intsy', 'f8'),
+                ('intsy', 'f4'),
             ]
         )
     ]
 )
 
 def to_spec_arr(
-    mz_arr: NDArray[np.float64],
-    intsy_arr: NDArray[np.float64],
+    mz_arr: ArrayLike,
+    intsy_arr: ArrayLike,
 ) -> SpectrumArray:
-    result = np.zeros(
+    """
+    Accepts arrays or plain sequences (e.g. lists); either is written
+    straight into the structured array, without an intermediate ndarray
+    """
+    # Every field is assigned below, so no need to zero-fill
+    result = np.empty(
         len(mz_arr),
         dtype= [
             ('mz', 'f8'),
-            ('intsy', 'f8'),
+            ('intsy', 'f4'),
         ]
     )
     result['mz'] = mz_arr
@@ -40,7 +48,7 @@ ChromArray = NewType(
         np.dtype(  # type: ignore
             [
                 ('rt', 'f8'),
-                ('intsy', 'f8'),
+                ('intsy', 'f4'),
             ]
         )
     ]
@@ -48,13 +56,13 @@ ChromArray = NewType(
 
 def to_chrom_arr(
     rt_arr: NDArray[np.float64],
-    intsy_arr: NDArray[np.float64],
+    intsy_arr: NDArray[np.float32],
 ) -> ChromArray:
-    result = np.zeros(
+    result = np.empty(
         len(rt_arr),
         dtype= [
             ('rt', 'f8'),
-            ('intsy', 'f8'),
+            ('intsy', 'f4'),
         ]
     )
     result['rt'] = rt_arr
@@ -67,7 +75,7 @@ EnsembleArray = NewType(
         np.dtype(  # type: ignore
             [
                 ('mz', 'f8'),
-                ('intsy', 'f8'),
+                ('intsy', 'f4'),
                 ('rt', 'f8'),
             ]
         )
@@ -77,7 +85,7 @@ EnsembleArray = NewType(
 def to_ensemble_arr(
     rt_arr: NDArray[np.float64],
     mz_arrs: list[NDArray[np.float64]],
-    intsy_arrs: list[NDArray[np.float64]],
+    intsy_arrs: list[NDArray[np.float32]],
 ) -> EnsembleArray:
     num_cofeatures: int = len(mz_arrs)
     num_scans: int = len(mz_arrs[0])
@@ -86,7 +94,7 @@ def to_ensemble_arr(
         shape=(num_scans, num_cofeatures),
         dtype=[
             ("mz", "f8"),
-            ("intsy", "f8"),
+            ("intsy", "f4"),
             ("rt", "f8"),
         ],
     )
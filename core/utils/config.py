@@ -48,6 +48,34 @@ def get_config_path() -> Path:
 
     return app_config_dir / 'config.ini'
 
+def get_cache_dir() -> Path:
+    """
+    Returns platform-appropriate directory for disposable caches
+    :return:
+    """
+    if os.name == 'nt':  # Windows
+        cache_dir = Path(
+            os.environ.get(
+                'LOCALAPPDATA',
+                Path.home()
+            )
+        )
+    else:   # Linux/macOS
+        cache_dir = Path(
+            os.environ.get(
+                'XDG_CACHE_HOME',
+                Path.home() / '.cache'
+            )
+        )
+
+    app_cache_dir = cache_dir / 'mzkit'
+    app_cache_dir.mkdir(
+        parents=True,
+        exist_ok=True,
+    )
+
+    return app_cache_dir
+
 def load_config() -> configparser.ConfigParser:
     """
     Loads a ConfigParser object, creating default if none exist
@@ -36,8 +36,18 @@ dict[str, any]
     >>> 	},
     >>> }
     """
+    # Only parse the columns we keep. The header is checked first so that
+    #   missing columns still fall through to sanity_check's error messages
+    usecols = None
+    if samples_in_rows and metadata_columns:
+        requested = list(dict.fromkeys([samplename_column, *metadata_columns]))
+        header = pd.read_csv(csv_filepath, nrows=0).columns
+        if all(col in header for col in requested):
+            usecols = requested
+
     df = pd.read_csv(
-        csv_filepath
+        csv_filepath,
+        usecols=usecols,
     )
 
     if not samples_in_rows:
@@ -28,7 +28,7 @@ import zipfile
 import pickle
 import json
 from pathlib import Path
-from dataclasses import asdict
+from dataclasses import asdict, fields
 
 from find_mfs import FormulaCandidate
 from molmass import Formula
@@ -189,7 +189,8 @@ def serialize_fingerprint_arrays(
     # Write arrays (Pickle is OK; numpy arrays)
     data = {
         'array':       sample.fingerprint.array,
-        'descriptors': sample.fingerprint.descriptors,
+        # Plain list, so the file doesn't depend on DescriptorPanel
+        'descriptors': list(sample.fingerprint.descriptors),
     }
     zf.writestr(
         f"{savepath}/fingerprint_data.pkl",
@@ -223,7 +224,7 @@ def serialize_injection_scanarrays(
     zf: 'zipfile.ZipFile',
 ):
     # Write ScanArrays. Using Pickle is OK here
-    ms1_scan_array_dict = sample.injection.scan_array_ms1.__dict__
+    ms1_scan_array_dict = _scan_array_fields(sample.injection.scan_array_ms1)
     zf.writestr(
         f"{savepath}/ms1_scan_array.pkl",
         data=pickle.dumps(
@@ -231,7 +232,9 @@ def serialize_injection_scanarrays(
         )
     )
     if sample.injection.scan_array_ms2:
-        ms2_scan_array_dict = sample.injection.scan_array_ms2.__dict__
+        ms2_scan_array_dict = _scan_array_fields(
+            sample.injection.scan_array_ms2
+        )
         zf.writestr(
             f"{savepath}/ms2_scan_array.pkl",
             data=pickle.dumps(
@@ -240,6 +243,17 @@ def serialize_injection_scanarrays(
         )
 
 
+def _scan_array_fields(scan_array: 'ScanArray') -> dict:
+    """
+    The ScanArray's dataclass fields, i.e. what ScanArray(**d) takes back.
+    Leaves out runtime-only attributes such as its slice cache
+    """
+    return {
+        f.name: getattr(scan_array, f.name)
+        for f in fields(scan_array)
+    }
+
+
 def serialize_injection_primitives(
     sample: 'Sample',
     savepath: str,
@@ -357,9 +371,10 @@ def serialize_sample_primitives(
     zf: 'zipfile.ZipFile',
 ):
     # Serialize simple data types
+    #   (Sample is slotted, so go through its fields rather than __dict__)
     sample_primitives = {
-        k: v for k, v in sample.__dict__.items()
-        if type(v) in [int, float, str, bool, type(None)]
+        f.name: getattr(sample, f.name) for f in fields(sample)
+        if type(getattr(sample, f.name)) in [int, float, str, bool, type(None)]
     }
 
     sample_primitives['metadata'] = sample.metadata
@@ -544,6 +559,7 @@ def deserialize_injection_ensembles(
 
     ensemble_data: list[dict] = pickle.loads(zf.read(ensembles_path))
 
+    ensembles: list['Ensemble'] = []
     for e_dict in ensemble_data:
         # Reconstruct ion_annots from serialized dicts
         reconstructed_ion_annots = {}
@@ -626,8 +642,10 @@ def deserialize_injection_ensembles(
             precursor_charge=e_dict.get('precursor_charge'),
         )
 
-        # This will call ensemble.set_injection():
-        injection.add_ensemble(ensemble)
+        ensembles.append(ensemble)
+
+    # This will call ensemble.set_injection() on each:
+    injection.add_ensembles(ensembles)
 
 
 def deserialize_fingerprint(
@@ -302,7 +302,10 @@ class MainController:
                 "scan_array_params": scan_array_params,
                 "acquisition_mode": acquisition_mode,
             },
-            on_completion_func=self.sample_controller.on_mzml_import_completion
+            on_completion_func=self.sample_controller.on_mzml_import_completion,
+            # Parsing and ScanArray construction are CPU-bound Python;
+            #   keep them off the GUI's GIL
+            executor_kind='process',
         )
 
 
@@ -453,10 +456,7 @@ class MainController:
     ):
         self.data_registry.register_alignment(alignment)
 
-        multi = sum(
-            1 for a in alignment.analytes
-            if len(a.ensemble_map) > 1
-        )
+        multi = alignment.matched_count
         print(
             f"\n=== Feature Table Import Complete ===\n"
             f"Samples: {alignment.sample_count}\n"
@@ -806,10 +806,7 @@ class MainController:
         self.data_registry.register_alignment(alignment)
 
         # Debug summary
-        multi_sample = sum(
-            1 for a in alignment.analytes
-            if len(a.ensemble_map) > 1
-        )
+        multi_sample = alignment.matched_count
         print(
             f"\n=== Alignment Complete ===\n"
             f"Samples: {alignment.sample_count}\n"
@@ -132,10 +132,10 @@ class SampleController(QtCore.QObject):
         self,
         samples: list['Sample'],
     ):
-        for sample in samples:
-            self.data_registry.register_sample(
-                sample
-            )
+        # One batch, so views get a single sigSamplesAdded
+        self.data_registry.register_samples(
+            samples
+        )
         
         # Enable sorting if we have samples and proxy model exists
         if self.sample_proxy_model and samples:
@@ -177,10 +177,10 @@ class SampleController(QtCore.QObject):
         :param samples:
         :return:
         """
-        for sample in samples:
-            self.data_registry.register_sample(
-                sample
-            )
+        # One batch, so views get a single sigSamplesAdded
+        self.data_registry.register_samples(
+            samples
+        )
         
         # Sort proxy model
         self.sample_proxy_model.sort(0)
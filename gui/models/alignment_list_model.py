@@ -51,10 +51,7 @@ class AlignmentListModel(QAbstractListModel):
                 return f"{label} ({alignment.analyte_count} analytes, {alignment.sample_count} samples)"
 
             case Qt.ToolTipRole:
-                multi = sum(
-                    1 for a in alignment.analytes
-                    if len(a.ensemble_map) > 1
-                )
+                multi = alignment.matched_count
                 return (
                     f"Analytes: {alignment.analyte_count}\n"
                     f"Matched: {multi}\n"
@@ -33,8 +33,8 @@ class SampleListModel(QAbstractListModel):
             self.registry.get_all_sample_uuids()
         )
 
-        self.registry.sigSampleAdded.connect(
-            self.onSampleAdded
+        self.registry.sigSamplesAdded.connect(
+            self.onSamplesAdded
         )
         self.registry.sigSampleRemoved.connect(
             self.onSampleRemoved
@@ -98,22 +98,22 @@ class SampleListModel(QAbstractListModel):
         return self.registry.get_sample(uuid)
 
 
-    def onSampleAdded(
+    def onSamplesAdded(
         self,
-        sample: 'Sample',
+        samples: list['Sample'],
     ):
         """
         Update Qt model to reflect registry changes.
-        Inserts sample at end
+        Inserts samples at end, as one block of rows
         """
         row = len(self._sample_uuids)  # Use current length, not rowCount()
         self.beginInsertRows(
             QModelIndex(),
             row,
-            row,
+            row + len(samples) - 1,
         )
 
-        self._sample_uuids.append(sample.uuid)
+        self._sample_uuids.extend(sample.uuid for sample in samples)
 
         self.endInsertRows()
 
@@ -475,10 +475,7 @@ class SpectrumPlotManager(QtCore.QObject):
         self.selected_rt = 0.0
         self.clear_signal_markers()
 
-        empty = to_spec_arr(
-            np.array([], dtype=np.float64),
-            np.array([], dtype=np.float64),
-        )
+        empty = to_spec_arr([], [])
         for plot in (self.ms1_plot, self.ms2_plot):
             # setSpectrumArray also clears anchored labels / ion
             # annotations / delta brackets on the plot.
@@ -29,7 +29,7 @@ class ProcessMonitorWindow(
         )
         self.tableView.resizeColumnsToContents()
 
-        self.process_controller.process_signals.output_ready.connect(
+        self.process_controller.process_signals.output_batch_ready.connect(
             self.update_text_browser
         )
 
@@ -67,9 +67,12 @@ class ProcessMonitorWindow(
     def update_text_browser(
             self,
             process_id: int,
-            level: str,
-            msg: str,
+            outputs: list[tuple[str, str]],
     ):
+        # One append per batch: each append re-lays out the document
         self.textBrowser.append(
-            f"Process: {process_id} [{level}] {msg}"
+            "\n".join(
+                f"Process: {process_id} [{level}] {msg}"
+                for level, msg in outputs
+            )
         )
\ No newline at end of file
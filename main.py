@@ -22,11 +22,14 @@ if sys.platform == 'linux':
     os.environ.setdefault('QT_QPA_PLATFORM', 'xcb')
 
 from gui.controllers import MainController
+from core.cli.process_runner import ProcessRunner
 from core.utils.config import load_config
 from PyQt5.QtWidgets import QApplication
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    # Don't keep the app alive for background jobs still running
+    app.aboutToQuit.connect(ProcessRunner.shutdown)
 
     config = load_config()
 
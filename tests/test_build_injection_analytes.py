@@ -0,0 +1,107 @@
+"""
+Parity test for the lane-wise peak picker in ``build_injection_analytes``.
+
+Compares the numba CSR kernel against the SciPy reference path on a
+synthetic ScanArray. No external files required.
+"""
+import numpy as np
+import pytest
+from scipy.sparse import csr_array
+
+from core.data_structs.scan_array import ScanArray
+from core.cli import build_injection_analytes as bia
+
+
+def _make_synthetic_scan_array(
+    n_lanes: int = 40,
+    n_scans: int = 300,
+    seed: int = 0,
+) -> ScanArray:
+    """
+    Each lane gets a few Gaussian peaks plus noise, then random gaps are
+    punched in so lanes split into several nonzero islands.
+    """
+    rng = np.random.default_rng(seed)
+    scans = np.arange(n_scans)
+    intsy = np.zeros((n_lanes, n_scans))
+    for lane in range(n_lanes):
+        for _ in range(int(rng.integers(0, 5))):
+            center = rng.uniform(0, n_scans)
+            width = rng.uniform(1.5, 10.0)
+            height = rng.uniform(500, 50000)
+            intsy[lane] += height * np.exp(-0.5 * ((scans - center) / width) ** 2)
+        intsy[lane] += rng.uniform(0, 200, size=n_scans)
+        intsy[lane][intsy[lane] < 150] = 0.0
+        intsy[lane][rng.random(n_scans) < 0.03] = 0.0
+
+    mz = np.where(
+        intsy > 0,
+        np.linspace(100, 900, n_lanes).reshape(-1, 1),
+        0.0,
+    )
+    return ScanArray(
+        mz_arr=csr_array(mz),
+        intsy_arr=csr_array(intsy),
+        rt_arr=(scans * 0.5).astype('f4'),
+        scan_num_arr=scans.astype('u4'),
+    )
+
+
+def _windows(feature_pointers) -> list[tuple[int, int, int]]:
+    return [
+        (int(fp.mz_lane_idx), int(fp.scan_start), int(fp.scan_end))
+        for fp in feature_pointers
+    ]
+
+
+@pytest.mark.skipif(
+    not bia._NUMBA_KERNEL_AVAILABLE,
+    reason="numba not installed",
+)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_build_features_numba_matches_python(seed, monkeypatch):
+    scan_array = _make_synthetic_scan_array(seed=seed)
+    params = dict(
+        min_peak_length_in_scans=3,
+        min_peak_height=2000.0,
+        prominence=1000.0,
+        min_num_scans_between_peaks=2,
+    )
+
+    monkeypatch.setenv("MZKIT_DISABLE_NUMBA", "1")
+    reference = bia.build_features(scan_array=scan_array, **params)
+
+    monkeypatch.delenv("MZKIT_DISABLE_NUMBA")
+    result = bia.build_features(scan_array=scan_array, **params)
+
+    assert len(reference) > 0
+    assert _windows(result) == _windows(reference)
+
+
+@pytest.mark.skipif(
+    not bia._NUMBA_KERNEL_AVAILABLE,
+    reason="numba not installed",
+)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_tophat_numba_matches_python(seed, monkeypatch):
+    scan_array = _make_synthetic_scan_array(seed=seed)
+    params = dict(
+        min_peak_length_in_scans=3,
+        min_peak_height=1000.0,
+        prominence=500.0,
+        min_num_scans_between_peaks=2,
+        tophat_window_size=31,
+    )
+
+    monkeypatch.setenv("MZKIT_DISABLE_NUMBA", "1")
+    reference = bia.improve_build_features_with_tophat(
+        scan_array=scan_array, **params,
+    )
+
+    monkeypatch.delenv("MZKIT_DISABLE_NUMBA")
+    result = bia.improve_build_features_with_tophat(
+        scan_array=scan_array, **params,
+    )
+
+    assert len(reference) > 0
+    assert _windows(result) == _windows(reference)
@@ -5,9 +5,14 @@ from typing import TYPE_CHECKING
 from pathlib import Path
 
 import numpy as np
+import pytest
+from scipy.sparse import csr_array
+
+from core.data_structs import FeaturePointerTable, ScanArray
+from core.data_structs import ensemble as ensemble_module
 
 if TYPE_CHECKING:
-    from core.data_structs import Sample, ScanArray
+    from core.data_structs import Sample
 
 
 # def test_composite_spectrum_generation(ensemble):
@@ -22,3 +27,58 @@ if TYPE_CHECKING:
 
 
 
+
+
+@pytest.mark.skipif(
+    not ensemble_module._NUMBA_KERNEL_AVAILABLE,
+    reason="numba not installed",
+)
+@pytest.mark.parametrize("seed", [0, 1])
+def test_window_maxima_numba_matches_scipy(seed, monkeypatch):
+    rng = np.random.default_rng(seed)
+    n_lanes, n_scans = 60, 200
+    intsy = rng.uniform(0, 1e5, size=(n_lanes, n_scans))
+    intsy[rng.random((n_lanes, n_scans)) < 0.8] = 0.0
+    mz = np.where(intsy > 0, np.linspace(100, 900, n_lanes)[:, None], 0.0)
+    scan_array = ScanArray(
+        mz_arr=csr_array(mz),
+        intsy_arr=csr_array(intsy.astype('f4')),
+        rt_arr=np.arange(n_scans, dtype='f4'),
+        scan_num_arr=np.arange(n_scans, dtype='u4'),
+    )
+
+    ftr_ptrs = []
+    for _ in range(100):
+        # Most pointers share a window, like an ensemble's cofeatures
+        start = 50 if rng.random() < 0.6 else int(rng.integers(0, 190))
+        ftr_ptrs.append(
+            scan_array.make_feature_pointer(
+                mass_lane_idx=int(rng.integers(0, n_lanes)),
+                scan_idxs=np.arange(start, start + int(rng.integers(2, 10))),
+            )
+        )
+    table = FeaturePointerTable.from_pointers(ftr_ptrs)
+
+    monkeypatch.setenv("MZKIT_DISABLE_NUMBA", "1")
+    ref_intsys = ensemble_module._get_max_intsys(table, scan_array)
+    ref_mzs = ensemble_module._get_max_mzs(table, scan_array)
+
+    monkeypatch.delenv("MZKIT_DISABLE_NUMBA")
+    np.testing.assert_array_equal(
+        ensemble_module._get_max_intsys(table, scan_array), ref_intsys,
+    )
+    np.testing.assert_array_equal(
+        ensemble_module._get_max_mzs(table, scan_array), ref_mzs,
+    )
+
+    fused_mzs, fused_intsys = ensemble_module._get_max_mzs_and_intsys(
+        table, scan_array,
+    )
+    np.testing.assert_array_equal(fused_mzs, ref_mzs)
+    np.testing.assert_array_equal(fused_intsys, ref_intsys)
+
+    # Per-pointer path reads the same stored values
+    for ftr_ptr, ref_mz, ref_intsy in zip(ftr_ptrs, ref_mzs, ref_intsys):
+        assert ftr_ptr.get_mz_and_intsy_max(scan_array) == (
+            float(ref_mz), float(ref_intsy),
+        )
@@ -4,22 +4,34 @@ from pathlib import Path
 from core.data_structs import DataRegistry, FeaturePointer
 from core.cli.find_cofeatures import (
     find_cofeatures_within_scan_array,
+    find_cofeatures_within_scan_array_batch,
     find_cofeatures_across_scan_array,
+    find_cofeatures_across_scan_array_batch,
+    _batch_correlate,
+    _MIN_NONZERO_OVERLAP,
+    _SCREEN_MARGIN,
 )
+from core.cli.generate_ensemble import (
+    get_cofeature_ensemble,
+    get_cofeature_ensembles,
+)
+from core.data_structs import Injection
+from core.data_structs.scan_array import ScanArray
 from core.utils.persistence import load_project
 
 import numpy as np
 import pyqtgraph as pg
 import pytest
+from scipy.sparse import csr_array
 
 if TYPE_CHECKING:
-    from core.data_structs import Sample, ScanArray
+    from core.data_structs import Sample
 
-# These tests request fixtures (scan_array / source_scan_array /
+# The plotting tests below request fixtures (scan_array / source_scan_array /
 # target_scan_array / search_ftr) that no longer exist; they predate the
 # current find_cofeatures API and conftest's injection/ensemble fixtures.
 # Skipped (visibly) until rewritten. See ARCHITECTURE.md "Known follow-ups".
-pytestmark = pytest.mark.skip(
+stale_fixtures = pytest.mark.skip(
     reason="stale fixtures; needs rewrite against current find_cofeatures API"
 )
 
@@ -37,6 +49,7 @@ def get_data_registry() -> 'DataRegistry':
     return data_registry
 
 
+@stale_fixtures
 def test_find_cofeatures_within_scan_array(
     scan_array: 'ScanArray',
     show_plot: bool = False,
@@ -57,6 +70,7 @@ def test_find_cofeatures_within_scan_array(
         )
 
 
+@stale_fixtures
 def test_find_cofeatures_across_scan_array(
     source_scan_array: 'ScanArray',
     target_scan_array: 'ScanArray',
@@ -77,6 +91,7 @@ def test_find_cofeatures_across_scan_array(
             cofeature_scan_array=target_scan_array,
         )
 
+@stale_fixtures
 def test_plot(
     search_ftr: 'FeaturePointer',
     co_ftrs: list['FeaturePointer'],
@@ -120,6 +135,188 @@ def get_test_featurepointer(
     return ftr_ptr
 
 
+def _make_coeluting_scan_array(
+    rng: np.random.Generator,
+    elution_centers: np.ndarray,
+    n_lanes: int,
+    n_scans: int = 300,
+    rt_offset: float = 0.0,
+) -> 'ScanArray':
+    """
+    Every lane is a noisy Gaussian peak centred on one of
+    `elution_centers`, so lanes sharing a centre correlate
+    """
+    scans = np.arange(n_scans)
+    intsy = np.zeros((n_lanes, n_scans))
+    for lane in range(n_lanes):
+        center = rng.choice(elution_centers) + rng.normal(0, 1)
+        width = rng.uniform(2, 8)
+        intsy[lane] = (
+            rng.uniform(1e3, 1e6) * np.exp(-0.5 * ((scans - center) / width) ** 2)
+            + rng.uniform(0, 100, n_scans)
+        )
+        intsy[lane][intsy[lane] < 80] = 0.0
+
+    mz = np.where(intsy > 0, np.linspace(100, 900, n_lanes)[:, None], 0.0)
+    return ScanArray(
+        mz_arr=csr_array(mz),
+        intsy_arr=csr_array(intsy.astype('f4')),
+        rt_arr=(scans * 0.5 + rt_offset).astype('f4'),
+        scan_num_arr=scans.astype('u4'),
+    )
+
+
+def _make_search_ftr_ptrs(
+    rng: np.random.Generator,
+    scan_array: 'ScanArray',
+    n_ptrs: int,
+) -> list['FeaturePointer']:
+    # Half share one window, as the cofeatures of an ensemble search do
+    n_lanes, n_scans = scan_array.intsy_arr.shape
+    ftr_ptrs = []
+    for _ in range(n_ptrs):
+        start = 100 if rng.random() < 0.5 else int(rng.integers(0, n_scans - 40))
+        ftr_ptrs.append(
+            scan_array.make_feature_pointer(
+                mass_lane_idx=int(rng.integers(0, n_lanes)),
+                scan_idxs=np.arange(start, start + 30),
+            )
+        )
+    return ftr_ptrs
+
+
+def _windows(
+    cofeatures_per_ptr: list[list['FeaturePointer']],
+) -> list[list[tuple[int, int, int]]]:
+    return [
+        [(f.mz_lane_idx, f.scan_start, f.scan_end) for f in cofeatures]
+        for cofeatures in cofeatures_per_ptr
+    ]
+
+
+def test_within_scan_array_batch_matches_per_pointer():
+    rng = np.random.default_rng(0)
+    scan_array = _make_coeluting_scan_array(
+        rng, rng.uniform(0, 300, 15), n_lanes=200,
+    )
+    ftr_ptrs = _make_search_ftr_ptrs(rng, scan_array, n_ptrs=150)
+
+    batched = find_cofeatures_within_scan_array_batch(
+        scan_array, ftr_ptrs,
+        min_correlation=0.8, min_intsy=500, use_rel_intsy=False,
+    )
+    reference = [
+        find_cofeatures_within_scan_array(
+            scan_array, ftr_ptr,
+            min_correlation=0.8, min_intsy=500, use_rel_intsy=False,
+        )
+        for ftr_ptr in ftr_ptrs
+    ]
+
+    assert any(len(cofeatures) > 1 for cofeatures in reference)
+    assert _windows(batched) == _windows(reference)
+
+
+def test_across_scan_array_batch_matches_per_pointer():
+    rng = np.random.default_rng(1)
+    elution_centers = rng.uniform(0, 300, 15)
+    ms1 = _make_coeluting_scan_array(rng, elution_centers, n_lanes=200)
+    ms2 = _make_coeluting_scan_array(
+        rng, elution_centers, n_lanes=300, rt_offset=0.25,
+    )
+    ftr_ptrs = _make_search_ftr_ptrs(rng, ms1, n_ptrs=150)
+
+    batched = find_cofeatures_across_scan_array_batch(
+        ms1, ms2, ftr_ptrs,
+        min_correlation=0.8, min_intsy=500, use_rel_intsy=False,
+    )
+    reference = [
+        find_cofeatures_across_scan_array(
+            ms1, ms2, ftr_ptr,
+            min_correlation=0.8, min_intsy=500, use_rel_intsy=False,
+        )
+        for ftr_ptr in ftr_ptrs
+    ]
+
+    assert any(len(cofeatures) > 0 for cofeatures in reference)
+    assert _windows(batched) == _windows(reference)
+
+
+def test_batch_correlate_decides_near_threshold_pairs_in_float64():
+    rng = np.random.default_rng(2)
+    n_scans = 40
+    search_xics = rng.uniform(1e3, 1e6, (5, n_scans))
+    # Candidates are noisy copies of the search XICs, so there are
+    #   correlations close to any threshold worth testing
+    candidate_xics = (
+        np.repeat(search_xics, 20, axis=0)
+        * rng.uniform(0.5, 2.0, (100, 1))
+        + rng.normal(0, 1e5, (100, n_scans))
+    )
+    candidate_xics[rng.random(candidate_xics.shape) < 0.2] = 0.0
+    search_xics[rng.random(search_xics.shape) < 0.2] = 0.0
+    candidate_xics = np.abs(candidate_xics)
+
+    # Plain float64 Pearson over each pair's nonzero overlap
+    expected_corrs = np.full((len(search_xics), len(candidate_xics)), np.nan)
+    for i, y in enumerate(search_xics):
+        for j, x in enumerate(candidate_xics):
+            overlap = (y != 0) & (x != 0)
+            if overlap.sum() >= _MIN_NONZERO_OVERLAP:
+                expected_corrs[i, j] = np.corrcoef(y[overlap], x[overlap])[0, 1]
+
+    # Thresholds a hair either side of actual correlations: well within
+    #   _SCREEN_MARGIN, so float32 screening alone couldn't decide them
+    near = np.sort(expected_corrs[expected_corrs > 0.5].ravel())[::7]
+    assert near.size > 5
+    for corr in near:
+        for threshold in (corr - 1e-9, corr + 1e-9):
+            assert abs(threshold - corr) < _SCREEN_MARGIN
+            pairs = _batch_correlate(search_xics, candidate_xics, threshold)
+            expected = np.argwhere(expected_corrs > threshold)
+            np.testing.assert_array_equal(pairs, expected)
+
+
+def test_get_cofeature_ensembles_matches_get_cofeature_ensemble():
+    # Batched path registers via Injection.add_ensembles
+    rng = np.random.default_rng(3)
+    elution_centers = rng.uniform(0, 300, 15)
+    ms1 = _make_coeluting_scan_array(rng, elution_centers, n_lanes=200)
+    ms2 = _make_coeluting_scan_array(
+        rng, elution_centers, n_lanes=300, rt_offset=0.25,
+    )
+    ftr_ptrs = _make_search_ftr_ptrs(rng, ms1, n_ptrs=50)
+    kwargs = dict(
+        ms1_corr_threshold=0.8, ms2_corr_threshold=0.8,
+        min_intsy=500, use_rel_intsy=False,
+    )
+
+    injections = [
+        Injection(
+            filename=filename,
+            scan_array_parameters=(),
+            scan_array_ms1=ms1,
+            scan_array_ms2=ms2,
+            acquisition_mode='dia',
+        )
+        for filename in ('batched', 'reference')
+    ]
+    batched = get_cofeature_ensembles(ftr_ptrs, injections[0], **kwargs)
+    reference = [
+        get_cofeature_ensemble(injections[1], ftr_ptr, **kwargs)
+        for ftr_ptr in ftr_ptrs
+    ]
+
+    assert len(injections[0].ensembles) == len(injections[1].ensembles)
+    for ens, ref_ens in zip(batched, reference):
+        assert ens.injection is injections[0]
+        assert ens.base_ms1_cofeature_idx == ref_ens.base_ms1_cofeature_idx
+        assert ens.base_mz == ref_ens.base_mz
+        assert ens.base_intsy == ref_ens.base_intsy
+        assert ens.base_scan_num == ref_ens.base_scan_num
+        assert ens.peak_rt == ref_ens.peak_rt
+
+
 if __name__ == "__main__":
     data_registry: 'DataRegistry' = get_data_registry()
     sample: 'Sample' = data_registry.get_all_samples()[0]
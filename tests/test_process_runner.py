@@ -0,0 +1,53 @@
+"""
+Tests for ProcessRunner
+"""
+import time
+
+import pytest
+
+from core.cli.process_runner import ProcessRunner
+
+
+_PROBE_MODULE = '''
+import logging
+
+logger = logging.getLogger(__file__)
+
+
+def main(progress_callback, cancel_event):
+    logger.info("first")
+    logger.info("second")
+    cancel_event.wait(timeout=30)
+'''
+
+
+@pytest.fixture
+def process_pool():
+    yield
+    ProcessRunner.shutdown()
+
+
+def test_process_job_output_readable_while_running(tmp_path, process_pool):
+    # Back-to-back records: the second lands within FLUSH_INTERVAL of the
+    #   first, so would sit in a batching worker until the job ends
+    module_path = tmp_path / "probe_mod.py"
+    module_path.write_text(_PROBE_MODULE)
+
+    runner = ProcessRunner(
+        module_path=str(module_path),
+        executor_kind='process',
+    )
+    runner.start()
+
+    messages = []
+    deadline = time.monotonic() + 20
+    while "second" not in messages and time.monotonic() < deadline:
+        messages.extend(message for _, message in runner.get_all_output())
+        time.sleep(0.05)
+
+    assert runner.is_alive()
+    assert "second" in messages
+
+    runner.cancel_event.set()
+    runner._future.result(timeout=20)
+    assert runner.status == 'cancelled'